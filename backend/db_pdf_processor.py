@@ -1,448 +1,570 @@
-def extract_wefaricate_data(pdf_path):
-    """提取Wefaricate内部采购订单数据"""
-    import pdfplumber
+import atexit
+import logging
+from operator import itemgetter
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.utils.config import get_pdf_config
+from backend.pdf_budget import (
+    KILL_GRACE_SECONDS, LIMIT_TIMEOUT, ParseBudgetExceeded, ProcessPoolLeases, check_page_limit,
+    check_parse_deadline, current_parse_budget, enforce_parse_budget
+)
+from backend.pdf_logging import ParseSummary, get_pdf_logger, pdf_source_name
+from backend.pdf_field_parsers import (
+    CENTURION_DATE_FORMAT, CENTURION_DATE_FORMATS, MAGIC_FX_DATE_FORMAT, MAGIC_FX_DATE_FORMATS,
+    WEFARICATE_DATE_FORMAT, WEFARICATE_DATE_FORMATS, clean_currency_value, parse_date, parse_decimal, parse_eur_price,
+    remove_leading_zeros
+)
+from backend.pdf_page_analysis import (
+    PageAnalysis, PageContentHasher, TableRegionLocator, count_pdf_pages, extract_tables_in_region, is_pdf_path,
+    iter_pdf_pages, open_pdf
+)
+from backend.pdf_parse_cache import PDFParseCache
+from backend.pdf_po_line import NON_WF_OPEN_LAYOUT, WF_OPEN_LAYOUT, POLine
+
+logger = get_pdf_logger('extractor')
+
+# 解析器版本号：提取逻辑的输出发生变化时需要递增，使旧的解析缓存失效
+EXTRACTOR_VERSION = "6"
+
+# 订单明细表格区域的表头关键字和页脚关键字
+WEFARICATE_TABLE_HEADER = ('Item', 'ID')
+WEFARICATE_TABLE_FOOTER = ('Page:', 'Incoterms:')
+MAGIC_FX_TABLE_HEADER = ('Code', 'Description')
+MAGIC_FX_TABLE_FOOTER = ('Total Amount', 'Delivery address', 'Please note')
+
+
+def extraction_cache_version():
+    """
+    解析缓存键中的版本：解析器版本号加上会改变提取结果的配置（目前只有 PDF_TABLE_CROP），
+    修改配置后不会读到按另一种配置解析的缓存结果
+    """
+    return f"{EXTRACTOR_VERSION}-crop{int(get_pdf_config()['table_crop'])}"
+
+
+def _page_cache_keys(pdf, page_cache, stage, first_page_stage=None):
+    """
+    计算每一页中间结果的缓存键（页面内容哈希 + 提取阶段 + 解析器版本和提取配置）
+
+    供应商重发的修订版订单通常只改动个别页面，未改动页面的内容哈希不变，可以直接复用上次的单页结果。
+    第一页还要提取订单头信息时使用 first_page_stage 区分。未启用页面缓存或无法计算哈希时返回空列表。
+    """
+    if page_cache is None:
+        return []
+    try:
+        page_hashes = PageContentHasher().hash_pages(pdf)
+    except Exception as e:
+        logger.warning("计算页面内容哈希失败，不使用页面缓存: %s", e)
+        return []
+    version = extraction_cache_version()
+    return [
+        PDFParseCache.make_key(page_hash, first_page_stage if page_num == 0 and first_page_stage else stage, version)
+        for page_num, page_hash in enumerate(page_hashes)
+    ]
+
+
+def _new_table_region_locator(header_keywords, footer_keywords):
+    """按配置创建表格区域定位器，关闭裁剪时返回None"""
+    if not get_pdf_config()['table_crop']:
+        return None
+    return TableRegionLocator(header_keywords, footer_keywords)
+
+
+def _parse_wefaricate_page(page, page_num, pdf_path, region_locator=None, summary=None):
+    """
+    解析Wefaricate采购订单的单个页面，返回页面信息（数据行和Schedule Lines）
+
+    传入 summary 时把本页的耗时按 text / tables / rows 阶段累加到解析汇总中。
+    """
     import re
-    from datetime import datetime
-    from decimal import Decimal, InvalidOperation
+
+    # 每页只做一次版面分析，文本和表格共用同一份字符/单词结果
+    analysis = PageAnalysis(page)
+    text = analysis.text
+    if summary is not None:
+        summary.lap('text')
     
-    data = []
+    # 逐行日志只在DEBUG级别输出，每页取一次开关
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("Processing Wefaricate PDF: %s, Page: %d", pdf_source_name(pdf_path), page_num + 1)
     
-    # 导入内部函数
-    def remove_leading_zeros(value):
-        """去掉前导零"""
-        if not value:
-            return value
-        # 如果是纯数字字符串，去掉前导零
-        if value.isdigit():
-            return str(int(value))
-        return value
-
-    def parse_date(date_str):
-        """解析日期字符串"""
-        if not date_str:
-            return None
-        
-        # 尝试解析不同的日期格式
-        date_formats = [
-            '%m/%d/%y',
-            '%m/%d/%Y',
-            '%Y/%m/%d',
-            '%Y-%m-%d',
-            '%m-%d-%Y',
-            '%m-%d-%y',
-            '%b %d, %Y',
-            '%B %d, %Y'
-        ]
-        
-        for fmt in date_formats:
-            try:
-                date_obj = datetime.strptime(date_str.strip(), fmt)
-                return date_obj.date()
-            except:
-                continue
-        
-        # 如果所有格式都失败，返回None
-        return None
-
-    def parse_eur_price(price_str):
-        """解析欧元价格，提取数值并计算单价"""
-        if not price_str:
-            return "", ""
-        
-        # 提取价格数值
-        price_match = re.search(r'[\d,]+\.?\d*', price_str.replace(',', ''))
-        if not price_match:
-            return price_str, ""
-        
-        # 提取per后的数量
-        per_match = re.search(r'per\s+(\d+)', price_str, re.IGNORECASE)
-        quantity = int(per_match.group(1)) if per_match else 1
-        
-        # 计算单价
-        try:
-            price_value = float(price_match.group(0))
-            unit_price = price_value / quantity
-            # 格式化为欧元货币格式，只保留货币符号和数字
-            return f"€{unit_price:.4f}", f"€{price_value:.2f}"
-        except:
-            return price_str, ""
-
-    def clean_currency_value(value):
-        """清理货币值，只保留货币符号和数字"""
-        if not value:
-            return value
-        
-        # 移除逗号以便处理
-        clean_value = value.replace(',', '')
-        
-        # 提取数字部分
-        number_match = re.search(r'[\d]+\.?\d*', clean_value)
-        if not number_match:
-            return value
+    # 提取采购订单号 (只在第一页提取)
+    po_number = ""
+    po_placed_date = None
+    purchaser = ""
+    if page_num == 0:
+        # 提取采购订单号 (更灵活的匹配)
+        po_match = re.search(r'Purchase Order[^\d]*(\d+)', text)
+        if not po_match:
+            po_match = re.search(r'(\d{10})', text)  # 尝试匹配10位数字
+        po_number = po_match.group(1) if po_match else ""
+        logger.debug("Extracted PO Number: %s", po_number)
         
-        number_part = number_match.group(0)
+        # 提取Created On日期作为PO Placed date
+        created_on_match = re.search(r'Created on:\s*([A-Za-z]+\s*\d{1,2},\s*\d{4})', text)
+        if created_on_match:
+            # 解析日期
+            date_str = created_on_match.group(1)
+            po_placed_date = parse_date(date_str, WEFARICATE_DATE_FORMAT, WEFARICATE_DATE_FORMATS)
         
-        # 检查货币符号（可能在前面或后面）
-        currency_symbol = ""
-        if '€' in value or 'EUR' in value:
-            currency_symbol = "€"
-        elif '$' in value:
-            currency_symbol = "$"
-        elif '£' in value:
-            currency_symbol = "£"
+        # 提取Contact Person作为Purchaser
+        contact_match = re.search(r'Contact Person[:\s]*(.*)', text)
+        if contact_match:
+            purchaser = contact_match.group(1).strip()
+        logger.debug("PO Placed Date: %s", po_placed_date)
+    
+    # 查找表格数据（先裁剪到表格区域）
+    tables = extract_tables_in_region(analysis, region_locator)
+    if summary is not None:
+        summary.lap('tables')
+    
+    table = tables[0] if tables else None
+    
+    # 存储当前页面的信息（只保留跨页关联需要的精简数据，不保留整页文本和表格）
+    page_info = {
+        'page_num': page_num,
+        'data_rows': [],  # 存储数据行信息
+        'schedule_lines': [],  # 存储Schedule Lines信息
+        'po_number': po_number,
+        'po_placed_date': po_placed_date,
+        'purchaser': purchaser,
+        'skipped_rows': 0  # 被过滤掉的无效数据行数，用于解析汇总
+    }
+    
+    # 假设第一个表格包含订单项数据
+    if table:
+        if debug:
+            logger.debug("Found table with %d rows", len(table))
         
-        # 如果没有找到货币符号，尝试从常见的货币代码中提取
-        if not currency_symbol:
-            if 'EUR' in value:
-                currency_symbol = "€"
-            elif 'USD' in value:
-                currency_symbol = "$"
-            elif 'GBP' in value:
-                currency_symbol = "£"
+        # 查找表头行 (更灵活的匹配)
+        header_row_index = -1
+        for i, row in enumerate(table):
+            if row and any(cell and ('Item' in str(cell) or 'ID' in str(cell)) for cell in row):
+                header_row_index = i
+                break
         
-        return f"{currency_symbol}{number_part}"
-
-    def parse_decimal(value):
-        """解析Decimal值，处理货币符号"""
-        if not value:
-            return None
+        if debug:
+            logger.debug("Header row index: %d", header_row_index)
         
-        try:
-            # 移除货币符号
-            clean_value = re.sub(r'[€$£]', '', str(value))
-            # 移除逗号
-            clean_value = clean_value.replace(',', '')
-            return Decimal(clean_value)
-        except (InvalidOperation, ValueError):
-            return None
-    
-    # 存储所有页面的数据和Schedule Lines信息，用于跨页处理
-    all_pages_info = []
-    
-    with pdfplumber.open(pdf_path) as pdf:
-        # 首先收集所有页面的信息
-        for page_num, page in enumerate(pdf.pages):
-            text = page.extract_text()
-            
-            print(f"Processing Wefaricate PDF: {pdf_path}, Page: {page_num + 1}")
-            
-            # 提取采购订单号 (只在第一页提取)
-            po_number = ""
-            if page_num == 0:
-                print(f"Processing Wefaricate PDF: {pdf_path}")
+        # 处理数据行
+        start_index = header_row_index + 1 if header_row_index >= 0 else 0
+        for i in range(start_index, len(table)):
+            row = table[i]
+            if row and any(cell and str(cell).strip() for cell in row):  # 非空行
+                # 过滤掉明显不是数据的行
+                row_text = " ".join(str(cell) for cell in row if cell)
+                if any(skip_text in row_text for skip_text in ['Page:', 'We Fabricate', 'Incoterms:']):
+                    continue
                 
-                # 提取采购订单号 (更灵活的匹配)
-                po_match = re.search(r'Purchase Order[^\d]*(\d+)', text)
-                if not po_match:
-                    po_match = re.search(r'(\d{10})', text)  # 尝试匹配10位数字
-                po_number = po_match.group(1) if po_match else ""
-                print(f"Extracted PO Number: {po_number}")
+                # 检查是否为Schedule Lines行
+                if 'Schedule Lines:' in row_text:
+                    # 查找Schedule Lines行之后的日期行
+                    schedule_lines_index = i + 1
+                    if schedule_lines_index < len(table):
+                        schedule_row = table[schedule_lines_index]
+                        # 检查这行是否包含日期信息
+                        if schedule_row and len(schedule_row) > 4:
+                            # 检查第4列（数量列）和第5列（日期列）
+                            qty_cell = str(schedule_row[3]).strip() if schedule_row[3] else ""
+                            date_cell = str(schedule_row[4]).strip() if schedule_row[4] else ""
+                            # 检查是否包含日期格式 (例如: Oct 7, 2025)
+                            if re.match(r'[A-Za-z]+\s*\d{1,2},\s*\d{4}', date_cell):
+                                # 解析日期
+                                try:
+                                    req_date = parse_date(date_cell, WEFARICATE_DATE_FORMAT, WEFARICATE_DATE_FORMATS)
+                                    if debug:
+                                        logger.debug("解析到Schedule Lines日期: %s -> %s", date_cell, req_date)
+                                    # 存储Schedule Lines信息
+                                    page_info['schedule_lines'].append({
+                                        'table_row_index': i,  # Schedule Lines行在表格中的索引
+                                        'date_row_index': schedule_lines_index,  # 日期行在表格中的索引
+                                        'req_date': req_date,
+                                        'date_cell': date_cell,
+                                        'quantity': qty_cell
+                                    })
+                                except Exception as e:
+                                    logger.warning("日期解析失败: %s, 错误: %s", date_cell, e)
+                    continue
                 
-                # 提取Created On日期作为PO Placed date
-                po_placed_date = None
-                created_on_match = re.search(r'Created on:\s*([A-Za-z]+\s*\d{1,2},\s*\d{4})', text)
-                if created_on_match:
-                    # 解析日期
-                    date_str = created_on_match.group(1)
-                    po_placed_date = parse_date(date_str)
+                # 确保行数据完整
+                while len(row) < 10:
+                    row.append("")
                 
-                # 提取Contact Person作为Purchaser
-                purchaser = ""
-                contact_match = re.search(r'Contact Person[:\s]*(.*)', text)
-                if contact_match:
-                    purchaser = contact_match.group(1).strip()
-                print(f"PO Placed Date: {po_placed_date}")
-            
-            # 查找表格数据
-            tables = page.extract_tables()
-            
-            # 存储当前页面的信息
-            page_info = {
-                'page_num': page_num,
-                'text': text,
-                'table': tables[0] if tables else None,
-                'data_rows': [],  # 存储数据行信息
-                'schedule_lines': [],  # 存储Schedule Lines信息
-                'po_number': po_number,
-                'po_placed_date': po_placed_date,
-                'purchaser': purchaser
-            }
-            
-            # 假设第一个表格包含订单项数据
-            if page_info['table']:
-                table = page_info['table']
-                print(f"Found table with {len(table)} rows")
+                # 提取数据，更灵活地处理列位置
+                item = ""
+                id_part = ""
+                description = ""
+                quantity = ""
+                net_price = ""
+                net_value = ""
+                req_date = None
                 
-                # 查找表头行 (更灵活的匹配)
-                header_row_index = -1
-                for i, row in enumerate(table):
-                    if row and any(cell and ('Item' in str(cell) or 'ID' in str(cell)) for cell in row):
-                        header_row_index = i
-                        break
+                # 提取Item编号
+                if len(row) > 0:
+                    cell0 = str(row[0]).strip() if row[0] else ""
+                    # 检查是否为Item编号（数字格式）
+                    if re.match(r'^\d+$', cell0):
+                        item = cell0
+                        if debug:
+                            logger.debug("提取到Item编号: %s", item)
+                    elif debug:
+                        logger.debug("无效的Item编号: '%s'", cell0)
                 
-                print(f"Header row index: {header_row_index}")
+                # 提取ID (不一定需要符合xxxx-xxxx-xxxx格式)
+                if len(row) > 1:
+                    id_part = str(row[1]).strip() if row[1] else ""
+                    # 验证ID格式(如果存在就必须符合xxxx-xxxx-xxxx模式)
+                    # 不立即跳过，而是继续处理其他字段，稍后再决定是否添加数据行
+                    if debug:
+                        logger.debug("提取到ID: '%s'", id_part)
                 
-                # 处理数据行
-                start_index = header_row_index + 1 if header_row_index >= 0 else 0
-                for i in range(start_index, len(table)):
-                    row = table[i]
-                    if row and any(cell and str(cell).strip() for cell in row):  # 非空行
-                        # 过滤掉明显不是数据的行
-                        row_text = " ".join(str(cell) for cell in row if cell)
-                        if any(skip_text in row_text for skip_text in ['Page:', 'We Fabricate', 'Incoterms:']):
-                            continue
-                        
-                        # 检查是否为Schedule Lines行
-                        if 'Schedule Lines:' in row_text:
-                            # 查找Schedule Lines行之后的日期行
-                            schedule_lines_index = i + 1
-                            if schedule_lines_index < len(table):
-                                schedule_row = table[schedule_lines_index]
-                                # 检查这行是否包含日期信息
-                                if schedule_row and len(schedule_row) > 4:
-                                    # 检查第4列（数量列）和第5列（日期列）
-                                    qty_cell = str(schedule_row[3]).strip() if schedule_row[3] else ""
-                                    date_cell = str(schedule_row[4]).strip() if schedule_row[4] else ""
-                                    # 检查是否包含日期格式 (例如: Oct 7, 2025)
-                                    if re.match(r'[A-Za-z]+\s*\d{1,2},\s*\d{4}', date_cell):
-                                        # 解析日期
-                                        try:
-                                            req_date = parse_date(date_cell)
-                                            print(f"解析到Schedule Lines日期: {date_cell} -> {req_date}")
-                                            # 存储Schedule Lines信息
-                                            page_info['schedule_lines'].append({
-                                                'table_row_index': i,  # Schedule Lines行在表格中的索引
-                                                'date_row_index': schedule_lines_index,  # 日期行在表格中的索引
-                                                'req_date': req_date,
-                                                'date_cell': date_cell,
-                                                'quantity': qty_cell
-                                            })
-                                        except Exception as e:
-                                            print(f"日期解析失败: {date_cell}, 错误: {e}")
-                            continue
-                        
-                        # 确保行数据完整
-                        while len(row) < 10:
-                            row.append("")
-                        
-                        # 提取数据，更灵活地处理列位置
-                        item = ""
-                        id_part = ""
-                        description = ""
-                        quantity = ""
-                        net_price = ""
-                        net_value = ""
-                        req_date = None
-                        
-                        # 提取Item编号
-                        if len(row) > 0:
-                            cell0 = str(row[0]).strip() if row[0] else ""
-                            # 检查是否为Item编号（数字格式）
-                            if re.match(r'^\d+$', cell0):
-                                item = cell0
-                                print(f"提取到Item编号: {item}")
-                            else:
-                                print(f"无效的Item编号: '{cell0}'")
-                        
-                        # 提取ID (不一定需要符合xxxx-xxxx-xxxx格式)
-                        if len(row) > 1:
-                            id_part = str(row[1]).strip() if row[1] else ""
-                            print(f"提取到ID: '{id_part}'")
-                            # 验证ID格式(如果存在就必须符合xxxx-xxxx-xxxx模式)
-                            if id_part and not re.match(r'^\d{4}-\d{4}-\d{4}$', id_part):
-                                print(f"跳过不符合格式的ID: '{id_part}'")
-                                # 不立即跳过，而是继续处理其他字段，稍后再决定是否添加数据行
-                        
-                        # 提取描述
-                        if len(row) > 2:
-                            description = str(row[2]).strip() if row[2] else ""
-                        
-                        # 提取数量 (正确处理逗号分隔的数字)
-                        if len(row) > 3:
-                            quantity_cell = str(row[3]).strip() if row[3] else ""
-                            # 提取数量（数字），正确处理逗号
-                            qty_match = re.search(r'([\d,]+)(?:\.\d+)?', quantity_cell)
-                            if qty_match:
-                                # 移除逗号并获取数量
-                                quantity = qty_match.group(1).replace(',', '')
-                        
-                        # 提取价格信息
-                        if len(row) > 4:
-                            net_price_raw = str(row[4]).strip() if row[4] else ""
-                            # 解析欧元价格
-                            net_price, _ = parse_eur_price(net_price_raw)
-                            print(f"Price parsing: raw='{net_price_raw}', unit='{net_price}'")
-                        
-                        # 确保总是从第6列获取Net Value（Total Price）
-                        if len(row) > 5:
-                            net_value_raw = str(row[5]).strip() if row[5] else ""
-                            print(f"Raw net value: '{net_value_raw}'")
-                            # 如果第五列有总价，使用它
-                            if net_value_raw and ('€' in net_value_raw or 'EUR' in net_value_raw or re.search(r'[\d,]+\.?\d*', net_value_raw)):
-                                # 清理Net Value，只保留货币符号和数字
-                                net_value = clean_currency_value(net_value_raw.replace('EUR', '€'))
+                # 提取描述
+                if len(row) > 2:
+                    description = str(row[2]).strip() if row[2] else ""
+                
+                # 提取数量 (正确处理逗号分隔的数字)
+                if len(row) > 3:
+                    quantity_cell = str(row[3]).strip() if row[3] else ""
+                    # 提取数量（数字），正确处理逗号
+                    qty_match = re.search(r'([\d,]+)(?:\.\d+)?', quantity_cell)
+                    if qty_match:
+                        # 移除逗号并获取数量
+                        quantity = qty_match.group(1).replace(',', '')
+                
+                # 提取价格信息
+                if len(row) > 4:
+                    net_price_raw = str(row[4]).strip() if row[4] else ""
+                    # 解析欧元价格
+                    net_price, _ = parse_eur_price(net_price_raw, unit_decimals=4)
+                    if debug:
+                        logger.debug("Price parsing: raw='%s', unit='%s'", net_price_raw, net_price)
+                
+                # 确保总是从第6列获取Net Value（Total Price）
+                if len(row) > 5:
+                    net_value_raw = str(row[5]).strip() if row[5] else ""
+                    if debug:
+                        logger.debug("Raw net value: '%s'", net_value_raw)
+                    # 如果第五列有总价，使用它
+                    if net_value_raw and ('€' in net_value_raw or 'EUR' in net_value_raw or re.search(r'[\d,]+\.?\d*', net_value_raw)):
+                        # 清理Net Value，只保留货币符号和数字
+                        net_value = clean_currency_value(net_value_raw.replace('EUR', '€'))
+                    else:
+                        # 如果没有有效的net_value_raw，但有数值，添加欧元符号
+                        if net_value_raw and re.search(r'[\d,]+\.?\d*', net_value_raw):
+                            # 提取数字并添加欧元符号
+                            number_match = re.search(r'[\d,]+\.?\d*', net_value_raw.replace(',', ''))
+                            if number_match:
+                                net_value = f"€{number_match.group(0)}"
                             else:
-                                # 如果没有有效的net_value_raw，但有数值，添加欧元符号
-                                if net_value_raw and re.search(r'[\d,]+\.?\d*', net_value_raw):
-                                    # 提取数字并添加欧元符号
-                                    number_match = re.search(r'[\d,]+\.?\d*', net_value_raw.replace(',', ''))
-                                    if number_match:
-                                        net_value = f"€{number_match.group(0)}"
-                                    else:
-                                        net_value = net_value_raw
-                                else:
-                                    net_value = net_value_raw
-                        
-                        print(f"Processing row: Item={item}, ID={id_part}, Qty={quantity}, Net Price={net_price}, Net Value={net_value}")
-                        
-                        # 验证ID格式（ID可以为空，但如果存在就必须符合格式）
-                        id_valid = (not id_part) or re.match(r'^\d{4}-\d{4}-\d{4}$', id_part)
-                        
-                        # 只要有有效的Item编号和ID格式正确，就添加数据（允许ID为空）
-                        if item and id_valid:
-                            print(f"添加有效数据行: Item={item}, ID={id_part if id_part else 'N/A'}")
-                            # 去掉前导零
-                            item_no_zero = remove_leading_zeros(item) if item else ""
-                            
-                            # 创建数据行信息
-                            data_row_info = {
-                                "item": item,
-                                "item_no_zero": item_no_zero,
-                                "id_part": id_part,  # 可以为空
-                                "description": description,
-                                "quantity": quantity,
-                                "net_price": net_price,
-                                "net_value": net_value,
-                                "table_row_index": i,  # 数据行在表格中的索引
-                                "table_row_data": row
-                            }
-                            page_info['data_rows'].append(data_row_info)
+                                net_value = net_value_raw
                         else:
-                            print(f"跳过无效数据行: Item='{item}', ID='{id_part}'")
-                            # 记录详细信息
-                            if not item:
-                                print(f"  原因: 缺少Item编号")
-                            if id_part and not re.match(r'^\d{4}-\d{4}-\d{4}$', id_part):
-                                print(f"  原因: ID格式不正确")
+                            net_value = net_value_raw
                 
-            # 存储页面信息
-            all_pages_info.append(page_info)
-        
-        # 处理完所有页面后，统一处理数据和Schedule Lines的关联
-        # 首先处理非第一页的页面，获取PO信息
-        if len(all_pages_info) > 0:
-            first_page_po = all_pages_info[0]['po_number']
-            first_page_date = all_pages_info[0]['po_placed_date']
-            first_page_purchaser = all_pages_info[0]['purchaser']
-            
-            # 为后续页面设置PO信息
-            for page_info in all_pages_info[1:]:
-                page_info['po_number'] = first_page_po
-                page_info['po_placed_date'] = first_page_date
-                page_info['purchaser'] = first_page_purchaser
-        
-        # 创建一个列表来存储所有数据行，便于跨页关联
-        all_data_rows = []
-        all_schedule_lines = []
-        
-        # 收集所有数据行和Schedule Lines信息
+                if debug:
+                    logger.debug("Processing row: Item=%s, ID=%s, Qty=%s, Net Price=%s, Net Value=%s",
+                                 item, id_part, quantity, net_price, net_value)
+                
+                # 验证ID格式（ID可以为空，但如果存在就必须符合格式）
+                id_valid = (not id_part) or re.match(r'^\d{4}-\d{4}-\d{4}$', id_part)
+                
+                # 只要有有效的Item编号和ID格式正确，就添加数据（允许ID为空）
+                if item and id_valid:
+                    if debug:
+                        logger.debug("添加有效数据行: Item=%s, ID=%s", item, id_part if id_part else 'N/A')
+                    # 去掉前导零
+                    item_no_zero = remove_leading_zeros(item) if item else ""
+                    
+                    # 创建数据行信息
+                    data_row_info = {
+                        "item": item,
+                        "item_no_zero": item_no_zero,
+                        "id_part": id_part,  # 可以为空
+                        "description": description,
+                        "quantity": quantity,
+                        "net_price": net_price,
+                        "net_value": net_value,
+                        "table_row_index": i  # 数据行在表格中的索引
+                    }
+                    page_info['data_rows'].append(data_row_info)
+                else:
+                    page_info['skipped_rows'] += 1
+                    if debug:
+                        # 记录详细信息
+                        reasons = []
+                        if not item:
+                            reasons.append("缺少Item编号")
+                        if not id_valid:
+                            reasons.append("ID格式不正确")
+                        logger.debug("跳过无效数据行: Item='%s', ID='%s', 原因: %s", item, id_part, "，".join(reasons))
+    
+    if summary is not None:
+        summary.lap('rows')
+    return page_info
+
+
+def _parse_wefaricate_page_range(pdf_path, start_page, end_page, skip_pages=frozenset(), budget=None):
+    """
+    在工作进程中解析一段连续页面，整个页面段只打开一次PDF
+
+    skip_pages 中的页面（已有缓存结果）不解析；budget 为主进程的解析预算，超时后在页面之间停止。
+    """
+    pages_info = []
+    region_locator = _new_table_region_locator(WEFARICATE_TABLE_HEADER, WEFARICATE_TABLE_FOOTER)
+    with enforce_parse_budget(budget), open_pdf(pdf_path) as pdf:
+        for page_num, page in iter_pdf_pages(pdf, start_page, end_page):
+            if page_num not in skip_pages:
+                check_parse_deadline(page_num - start_page)
+                pages_info.append(_parse_wefaricate_page(page, page_num, pdf_path, region_locator))
+    return pages_info
+
+
+# 跨页关联时的元素类型：(页码, 表格行索引, 类型, 页面信息, 行信息)，同一位置上数据行排在Schedule Lines之前
+ELEMENT_DATA = 0
+ELEMENT_SCHEDULE = 1
+
+
+def _find_next_schedule_dates(all_elements):
+    """
+    为已排序的元素列表计算每个位置之后最近一个Schedule Lines的日期
+    
+    从后往前扫描一遍，记录当前位置之后遇到的最近一个Schedule Lines，
+    避免对每个数据行都向后线性查找。
+    
+    Returns:
+        list: 与 all_elements 等长的列表，后面没有Schedule Lines时为None
+    """
+    next_dates = [None] * len(all_elements)
+    next_date = None
+    for index in range(len(all_elements) - 1, -1, -1):
+        next_dates[index] = next_date
+        element = all_elements[index]
+        if element[2] == ELEMENT_SCHEDULE:
+            next_date = element[4]['req_date']
+    return next_dates
+
+
+def _sorted_wefaricate_elements(all_pages_info):
+    """
+    按页面和行索引排序所有数据行和Schedule Lines
+
+    元素是引用原来页面信息和行信息的元组，不复制每一行的字典。
+    """
+    all_elements = []
+    for kind, rows_key in ((ELEMENT_DATA, 'data_rows'), (ELEMENT_SCHEDULE, 'schedule_lines')):
         for page_info in all_pages_info:
-            # 为每个数据行添加页面信息
-            for data_row in page_info['data_rows']:
-                data_row_with_page = data_row.copy()
-                data_row_with_page['page_num'] = page_info['page_num']
-                data_row_with_page['po_number'] = page_info['po_number']
-                data_row_with_page['po_placed_date'] = page_info['po_placed_date']
-                data_row_with_page['purchaser'] = page_info['purchaser']
-                all_data_rows.append(data_row_with_page)
+            page_num = page_info['page_num']
+            for row in page_info[rows_key]:
+                all_elements.append((page_num, row['table_row_index'], kind, page_info, row))
+    all_elements.sort(key=itemgetter(0, 1, 2))
+    return all_elements
+
+
+def _associate_wefaricate_pages(all_pages_info):
+    """处理完所有页面后，统一处理数据和Schedule Lines的跨页关联，生成最终数据行"""
+    data = []
+    
+    # 订单号、下单日期和采购员只在第一页提取，后续页面的数据行使用第一页的值
+    if all_pages_info:
+        first_page_po = all_pages_info[0]['po_number']
+        first_page_date = all_pages_info[0]['po_placed_date']
+        first_page_purchaser = all_pages_info[0]['purchaser']
+        for page_info in all_pages_info[1:]:
+            page_info['po_number'] = first_page_po
+            page_info['po_placed_date'] = first_page_date
+            page_info['purchaser'] = first_page_purchaser
+    
+    # 每个数据行关联到它后面（可能在下一页）的最近一个Schedule Lines日期
+    all_elements = _sorted_wefaricate_elements(all_pages_info)
+    next_schedule_dates = _find_next_schedule_dates(all_elements)
+    debug = logger.isEnabledFor(logging.DEBUG)
+    
+    for i, (_, _, kind, page_info, data_row) in enumerate(all_elements):
+        if kind == ELEMENT_DATA:
+            # 处理数据行
+            po_number = page_info['po_number']
+            po_placed_date = page_info['po_placed_date']
+            purchaser = page_info['purchaser']
+            item = data_row['item']
+            item_no_zero = data_row['item_no_zero']
+            id_part = data_row['id_part']
+            description = data_row['description']
+            quantity = data_row['quantity']
+            net_price = data_row['net_price']
+            net_value = data_row['net_value']
             
-            # 为每个Schedule Lines添加页面信息
-            for schedule_line in page_info['schedule_lines']:
-                schedule_line_with_page = schedule_line.copy()
-                schedule_line_with_page['page_num'] = page_info['page_num']
-                all_schedule_lines.append(schedule_line_with_page)
-        
-        # 为每个数据行查找对应的Schedule Lines日期
-        # 正确的逻辑是：每个数据行应该关联到它后面的最近一个Schedule Lines日期
-        
-        # 按页面和行索引排序所有元素（包括数据行和Schedule Lines）
-        all_elements = []
-        
-        # 收集所有数据行
-        for data_row in all_data_rows:
-            all_elements.append({
-                'type': 'data',
-                'page_num': data_row['page_num'],
-                'table_row_index': data_row['table_row_index'],
-                'data': data_row
-            })
-        
-        # 收集所有Schedule Lines
-        for schedule_line in all_schedule_lines:
-            all_elements.append({
-                'type': 'schedule',
-                'page_num': schedule_line['page_num'],
-                'table_row_index': schedule_line['table_row_index'],
-                'data': schedule_line
-            })
+            # 这个数据行后面的最近一个Schedule Lines日期
+            req_date_wf = next_schedule_dates[i]
+            
+            if debug:
+                logger.debug("数据行 %s 关联到日期: %s", item, req_date_wf)
+            
+            # 创建最终的数据行
+            final_data_row = POLine.create(
+                WF_OPEN_LAYOUT,
+                po=po_number,
+                pn=id_part,
+                line=int(item_no_zero) if item_no_zero and item_no_zero.isdigit() else None,
+                po_line=f"{po_number}/{item_no_zero}" if item_no_zero and po_number else (item_no_zero or id_part),
+                description=description,
+                qty=parse_decimal(quantity),
+                net_price=parse_decimal(net_price),
+                total_price=parse_decimal(net_value),
+                req_date_wf=req_date_wf,
+                po_placed_date=po_placed_date,
+                purchaser=purchaser
+            )
+            data.append(final_data_row)
+    
+    return data
+
+
+def _warm_up_worker():
+    """工作进程初始化：提前导入pdfplumber"""
+    import pdfplumber  # noqa: F401
+
+
+# 预热的解析进程池，进程在多次导入之间复用，避免每次都重新启动解释器和导入pdfplumber；
+# 每次并行解析独占一个进程池，超时强制结束时不影响其他请求
+_wefaricate_pools = ProcessPoolLeases(initializer=_warm_up_worker)
+atexit.register(_wefaricate_pools.shutdown)
+
+
+def _split_page_ranges(page_count, parts):
+    """把页面切分成连续的页面段"""
+    parts = max(1, min(parts, page_count))
+    size, remainder = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for index in range(parts):
+        end = start + size + (1 if index < remainder else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def _collect_wefaricate_pages_parallel(pdf_path, page_numbers, workers):
+    """
+    把需要解析的页面（页码列表）切分成页面段分发到进程池并行解析，按页码顺序合并结果
+
+    有解析预算时，工作进程在页面之间检查截止时间；超过截止时间仍未返回的（卡在单页内部）强制结束
+    这次解析借用的进程池，其他请求的解析不受影响。
+    """
+    budget = current_parse_budget()
+    pool = _wefaricate_pools.acquire(workers)
+    completed = False
+    try:
+        futures = []
+        for start, end in _split_page_ranges(len(page_numbers), workers):
+            chunk = page_numbers[start:end]
+            skip_pages = frozenset(range(chunk[0], chunk[-1] + 1)).difference(chunk)
+            futures.append(pool.submit(_parse_wefaricate_page_range, pdf_path, chunk[0], chunk[-1] + 1, skip_pages,
+                                       budget))
+        all_pages_info = []
+        for future in futures:
+            remaining = budget.remaining() if budget is not None else None
+            try:
+                all_pages_info.extend(future.result(
+                    timeout=None if remaining is None else max(0.0, remaining) + KILL_GRACE_SECONDS
+                ))
+            except FuturesTimeoutError:
+                logger.warning("并行解析超时，强制结束解析进程: %s", pdf_source_name(pdf_path))
+                raise ParseBudgetExceeded(LIMIT_TIMEOUT, budget.timeout_seconds,
+                                          budget.timeout_seconds - budget.remaining(), len(all_pages_info))
+        completed = True
+        return all_pages_info
+    finally:
+        if completed:
+            _wefaricate_pools.release(pool)
+        else:
+            # 超时、工作进程出错或进程池损坏：结束仍在解析其余页面段的进程
+            _wefaricate_pools.discard(pool, kill=True)
+
+
+def extract_wefaricate_data(pdf_path, workers=None, page_cache=None):
+    """
+    提取Wefaricate内部采购订单数据
+    
+    Args:
+        pdf_path: PDF文件路径或可 seek 的二进制文件对象
+        workers: 并行解析的进程数，None表示使用配置 PDF_PARSE_WORKERS，1表示串行解析（文件对象总是串行解析）
+        page_cache: 单页解析结果缓存（PDFParseCache），内容未变的页面直接复用缓存结果，
+                    只解析改动过的页面，再重新做跨页关联；None表示不使用
         
-        # 按页面和行索引排序
-        all_elements.sort(key=lambda x: (x['page_num'], x['table_row_index']))
+    Returns:
+        list: 数据行列表
+    """
+    pdf_config = get_pdf_config()
+    if workers is None:
+        workers = pdf_config['parse_workers']
+    
+    summary = ParseSummary(logger, 'wefabricate', pdf_path)
+    all_pages_info = None
+    # 页码 -> 缓存的单页结果
+    cached_pages = {}
+    with open_pdf(pdf_path) as pdf:
+        page_count = count_pdf_pages(pdf)
+        check_page_limit(page_count)
+        summary.lap('open')
+        page_keys = _page_cache_keys(pdf, page_cache, 'wefabricate', 'wefabricate:first')
+        if page_keys:
+            page_count = len(page_keys)
+            for page_num, key in enumerate(page_keys):
+                page_info = page_cache.get(key)
+                if page_info is not None:
+                    page_info['page_num'] = page_num
+                    cached_pages[page_num] = page_info
+            summary.lap('page_cache')
+            summary.add('cached_pages', len(cached_pages))
         
-        # 为每个数据行找到其后面的最近一个Schedule Lines
-        for i, element in enumerate(all_elements):
-            if element['type'] == 'data':
-                # 处理数据行
-                data_row = element['data']
-                po_number = data_row['po_number']
-                po_placed_date = data_row['po_placed_date']
-                purchaser = data_row['purchaser']
-                item = data_row['item']
-                item_no_zero = data_row['item_no_zero']
-                id_part = data_row['id_part']
-                description = data_row['description']
-                quantity = data_row['quantity']
-                net_price = data_row['net_price']
-                net_value = data_row['net_value']
-                
-                # 查找这个数据行后面的最近一个Schedule Lines
-                req_date_wf = None
-                for j in range(i + 1, len(all_elements)):
-                    next_element = all_elements[j]
-                    if next_element['type'] == 'schedule':
-                        req_date_wf = next_element['data']['req_date']
-                        break
-                
-                print(f"数据行 {item} 关联到日期: {req_date_wf}")
-                
-                # 创建最终的数据行
-                final_data_row = {
-                    "po": po_number,
-                    "pn": id_part,
-                    "line": int(item_no_zero) if item_no_zero and item_no_zero.isdigit() else None,
-                    "po_line": f"{po_number}/{item_no_zero}" if item_no_zero and po_number else (item_no_zero or id_part),
-                    "description": description,
-                    "qty": parse_decimal(quantity),
-                    "net_price": parse_decimal(net_price),
-                    "total_price": parse_decimal(net_value),
-                    "req_date_wf": req_date_wf,
-                    "eta_wfsz": None,
-                    "shipping_mode": None,
-                    "comment": None,
-                    "po_placed_date": po_placed_date,
-                    "purchaser": purchaser,
-                    "record_no": None,
-                    "shipping_cost": None,
-                    "tracking_no": None,
-                    "so_number": None,
-                    "latest_departure_date": None,
-                    "chinese_name": None,
-                    "unit": None
-                }
-                data.append(final_data_row)
+        # 工作进程需要自行打开文件，文件对象只能在当前进程中解析
+        use_parallel = (workers > 1 and page_count - len(cached_pages) >= pdf_config['parallel_min_pages']
+                        and is_pdf_path(pdf_path))
+        if not use_parallel:
+            # 串行解析：逐页流式处理，处理完的页面立即释放
+            region_locator = _new_table_region_locator(WEFARICATE_TABLE_HEADER, WEFARICATE_TABLE_FOOTER)
+            all_pages_info = []
+            for page_num, page in iter_pdf_pages(pdf):
+                page_info = cached_pages.get(page_num)
+                if page_info is None:
+                    check_parse_deadline(page_num)
+                    page_info = _parse_wefaricate_page(page, page_num, pdf_path, region_locator, summary)
+                    if page_keys:
+                        page_cache.put(page_keys[page_num], page_info)
+                all_pages_info.append(page_info)
+    
+    if all_pages_info is None:
+        page_numbers = [page_num for page_num in range(page_count) if page_num not in cached_pages]
+        try:
+            parsed_pages = _collect_wefaricate_pages_parallel(pdf_path, page_numbers, workers)
+        except BrokenProcessPool as e:
+            # 进程池异常时回退到串行解析
+            logger.warning("并行解析失败，回退到串行解析: %s", e)
+            # 先结束这次并行解析的汇总（rows=0，parallel_failed=1），失败的尝试同样留在日志中
+            summary.lap('pages')
+            summary.add('pages', page_count)
+            summary.add('workers', workers)
+            summary.add('parallel_failed')
+            summary.finish(0)
+            return extract_wefaricate_data(pdf_path, workers=1, page_cache=page_cache)
+        if page_keys:
+            for page_info in parsed_pages:
+                page_cache.put(page_keys[page_info['page_num']], page_info)
+        all_pages_info = sorted(list(cached_pages.values()) + parsed_pages, key=lambda page_info: page_info['page_num'])
     
+    if use_parallel:
+        # 并行解析时各页在工作进程中处理，只记录所有页面的总耗时
+        summary.lap('pages')
+    data = _associate_wefaricate_pages(all_pages_info)
+    summary.lap('associate')
+    summary.add('pages', len(all_pages_info))
+    summary.add('schedule_lines', sum(len(page_info['schedule_lines']) for page_info in all_pages_info))
+    summary.add('skipped_rows', sum(page_info['skipped_rows'] for page_info in all_pages_info))
+    summary.add('workers', workers if use_parallel else 1)
+    summary.finish(len(data))
     return data
 
+
 def insert_wf_open_data(data_entries):
     """插入WF Open表数据"""
     connection = connect_to_db()
@@ -603,7 +725,7 @@ def insert_non_wf_open_data(data_entries):
             connection.close()
 
 import re
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal
 import psycopg2
 import os
 from dotenv import load_dotenv
@@ -632,309 +754,284 @@ def connect_to_db():
         print(f"连接数据库时出错: {error}")
         return None
 
-def remove_leading_zeros(value):
-    """去掉前导零"""
-    if not value:
-        return value
-    # 如果是纯数字字符串，去掉前导零
-    if value.isdigit():
-        return str(int(value))
-    return value
-
-def parse_date(date_str):
-    """解析日期字符串"""
-    if not date_str:
-        return None
-    
-    # 尝试解析不同的日期格式
-    date_formats = [
-        '%m/%d/%y',
-        '%m/%d/%Y',
-        '%d/%m/%Y',  # Centurion使用dd/mm/yyyy格式
-        '%Y/%m/%d',
-        '%Y-%m-%d',
-        '%m-%d-%Y',
-        '%m-%d-%y',
-        '%b %d, %Y',
-        '%B %d, %Y'
-    ]
-    
-    for fmt in date_formats:
-        try:
-            from datetime import datetime
-            date_obj = datetime.strptime(date_str.strip(), fmt)
-            return date_obj.date()
-        except:
-            continue
-    
-    # 如果所有格式都失败，返回None
-    return None
+class CenturionLineTokenizer:
+    """
+    Centurion采购订单的逐行状态机
 
-def parse_eur_price(price_str):
-    """解析欧元价格，提取数值并计算单价"""
-    if not price_str:
-        return "", ""
-    
-    # 清理字符串，移除换行符
-    price_str = price_str.replace('\n', ' ').strip()
-    
-    # 提取价格数值
-    price_match = re.search(r'[\d,]+\.?\d*', price_str.replace(',', ''))
-    if not price_match:
-        return price_str, ""
-    
-    # 提取per后的数量
-    per_match = re.search(r'per\s+(\d+)', price_str, re.IGNORECASE)
-    quantity = int(per_match.group(1)) if per_match else 1
-    
-    # 计算单价
-    try:
-        price_value = float(price_match.group(0))
-        unit_price = price_value / quantity
-        # 保留更多小数位以确保精度
-        unit_price_str = f"€{unit_price:.10f}".rstrip('0').rstrip('.')
-        return unit_price_str, f"€{price_value:.10f}".rstrip('0').rstrip('.')
-    except:
-        return price_str, ""
-
-def clean_currency_value(value):
-    """清理货币值，只保留货币符号和数字"""
-    if not value:
-        return value
-    
-    # 移除逗号以便处理
-    clean_value = value.replace(',', '')
-    
-    # 提取数字部分
-    number_match = re.search(r'[\d]+\.?\d*', clean_value)
-    if not number_match:
-        return value
-    
-    number_part = number_match.group(0)
-    
-    # 检查货币符号（可能在前面或后面）
-    currency_symbol = ""
-    if '€' in value or 'EUR' in value:
-        currency_symbol = "€"
-    elif '$' in value:
-        currency_symbol = "$"
-    elif '£' in value:
-        currency_symbol = "£"
-    
-    # 如果没有找到货币符号，尝试从常见的货币代码中提取
-    if not currency_symbol:
-        if 'EUR' in value:
-            currency_symbol = "€"
-        elif 'USD' in value:
-            currency_symbol = "$"
-        elif 'GBP' in value:
-            currency_symbol = "£"
-    
-    return f"{currency_symbol}{number_part}"
+    按页面顺序逐行喂入文本，每行只分类一次：
+    - 表头区域：明细表头之前的行，从中提取PO号、订单日期和货币
+    - 项目起始行：以行号开头、至少8列的行
+    - 延续行：紧跟项目起始行的一行，补全被折行的PN或描述
+    - 结束行：空行以及 Total / Subtotal / Delivery / This order 等页脚行
+    项目在下一行确定不是它的延续时就产出数据行，不需要先拼接整个文档的文本。
+    表头字段在明细表头之前都已找到时（正常订单）数据行立即产出；
+    否则先暂存，直到在后续行中找到这些字段或文档结束（与在全文中查找第一次出现的结果相同）。
+    """
 
-def parse_decimal(value):
-    """解析Decimal值，处理货币符号"""
-    if not value:
-        return None
-    
-    try:
-        # 移除货币符号
-        clean_value = re.sub(r'[€$£]', '', str(value))
-        # 移除逗号
-        clean_value = clean_value.replace(',', '')
-        # 保留所有小数位
-        return Decimal(clean_value)
-    except (InvalidOperation, ValueError):
-        return None
+    TERMINATORS = ('Total', 'Subtotal', 'Delivery', 'This order')
+    CURRENCY_SYMBOLS = {
+        "USD": "$",
+        "EUR": "€",
+        "GBP": "£"
+    }
+    DEFAULT_CURRENCY_SYMBOL = "$"
 
-def extract_centurion_data(pdf_path):
-    """提取Centurion采购订单数据"""
-    import pdfplumber
-    import re
-    from datetime import datetime
-    from decimal import Decimal, InvalidOperation
-    
-    data = []
-    
-    with pdfplumber.open(pdf_path) as pdf:
-        # 提取所有页面的文本
-        all_text = ""
-        all_lines = []
-        
-        # 遍历所有页面
-        for page in pdf.pages:
-            text = page.extract_text()
-            all_text += text + "\n"
-            all_lines.extend(text.split('\n'))
-        
-        print(f"Processing Centurion PDF: {pdf_path} with {len(pdf.pages)} pages")
-        
-        # 提取采购订单号
-        po_match = re.search(r'PO[-\s]*(\d+)', all_text)
-        if not po_match:
-            po_match = re.search(r'Number\s*([A-Z0-9\-]+)', all_text)
-        po_number = po_match.group(1) if po_match else ""
-        print(f"Extracted PO Number: {po_number}")
-        
-        # 提取日期
-        date_match = re.search(r'Date[:\s]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})', all_text)
-        po_date_str = date_match.group(1) if date_match else ""
-        po_date = parse_date(po_date_str) if po_date_str else None
-        print(f"Extracted PO Date: {po_date}")
-        
-        # 识别货币类型
-        currency_symbol = "$"  # 默认美元符号
-        currency_match = re.search(r'Currency\s*(\w{3})', all_text)
-        if currency_match:
-            currency_code = currency_match.group(1)
-            # 转换货币代码为符号
-            currency_map = {
-                "USD": "$",
-                "EUR": "€",
-                "GBP": "£"
+    _PO_RE = re.compile(r'PO[-\s]*(\d+)')
+    _PO_FALLBACK_RE = re.compile(r'Number\s*([A-Z0-9\-]+)')
+    _PO_DATE_RE = re.compile(r'Date[:\s]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})')
+    _CURRENCY_RE = re.compile(r'Currency\s*(\w{3})')
+    _ITEM_START_RE = re.compile(r'^\d+\s')
+    _ITEM_LINE_RE = re.compile(r'^\d+\s\S+')
+    _DATE_TOKEN_RE = re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}')
+    _PN_TAIL_RE = re.compile(r'^\d{3}')
+
+    def __init__(self, debug=False):
+        self.debug = debug
+        self.found_item_header = False
+        self._header_lines = []
+        # 表头字段，None表示尚未找到
+        self._po_number = None
+        self._po_number_fallback = None
+        self._po_date_str = None
+        self._currency_code = None
+        # 等待判断下一行是否为延续行的项目
+        self._pending_item = None
+        # 已完成、等待表头字段的项目
+        self._completed_items = []
+
+    @property
+    def _header_resolved(self):
+        return self._po_number is not None and self._po_date_str is not None and self._currency_code is not None
+
+    def _scan_header_fields(self, text):
+        """在文本中查找尚未找到的表头字段"""
+        if self._po_number is None:
+            po_match = self._PO_RE.search(text)
+            if po_match:
+                self._po_number = po_match.group(1)
+            elif self._po_number_fallback is None:
+                po_match = self._PO_FALLBACK_RE.search(text)
+                if po_match:
+                    self._po_number_fallback = po_match.group(1)
+        if self._po_date_str is None:
+            date_match = self._PO_DATE_RE.search(text)
+            if date_match:
+                self._po_date_str = date_match.group(1)
+        if self._currency_code is None:
+            currency_match = self._CURRENCY_RE.search(text)
+            if currency_match:
+                self._currency_code = currency_match.group(1)
+
+    def _header_values(self):
+        """返回 (PO号, 订单日期, 货币符号)，未找到的字段使用默认值"""
+        po_number = self._po_number if self._po_number is not None else (self._po_number_fallback or "")
+        po_date = (parse_date(self._po_date_str, CENTURION_DATE_FORMAT, CENTURION_DATE_FORMATS)
+                   if self._po_date_str else None)
+        currency_symbol = self.CURRENCY_SYMBOLS.get(self._currency_code, self.DEFAULT_CURRENCY_SYMBOL)
+        return po_number, po_date, currency_symbol
+
+    def feed(self, raw_line):
+        """
+        喂入一行文本
+
+        Returns:
+            list: 因这一行而完成的数据行（通常为0或1行）
+        """
+        if not self.found_item_header:
+            self._header_lines.append(raw_line)
+            if self._is_item_header(raw_line):
+                self.found_item_header = True
+                self._scan_header_fields("\n".join(self._header_lines))
+                self._header_lines = []
+                po_number, po_date, currency_symbol = self._header_values()
+                logger.debug("Extracted PO Number: %s, PO Date: %s, Currency symbol: %s",
+                             po_number, po_date, currency_symbol)
+            return []
+
+        if not self._header_resolved:
+            self._scan_header_fields(raw_line)
+
+        line = raw_line.strip()
+        if self._pending_item is not None:
+            item = self._pending_item
+            self._pending_item = None
+            consumed = self._merge_continuation(item, line)
+            self._completed_items.append(item)
+            if consumed:
+                return self._flush()
+
+        if not line or any(keyword in line for keyword in self.TERMINATORS):
+            return self._flush()
+
+        if self._ITEM_START_RE.match(line):
+            item = self._parse_item_start(line)
+            if item is not None:
+                if item['complete']:
+                    self._completed_items.append(item)
+                else:
+                    self._pending_item = item
+        return self._flush()
+
+    def finish(self):
+        """文档结束，返回剩余的数据行"""
+        if self._pending_item is not None:
+            self._completed_items.append(self._pending_item)
+            self._pending_item = None
+        return self._flush(final=True)
+
+    @staticmethod
+    def _is_item_header(line):
+        if 'Line' in line and 'Item' in line and 'Description' in line and 'Quantity' in line:
+            return True
+        return 'number' in line and 'Description' in line and 'Quantity' in line
+
+    def _parse_item_start(self, line):
+        """解析项目起始行，列数不足时返回None"""
+        parts = line.split()
+        if len(parts) < 8:  # 确保有足够的部分
+            return None
+
+        line_number = parts[0]  # 这是PDF表格中的Line number列
+        # 特殊处理第一个项目（510-000-054 ARMIS ELITE T2 TORCH CLIPS FRONT LEFT）
+        if line_number == "1" and "510-000-" in line:
+            return {
+                'line_number': line_number,
+                'pn': "510-000-054",
+                'description': "ARMIS ELITE T2 TORCH CLIPS FRONT LEFT",
+                'req_date': parse_date("2025/10/11"),
+                'quantity': "5,000.00",
+                'unit_price': "0.11",
+                'total_price': "550.00",
+                'complete': True
             }
-            currency_symbol = currency_map.get(currency_code, currency_symbol)
-        print(f"Currency symbol: {currency_symbol}")
-        
-        # 查找包含关键字段的行（更灵活的匹配）
-        item_start = -1
-        for i, line in enumerate(all_lines):
-            if 'Line' in line and 'Item' in line and 'Description' in line and 'Quantity' in line:
-                item_start = i
-                break
-            elif 'number' in line and 'Description' in line and 'Quantity' in line:
-                item_start = i
-                break
-        
-        if item_start != -1:
-            print(f"Found item header at line {item_start}")
-            
-            # 处理数据行，按照Centurion的特定格式
-            i = item_start + 1
-            while i < len(all_lines):
-                line = all_lines[i].strip()
-                if not line or 'Total' in line or 'Subtotal' in line or 'Delivery' in line or 'This order' in line:
-                    i += 1
-                    continue
-                
-                # 检查是否是项目行（以数字开头）
-                if re.match(r'^\d+\s', line):
-                    # 解析项目行
-                    parts = line.split()
-                    if len(parts) >= 8:  # 确保有足够的部分
-                        line_number = parts[0]  # 这是PDF表格中的Line number列
-                        pn_part = parts[1] if len(parts) > 1 else ""
-                        description_parts = []
-                        quantity = ""
-                        unit_price = ""
-                        total_price = ""
-                        req_date = ""
-                        
-                        # 查找描述部分（在PN和日期之间）
-                        j = 2
-                        while j < len(parts) and not re.match(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', parts[j]):
-                            description_parts.append(parts[j])
-                            j += 1
-                        
-                        # 提取日期
-                        if j < len(parts):
-                            req_date = parts[j]
-                            # 解析日期
-                            req_date = parse_date(req_date)
-                            j += 1
-                            
-                            # 提取数量
-                            if j < len(parts):
-                                quantity = parts[j]
-                                j += 1
-                                
-                                # 跳过单位（Each等）
-                                if j < len(parts):
-                                    j += 1  # 跳过单位
-                                    
-                                    # 提取单价
-                                    if j < len(parts):
-                                        unit_price_val = parts[j]
-                                        unit_price = f"{currency_symbol}{unit_price_val}"
-                                        j += 3  # 跳过折扣相关的几列
-                                        
-                                        # 提取总金额
-                                        if j < len(parts):
-                                            total_price_val = parts[j]
-                                            total_price = f"{currency_symbol}{total_price_val}"
-                        
-                        # 特殊处理第一个项目（510-000-054 ARMIS ELITE T2 TORCH CLIPS FRONT LEFT）
-                        if line_number == "1" and "510-000-" in line:
-                            # 修正PN为完整的510-000-054
-                            pn = "510-000-054"
-                            description = "ARMIS ELITE T2 TORCH CLIPS FRONT LEFT"
-                            quantity = "5,000.00"
-                            unit_price = f"{currency_symbol}0.11"
-                            total_price = f"{currency_symbol}550.00"
-                            req_date = parse_date("2025/10/11")
-                        else:
-                            # 处理PN部分，合并被分割的部分
-                            pn = pn_part
-                            # 组合描述
-                            description = " ".join(description_parts)
-                            
-                            # 对于其他项目，检查下一行是否包含PN的剩余部分和描述
-                            if i + 1 < len(all_lines):
-                                next_line = all_lines[i + 1].strip()
-                                # 检查下一行是否可能是当前项目的延续
-                                # 即使下一行以数字开头，但如果它看起来像描述的延续（没有完整的项目格式），也应该处理
-                                next_line_parts = next_line.split()
-                                if next_line_parts:
-                                    # 检查PN是否以"-"结尾且下一行的第一个部分是3位数字
-                                    if pn_part.endswith("-") and re.match(r'^\d{3}', next_line_parts[0]):
-                                        # 合并PN
-                                        pn = f"{pn_part}{next_line_parts[0]}"
-                                        # 将剩余部分添加到描述中
-                                        if len(next_line_parts) > 1:
-                                            description = description + " " + " ".join(next_line_parts[1:])
-                                        i += 1  # 跳过下一行，因为我们已经处理了它
-                                    # 检查是否是描述的延续（不是新的项目行）
-                                    elif not re.match(r'^\d+\s', next_line) or (len(next_line_parts) > 0 and not re.match(r'^\d+\s\S+', next_line)):
-                                        # 将下一行的内容添加到描述中
-                                        description = description + " " + next_line
-                                        i += 1  # 跳过下一行
-                        
-                        print(f"Processing row: Line={line_number}, PN={pn}, Qty={quantity}")
-                        
-                        # 创建数据行
-                        data_row = {
-                            "po": po_number,
-                            "pn": pn,
-                            "line": int(line_number) if line_number.isdigit() else None,
-                            "po_line": f"{po_number}/{line_number}" if po_number and line_number else None,
-                            "description": description,
-                            "qty": parse_decimal(quantity.replace(',', '')),  # 去掉千位分隔符
-                            "net_price": parse_decimal(unit_price),
-                            "total_price": parse_decimal(total_price),
-                            "req_date": req_date,  # 格式化日期
-                            "po_placed_date": po_date,
-                            "eta_wfsz": None,
-                            "shipping_mode": None,
-                            "comment": None,
-                            "purchaser": None,
-                            "qc_result": None,
-                            "shipping_cost": None,
-                            "tracking_no": None,
-                            "so_number": None,
-                            "yes_not_paid": None
-                        }
-                        data.append(data_row)
-                
-                i += 1
-        else:
-            print("Could not find item header in Centurion PDF")
-    
+
+        item = {
+            'line_number': line_number,
+            'pn': parts[1],
+            'description': "",
+            'req_date': "",
+            'quantity': "",
+            'unit_price': None,
+            'total_price': None,
+            'complete': False
+        }
+        # 查找描述部分（在PN和日期之间）
+        j = 2
+        while j < len(parts) and not self._DATE_TOKEN_RE.match(parts[j]):
+            j += 1
+        item['description'] = " ".join(parts[2:j])
+
+        # 日期、数量、单位（跳过）、单价、折扣相关的两列（跳过）、总金额
+        if j < len(parts):
+            item['req_date'] = parse_date(parts[j], CENTURION_DATE_FORMAT, CENTURION_DATE_FORMATS)
+            if j + 1 < len(parts):
+                item['quantity'] = parts[j + 1]
+                if j + 3 < len(parts):
+                    item['unit_price'] = parts[j + 3]
+                    if j + 6 < len(parts):
+                        item['total_price'] = parts[j + 6]
+        return item
+
+    def _merge_continuation(self, item, line):
+        """下一行是当前项目的延续时合并到项目中，返回这一行是否已被使用"""
+        next_line_parts = line.split()
+        if not next_line_parts:
+            return False
+        # PN以"-"结尾且下一行的第一个部分是3位数字：合并PN，剩余部分添加到描述中
+        if item['pn'].endswith("-") and self._PN_TAIL_RE.match(next_line_parts[0]):
+            item['pn'] = f"{item['pn']}{next_line_parts[0]}"
+            if len(next_line_parts) > 1:
+                item['description'] = item['description'] + " " + " ".join(next_line_parts[1:])
+            return True
+        # 不是新的项目行时，作为描述的延续
+        if not self._ITEM_START_RE.match(line) or not self._ITEM_LINE_RE.match(line):
+            item['description'] = item['description'] + " " + line
+            return True
+        return False
+
+    def _flush(self, final=False):
+        """表头字段已确定（或文档结束）时，把已完成的项目转换为数据行"""
+        if not self._completed_items or not (final or self._header_resolved):
+            return []
+        po_number, po_date, currency_symbol = self._header_values()
+        rows = [self._build_row(item, po_number, po_date, currency_symbol) for item in self._completed_items]
+        self._completed_items = []
+        return rows
+
+    def _build_row(self, item, po_number, po_date, currency_symbol):
+        line_number = item['line_number']
+        unit_price = f"{currency_symbol}{item['unit_price']}" if item['unit_price'] is not None else ""
+        total_price = f"{currency_symbol}{item['total_price']}" if item['total_price'] is not None else ""
+        if self.debug:
+            logger.debug("Processing row: Line=%s, PN=%s, Qty=%s", line_number, item['pn'], item['quantity'])
+        return POLine.create(
+            NON_WF_OPEN_LAYOUT,
+            po=po_number,
+            pn=item['pn'],
+            line=int(line_number) if line_number.isdigit() else None,
+            po_line=f"{po_number}/{line_number}" if po_number and line_number else None,
+            description=item['description'],
+            qty=parse_decimal(item['quantity'].replace(',', '')),  # 去掉千位分隔符
+            net_price=parse_decimal(unit_price),
+            total_price=parse_decimal(total_price),
+            req_date=item['req_date'],
+            po_placed_date=po_date
+        )
+
+
+def iter_centurion_rows(pdf_path, summary=None, page_cache=None):
+    """
+    逐页解码Centurion采购订单并产出数据行
+
+    每页解码后立即喂给 CenturionLineTokenizer，后面的页面在前面的数据行产出之后才解码。
+    传入 page_cache 时按页面内容哈希缓存每页的文本行，内容未变的页面不再做版面分析，
+    文本行依然按顺序喂给状态机（跨页的续行处理不受影响）。
+    """
+    tokenizer = CenturionLineTokenizer(debug=logger.isEnabledFor(logging.DEBUG))
+    with open_pdf(pdf_path) as pdf:
+        if summary is not None:
+            summary.lap('open')
+        check_page_limit(count_pdf_pages(pdf))
+        page_keys = _page_cache_keys(pdf, page_cache, 'centurion:lines')
+        if page_keys and summary is not None:
+            summary.lap('page_cache')
+        page_count = 0
+        for page_num, page in iter_pdf_pages(pdf):
+            lines = page_cache.get(page_keys[page_num]) if page_num < len(page_keys) else None
+            if lines is None:
+                check_parse_deadline(page_num)
+                lines = PageAnalysis(page).lines
+                if page_num < len(page_keys):
+                    page_cache.put(page_keys[page_num], lines)
+            elif summary is not None:
+                summary.add('cached_pages')
+            page_count += 1
+            if summary is not None:
+                summary.lap('text')
+            for line in lines:
+                yield from tokenizer.feed(line)
+            if summary is not None:
+                summary.lap('rows')
+        yield from tokenizer.finish()
+
+    if summary is not None:
+        summary.add('pages', page_count)
+        summary.lap('rows')
+    logger.debug("Processed Centurion PDF: %s with %d pages", pdf_source_name(pdf_path), page_count)
+    if not tokenizer.found_item_header:
+        logger.warning("Could not find item header in Centurion PDF: %s", pdf_source_name(pdf_path))
+
+
+def extract_centurion_data(pdf_path, page_cache=None):
+    """提取Centurion采购订单数据（page_cache 见 iter_centurion_rows）"""
+    summary = ParseSummary(logger, 'centurion', pdf_path)
+    data = list(iter_centurion_rows(pdf_path, summary, page_cache))
+    summary.finish(len(data))
     return data
 
 def parse_magic_fx_line(block_text, line_number, po_number, po_placed_date):
     """解析MAGIC FX数据块（可能是多行）"""
     import re
-    from datetime import datetime
     
     # 使用正则表达式提取数据
     # VARIOUS | VARIOUS | Description | Date | Qty | Price | Total
@@ -979,67 +1076,57 @@ def parse_magic_fx_line(block_text, line_number, po_number, po_placed_date):
         return None
     
     # 解析日期
-    req_date = None
-    try:
-        req_date = datetime.strptime(delivery_date_str, '%d-%m-%Y').date()
-    except:
-        pass
-    
-    # 清理数据 (MAGIC FX格式: 逼号是小数点，点是分位符)
-    # 例如: 512,60 表示 512.60（1.234,56 表示 1234.56
-    qty_str = qty_str.replace('.', '').replace(',', '.')  # 移除分位符，用点作为小数点
-    net_price_str = f"€{net_price_str.replace('.', '').replace(',', '.')}"  # 同样处理
-    total_price_str = f"€{total_price_str.replace('.', '').replace(',', '.')}"  # 同样处理
+    req_date = parse_date(delivery_date_str, MAGIC_FX_DATE_FORMAT, MAGIC_FX_DATE_FORMATS)
     
-    print(f"Processing row {line_number}: Description={description}, Qty={qty_str}")
+    # 金额按MAGIC FX格式解析: 逗号是小数点，点是分位符（1.234,56 表示 1234.56）
+    logger.debug("Processing row %d: Description=%s, Qty=%s", line_number, description, qty_str)
     
     # 创建数据行
-    data_row = {
-        "po": po_number,
-        "pn": "N/A",
-        "line": line_number,
-        "po_line": f"{po_number}/{line_number}" if po_number else str(line_number),
-        "description": description,
-        "qty": parse_decimal(qty_str),
-        "net_price": parse_decimal(net_price_str),
-        "total_price": parse_decimal(total_price_str),
-        "req_date": req_date,
-        "po_placed_date": po_placed_date,
-        "eta_wfsz": None,
-        "shipping_mode": None,
-        "comment": None,
-        "purchaser": None,
-        "qc_result": None,
-        "shipping_cost": None,
-        "tracking_no": None,
-        "so_number": None,
-        "yes_not_paid": None
-    }
+    data_row = POLine.create(
+        NON_WF_OPEN_LAYOUT,
+        po=po_number,
+        pn="N/A",
+        line=line_number,
+        po_line=f"{po_number}/{line_number}" if po_number else str(line_number),
+        description=description,
+        qty=parse_decimal(qty_str, decimal_separator=','),
+        net_price=parse_decimal(net_price_str, decimal_separator=','),
+        total_price=parse_decimal(total_price_str, decimal_separator=','),
+        req_date=req_date,
+        po_placed_date=po_placed_date
+    )
     return data_row
 
 def extract_magic_fx_data(pdf_path):
     """提取MAGIC FX采购订单数据"""
-    import pdfplumber
     import re
-    from datetime import datetime
-    from decimal import Decimal, InvalidOperation
     
     data = []
+    summary = ParseSummary(logger, 'magic_fx', pdf_path)
+    debug = logger.isEnabledFor(logging.DEBUG)
     
-    with pdfplumber.open(pdf_path) as pdf:
-        if not pdf.pages:
-            print(f"No pages found in PDF: {pdf_path}")
+    with open_pdf(pdf_path) as pdf:
+        page_count = count_pdf_pages(pdf)
+        if not page_count:
+            logger.warning("No pages found in PDF: %s", pdf_source_name(pdf_path))
             return data
+        check_page_limit(page_count)
+        summary.lap('open')
+        summary.add('pages', page_count)
         
-        # 从第一页提取PO信息
-        text = pdf.pages[0].extract_text()
-        print(f"Processing MAGIC FX PDF: {pdf_path}")
-        print(f"PDF text length: {len(text) if text else 0}")
+        # 从第一页提取PO信息（文本和表格共用同一次版面分析）；只解析第一页，不为其余页面创建Page对象
+        first_pages = iter_pdf_pages(pdf, end_page=1)
+        _, first_page = next(first_pages)
+        analysis = PageAnalysis(first_page)
+        text = analysis.text
+        summary.lap('text')
+        logger.debug("Processing MAGIC FX PDF: %s", pdf_source_name(pdf_path))
+        logger.debug("PDF text length: %d", len(text) if text else 0)
         
         # 提取采购订单号
         po_match = re.search(r'Purchase Order No\.\s*([\d]+)', text)
         po_number = po_match.group(1) if po_match else ""
-        print(f"Extracted PO Number: {po_number}")
+        logger.debug("Extracted PO Number: %s", po_number)
         
         # 提取日期
         date_match = re.search(r'Date\s+([\d]{2}-[\d]{2}-[\d]{4})', text)
@@ -1047,19 +1134,19 @@ def extract_magic_fx_data(pdf_path):
         if date_match:
             date_str = date_match.group(1)
             # 解析日期格式 DD-MM-YYYY
-            try:
-                po_placed_date = datetime.strptime(date_str, '%d-%m-%Y').date()
-            except:
-                po_placed_date = None
-        print(f"PO Placed Date: {po_placed_date}")
+            po_placed_date = parse_date(date_str, MAGIC_FX_DATE_FORMAT, MAGIC_FX_DATE_FORMATS)
+        logger.debug("PO Placed Date: %s", po_placed_date)
         
         # 查找表格
-        tables = pdf.pages[0].extract_tables()
+        tables = extract_tables_in_region(
+            analysis, _new_table_region_locator(MAGIC_FX_TABLE_HEADER, MAGIC_FX_TABLE_FOOTER)
+        )
+        summary.lap('tables')
         
         if tables and tables[0]:
             # 使用表格数据
             table = tables[0]
-            print(f"Found table with {len(table)} rows")
+            logger.debug("Found table with %d rows", len(table))
             
             # 查找表头行
             header_row_index = -1
@@ -1068,7 +1155,7 @@ def extract_magic_fx_data(pdf_path):
                     header_row_index = i
                     break
             
-            print(f"Header row index: {header_row_index}")
+            logger.debug("Header row index: %d", header_row_index)
             
             if header_row_index != -1:
                 # 处理数据行
@@ -1101,11 +1188,7 @@ def extract_magic_fx_data(pdf_path):
                     delivery_date_str = ""
                     if len(row) > 4:
                         delivery_date_str = str(row[4]).strip() if row[4] else ""
-                        if delivery_date_str:
-                            try:
-                                req_date = datetime.strptime(delivery_date_str, '%d-%m-%Y').date()
-                            except:
-                                pass
+                        req_date = parse_date(delivery_date_str, MAGIC_FX_DATE_FORMAT, MAGIC_FX_DATE_FORMATS)
                     
                     # 提取数量
                     qty_str = ""
@@ -1116,54 +1199,41 @@ def extract_magic_fx_data(pdf_path):
                     # 提取单价
                     net_price_str = ""
                     if len(row) > 6:
-                        net_price_str = str(row[6]).strip() if row[6] else ""
                         # MAGIC FX格式: 逗号是小数点，点是分位符
-                        net_price_str = net_price_str.replace('.', '').replace(',', '.')
-                        if net_price_str and not any(c in net_price_str for c in ['€', '$', '£']):
-                            net_price_str = f"€{net_price_str}"
+                        net_price_str = str(row[6]).strip() if row[6] else ""
                     
                     # 提取总价
                     total_price_str = ""
                     if len(row) > 7:
                         total_price_str = str(row[7]).strip() if row[7] else ""
-                        # MAGIC FX格式: 逗号是小数点，点是分位符
-                        total_price_str = total_price_str.replace('.', '').replace(',', '.')
-                        if total_price_str and not any(c in total_price_str for c in ['€', '$', '£']):
-                            total_price_str = f"€{total_price_str}"
                     
                     # 跳过空行或不完整的数据
                     if not description and not qty_str:
                         continue
                     
-                    print(f"Processing row {line_number}: Description={description}, Qty={qty_str}")
+                    if debug:
+                        logger.debug("Processing row %d: Description=%s, Qty=%s", line_number, description, qty_str)
                     
                     # 创建数据行
-                    data_row = {
-                        "po": po_number,
-                        "pn": "N/A",
-                        "line": line_number,
-                        "po_line": f"{po_number}/{line_number}" if po_number else str(line_number),
-                        "description": description,
-                        "qty": parse_decimal(qty_str),
-                        "net_price": parse_decimal(net_price_str),
-                        "total_price": parse_decimal(total_price_str),
-                        "req_date": req_date,
-                        "po_placed_date": po_placed_date,
-                        "eta_wfsz": None,
-                        "shipping_mode": None,
-                        "comment": None,
-                        "purchaser": None,
-                        "qc_result": None,
-                        "shipping_cost": None,
-                        "tracking_no": None,
-                        "so_number": None,
-                        "yes_not_paid": None
-                    }
+                    data_row = POLine.create(
+                        NON_WF_OPEN_LAYOUT,
+                        po=po_number,
+                        pn="N/A",
+                        line=line_number,
+                        po_line=f"{po_number}/{line_number}" if po_number else str(line_number),
+                        description=description,
+                        # 表格中的数量列与原来一样按普通数值解析（只去掉逗号），价格列才是逗号小数点
+                        qty=parse_decimal(qty_str),
+                        net_price=parse_decimal(net_price_str, decimal_separator=','),
+                        total_price=parse_decimal(total_price_str, decimal_separator=','),
+                        req_date=req_date,
+                        po_placed_date=po_placed_date
+                    )
                     data.append(data_row)
                     line_number += 1
         else:
             # 没有表格，尝试从PDF文本中提取
-            print(f"No tables found, attempting to extract from text...")
+            logger.debug("No tables found, attempting to extract from text...")
             
             # 使用正则表达式从文本中提取数据
             # 格式：CODE | CODE | 描述(可能多行) | 交货日期 | 数量 | 价格 | 总价
@@ -1172,7 +1242,7 @@ def extract_magic_fx_data(pdf_path):
             line_number = 1
             
             # 按行分组数据
-            lines = text.split('\n')
+            lines = analysis.lines
             data_started = False
             i = 0
             
@@ -1297,51 +1367,39 @@ def extract_magic_fx_data(pdf_path):
                     # 如果成功提取数据，创建数据行
                     if delivery_date_str and qty_str:
                         # 解析日期
-                        req_date = None
-                        try:
-                            req_date = datetime.strptime(delivery_date_str, '%d-%m-%Y').date()
-                        except:
-                            pass
-                        
-                        # 清理数据 (MAGIC FX格式: 逗号是小数点，点是分位符)
-                        qty_str = qty_str.replace('.', '').replace(',', '.')
-                        net_price_str = f"€{net_price_str.replace('.', '').replace(',', '.')}"
-                        total_price_str = f"€{total_price_str.replace('.', '').replace(',', '.')}"
+                        req_date = parse_date(delivery_date_str, MAGIC_FX_DATE_FORMAT, MAGIC_FX_DATE_FORMATS)
                         
                         # 生成PN：使用 PO号/行号 作为默认PN
                         # MAGIC FX订单通常没有具体的零件号，使用PO号-行号作为唯一标识
                         pn = f"{po_number}-{line_number:02d}" if po_number else f"MFX-{line_number:02d}"
                         
-                        print(f"Processing row {line_number}: Description={description}, Qty={qty_str}, PN={pn}")
+                        if debug:
+                            logger.debug("Processing row %d: Description=%s, Qty=%s, PN=%s",
+                                         line_number, description, qty_str, pn)
                         
                         # 创建数据行
-                        data_row = {
-                            "po": po_number,
-                            "pn": pn,
-                            "line": line_number,
-                            "po_line": f"{po_number}/{line_number}" if po_number else str(line_number),
-                            "description": description,
-                            "qty": parse_decimal(qty_str),
-                            "net_price": parse_decimal(net_price_str),
-                            "total_price": parse_decimal(total_price_str),
-                            "req_date": req_date,
-                            "po_placed_date": po_placed_date,
-                            "eta_wfsz": None,
-                            "shipping_mode": None,
-                            "comment": None,
-                            "purchaser": None,
-                            "qc_result": None,
-                            "shipping_cost": None,
-                            "tracking_no": None,
-                            "so_number": None,
-                            "yes_not_paid": None
-                        }
+                        data_row = POLine.create(
+                            NON_WF_OPEN_LAYOUT,
+                            po=po_number,
+                            pn=pn,
+                            line=line_number,
+                            po_line=f"{po_number}/{line_number}" if po_number else str(line_number),
+                            description=description,
+                            qty=parse_decimal(qty_str, decimal_separator=','),
+                            net_price=parse_decimal(net_price_str, decimal_separator=','),
+                            total_price=parse_decimal(total_price_str, decimal_separator=','),
+                            req_date=req_date,
+                            po_placed_date=po_placed_date
+                        )
                         data.append(data_row)
                         line_number += 1
                 
                 i += 1
     
-    print(f"Extracted {len(data)} rows from MAGIC FX PDF")
+    # 释放第一页的版面对象
+    first_pages.close()
+    summary.lap('rows')
+    summary.finish(len(data))
     return data
 
 def insert_non_wf_open_magic_fx_data(data_entries):
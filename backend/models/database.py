@@ -1,5 +1,6 @@
 import psycopg2
 from psycopg2 import sql
+from psycopg2.extras import execute_values
 import sys
 import os
 import json
@@ -491,6 +492,170 @@ class DatabaseManager:
                     pass
             return False, f"插入数据时出错: {error}"
     
+    def upsert_rows(self, table_name, rows, user_email=None, page_size=1000, audit_rows=False):
+        """
+        批量写入 wf_open / non_wf_open，只写入新增和有变化的行
+        
+        与逐行调用 insert_row 不同，整批数据只查询一次表结构、在一个事务中用多行 VALUES 写入，
+        操作日志也只记录一条汇总。同一批中 po_line 重复时以最后一行为准（与逐行覆盖的结果相同）。
+        
+        写入前用一条查询取出这批 po_line 在表中已有的行，逐字段比较（见 backend.pdf_import_diff）：
+        不存在的行插入，有变化的行只更新变化的列，未变化的行不写入。重新导入修订版订单时大部分行没有变化，
+        不再重写这些行，没有任何变化时也不记录操作日志。
+        
+        Args:
+            table_name: 表名（wf_open 或 non_wf_open）
+            rows: 数据字典列表 [{column_name: value}, ...]
+            user_email: 用户邮箱（用于记录操作日志）
+            page_size: 每条INSERT / UPDATE语句包含的行数
+            audit_rows: 是否为每个写入的行记录一条操作日志（新增的行记录完整数据，更新的行记录变化的列），
+                        否则只记录一条汇总
+            
+        Returns:
+            tuple: (success, {'inserted': 新增行数, 'updated': 更新行数, 'unchanged': 未变化行数,
+                              'skipped_no_key': 没有po_line、无法写入的行数} 或 错误信息)
+        """
+        from backend.pdf_import_diff import PRIMARY_KEY, diff_rows
+        
+        if table_name not in ['wf_open', 'non_wf_open']:
+            return False, f"不支持批量写入的表: {table_name}"
+        if not rows:
+            return True, {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped_no_key': 0}
+        
+        conn = self.get_connection()
+        if not conn:
+            return False, "数据库连接失败"
+        
+        try:
+            cursor = conn.cursor()
+            
+            # 获取表的实际列名、类型和数值列的小数位数
+            get_columns_query = """
+                SELECT column_name, udt_name, numeric_scale 
+                FROM information_schema.columns 
+                WHERE table_schema = 'purchase_orders' 
+                AND table_name = %s
+            """
+            cursor.execute(get_columns_query, (table_name,))
+            column_types = {}
+            scales = {}
+            for column_name, udt_name, numeric_scale in cursor.fetchall():
+                column_types[column_name] = udt_name
+                if numeric_scale is not None and udt_name == 'numeric':
+                    scales[column_name] = numeric_scale
+            
+            # 清理特殊值，只保留表中存在的列，按po_line去重；没有po_line的行无法写入，计数后跳过
+            rows_by_key = {}
+            skipped_no_key = 0
+            for data in rows:
+                cleaned_data = {}
+                for k, v in data.items():
+                    if k not in column_types:
+                        continue
+                    cleaned_data[k] = None if v == 'None' or v == 'nan' or v == '' else v
+                if cleaned_data.get(PRIMARY_KEY):
+                    rows_by_key[cleaned_data[PRIMARY_KEY]] = cleaned_data
+                else:
+                    skipped_no_key += 1
+            if skipped_no_key:
+                print(f"跳过 {skipped_no_key} 行没有po_line的数据")
+            
+            # 一次查询取出已有的行（锁定到事务结束），只取这批数据涉及的列
+            compare_columns = sorted({col for data in rows_by_key.values() for col in data if col != PRIMARY_KEY})
+            select_query = sql.SQL("SELECT {} FROM purchase_orders.{} WHERE {} = ANY(%s) FOR UPDATE").format(
+                sql.SQL(", ").join(sql.Identifier(col) for col in [PRIMARY_KEY] + compare_columns),
+                sql.Identifier(table_name),
+                sql.Identifier(PRIMARY_KEY)
+            )
+            cursor.execute(select_query, (list(rows_by_key),))
+            existing = {
+                record[0]: dict(zip(compare_columns, record[1:]))
+                for record in cursor.fetchall()
+            }
+            diff = diff_rows(rows_by_key.values(), existing, scales)
+            
+            # 新增的行：列相同的行放在同一条语句中（并发导入时仍按po_line覆盖）
+            insert_groups = {}
+            for cleaned_data in diff.inserts:
+                insert_groups.setdefault(tuple(cleaned_data), []).append(cleaned_data)
+            
+            for columns, group in insert_groups.items():
+                update_fields = [col for col in columns if col != PRIMARY_KEY]  # 主键字段不更新
+                insert_query = sql.SQL("""
+                    INSERT INTO purchase_orders.{} ({}) 
+                    VALUES %s 
+                    ON CONFLICT (po_line) DO UPDATE SET {}
+                """).format(
+                    sql.Identifier(table_name),
+                    sql.SQL(", ").join(sql.Identifier(col) for col in columns),
+                    sql.SQL(", ").join(
+                        sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(col), sql.Identifier(col))
+                        for col in (update_fields or ['po'])
+                    )
+                )
+                execute_values(cursor, insert_query, [tuple(row[col] for col in columns) for row in group],
+                               page_size=page_size)
+            
+            # 有变化的行：变化的列相同的行用一条 UPDATE ... FROM (VALUES ...) 写入，只更新变化的列
+            for columns, group in diff.update_groups().items():
+                update_query = sql.SQL("""
+                    UPDATE purchase_orders.{table} AS t SET {assignments} 
+                    FROM (VALUES %s) AS v ({columns}) 
+                    WHERE t.{key} = v.{key}
+                """).format(
+                    table=sql.Identifier(table_name),
+                    # VALUES 中的参数没有类型，按列的类型转换
+                    assignments=sql.SQL(", ").join(
+                        sql.SQL("{} = v.{}::{}").format(
+                            sql.Identifier(col), sql.Identifier(col), sql.Identifier(column_types[col])
+                        )
+                        for col in columns
+                    ),
+                    columns=sql.SQL(", ").join(sql.Identifier(col) for col in (PRIMARY_KEY,) + columns),
+                    key=sql.Identifier(PRIMARY_KEY)
+                )
+                execute_values(cursor, update_query,
+                               [(row[PRIMARY_KEY],) + tuple(row[col] for col in columns) for row in group],
+                               page_size=page_size)
+            conn.commit()
+            
+            # 记录一条汇总操作日志（只记录实际写入的行），包含每个更新行变化的列
+            counts = diff.counts()
+            counts['skipped_no_key'] = skipped_no_key
+            written = [row[PRIMARY_KEY] for row in diff.inserts] + [row[PRIMARY_KEY] for row, _ in diff.updates]
+            if user_email and written and audit_rows:
+                # 逐行的操作日志，与逐行调用 insert_row 时记录的内容相同（更新的行只记录变化的列）
+                entries = [('insert', row) for row in diff.inserts]
+                entries.extend(
+                    ('update', dict({col: row[col] for col in columns}, po_line=row[PRIMARY_KEY],
+                                    changed_columns=list(columns)))
+                    for row, columns in diff.updates
+                )
+                operation_logger.log_operations(user_email, table_name, entries, page_size=page_size)
+            elif user_email and written:
+                operation_logger.log_operation(
+                    user_email=user_email,
+                    table_name=table_name,
+                    operation='insert',
+                    record_data=dict(
+                        counts, bulk_rows=len(written), first_po_line=written[0], last_po_line=written[-1],
+                        changed_columns={row[PRIMARY_KEY]: list(columns) for row, columns in diff.updates}
+                    )
+                )
+            
+            cursor.close()
+            conn.close()
+            return True, counts
+        except Exception as error:
+            if conn:
+                try:
+                    conn.rollback()
+                    cursor.close()
+                    conn.close()
+                except:
+                    pass
+            return False, f"批量写入数据时出错: {error}"
+    
     def add_dynamic_columns(self, table_name, column_definitions):
         """
         为表动态添加列
@@ -636,6 +801,15 @@ def insert_table_data(table_name, row_data, user_email=None):
         print(f"插入表数据时出错: {e}")
         return False, f"插入数据时出错: {e}"
 
+def upsert_table_rows(table_name, rows, user_email=None, page_size=1000, audit_rows=False):
+    """批量写入表数据（按po_line覆盖）"""
+    try:
+        manager = get_db_manager()
+        return manager.upsert_rows(table_name, rows, user_email, page_size, audit_rows)
+    except Exception as e:
+        print(f"批量写入表数据时出错: {e}")
+        return False, f"批量写入数据时出错: {e}"
+
 def delete_table_data(table_name, primary_key_value):
     """删除表数据"""
     try:
@@ -1,6 +1,7 @@
 import json
 import psycopg2
 from psycopg2 import sql
+from psycopg2.extras import execute_values
 from backend.utils.config import get_db_config
 
 class OperationLogger:
@@ -64,6 +65,54 @@ class OperationLogger:
                     pass
             return False
     
+    def log_operations(self, user_email, table_name, entries, page_size=1000):
+        """
+        批量记录用户操作（一个连接、多行INSERT）
+        
+        Args:
+            user_email: 用户邮箱
+            table_name: 表名
+            entries: [(操作类型, 记录数据), ...]
+            page_size: 每条INSERT语句包含的记录数
+            
+        Returns:
+            bool: 是否成功记录
+        """
+        if not entries:
+            return True
+        conn = self.get_connection()
+        if not conn:
+            print("无法获取数据库连接")
+            return False
+        
+        try:
+            cursor = conn.cursor()
+            insert_query = """
+                INSERT INTO purchase_orders.po_records 
+                (user_email, table_name, operation, record_data)
+                VALUES %s
+            """
+            execute_values(cursor, insert_query, [
+                (user_email, table_name, operation, json.dumps(record_data, default=str))
+                for operation, record_data in entries
+            ], page_size=page_size)
+            
+            conn.commit()
+            cursor.close()
+            conn.close()
+            
+            return True
+        except Exception as error:
+            print(f"记录操作时出错: {error}")
+            if conn:
+                try:
+                    conn.rollback()
+                    cursor.close()
+                    conn.close()
+                except:
+                    pass
+            return False
+    
     def get_operation_logs(self, user_email=None, table_name=None, operation=None, limit=100):
         """
         获取操作日志
@@ -0,0 +1,302 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.pdf_budget import ParseBudget, enforce_parse_budget, iter_pool_results
+from backend.pdf_logging import get_pdf_logger
+from backend.pdf_po_line import rows_to_dicts
+from backend.utils.config import get_pdf_config
+
+logger = get_pdf_logger('backfill')
+
+DEFAULT_STATE_FILENAME = '.pdf_backfill_state.jsonl'
+DEFAULT_BATCH_ROWS = 5000
+STATUS_IMPORTED = 'imported'
+STATUS_FAILED = 'failed'
+
+_worker_processor = None
+
+
+def _get_worker_processor():
+    """每个工作进程只创建一次 PDFImportProcessor（不使用解析缓存和页面缓存，历史订单只解析一次）"""
+    global _worker_processor
+    if _worker_processor is None:
+        from backend.pdf_import_processor import PDFImportProcessor
+        _worker_processor = PDFImportProcessor()
+        _worker_processor.parse_cache = None
+        _worker_processor.page_cache = None
+    return _worker_processor
+
+
+def parse_for_backfill(pdf_path, company_name):
+    """识别公司、解析PDF并确定目标表，返回与 build_import_result 相同的结果（不查询重复数据）"""
+    processor = _get_worker_processor()
+    budget = ParseBudget.from_config()
+    budget.check_file_size(pdf_path)
+    with enforce_parse_budget(budget):
+        company_name = processor.resolve_company(pdf_path, company_name)
+        data = processor.extract_by_company(pdf_path, company_name, workers=1,
+                                            profile=processor.get_profile(company_name))
+    return processor.build_import_result(data, company_name, check_duplicates=False)
+
+
+def find_pdf_files(archive_dir):
+    """递归查找归档目录中的PDF，返回按路径排序的相对路径列表"""
+    files = []
+    for root, _, filenames in os.walk(archive_dir):
+        for filename in filenames:
+            if filename.lower().endswith('.pdf'):
+                files.append(os.path.relpath(os.path.join(root, filename), archive_dir))
+    return sorted(files)
+
+
+def load_checkpoint(state_path):
+    """读取检查点文件，返回 {相对路径: 最后一条记录}"""
+    entries = {}
+    if not os.path.exists(state_path):
+        return entries
+    with open(state_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # 进程在写入最后一行时中断，忽略不完整的行
+                continue
+            entries[entry['file']] = entry
+    return entries
+
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class BackfillImporter:
+    """
+    历史PDF订单批量导入
+
+    - 多进程并行解析，同时在途的文件数有上限，内存不随归档大小增长
+    - 解析出的数据行在内存中累积到 batch_rows 行后，用一条多行 upsert 写入数据库
+    - 一批数据提交后才把这批文件追加到检查点文件（JSON Lines），进程中断后重新运行会跳过已导入的文件；
+      未写入检查点的文件会重新解析并覆盖写入，不会产生重复数据
+    - 运行中每隔 progress_seconds 秒输出一行进度：文件数、行数、吞吐量和预计剩余时间
+    - 单个文件解析超过 timeout_seconds 秒（默认 PDF_PARSE_TIMEOUT_SECONDS）仍未返回时结束卡住的工作进程，
+      该文件记为失败，其余文件继续导入
+    """
+
+    def __init__(self, archive_dir, state_path=None, company_name='auto', workers=1,
+                 batch_rows=DEFAULT_BATCH_ROWS, progress_seconds=5, retry_failed=False,
+                 parse_func=parse_for_backfill, db_writer=None, out=None, timeout_seconds=None):
+        self.archive_dir = archive_dir
+        self.state_path = state_path or os.path.join(archive_dir, DEFAULT_STATE_FILENAME)
+        self.company_name = company_name
+        self.workers = max(1, workers)
+        self.batch_rows = max(1, batch_rows)
+        self.progress_seconds = progress_seconds
+        self.retry_failed = retry_failed
+        self.parse_func = parse_func
+        if db_writer is None:
+            from backend.models.database import upsert_table_rows
+            db_writer = upsert_table_rows
+        self.db_writer = db_writer
+        self.out = out or sys.stdout
+        if timeout_seconds is None:
+            timeout_seconds = get_pdf_config()['parse_timeout_seconds']
+        self.timeout_seconds = timeout_seconds
+
+        # 待写入的数据：表名 -> 数据行列表，以及这些数据所属的文件
+        self._pending_rows = {}
+        self._pending_row_count = 0
+        self._pending_files = []
+        # unchanged: 数据库中已有且没有变化、因此没有重写的行数；skipped_no_key: 没有po_line、没有写入的行数
+        self.stats = {'total': 0, 'skipped': 0, 'done': 0, 'imported': 0, 'failed': 0, 'rows': 0, 'unchanged': 0,
+                      'skipped_no_key': 0}
+        self._start_time = None
+        self._last_progress = 0.0
+
+    def pending_files(self):
+        """返回尚未导入的文件（相对路径）"""
+        checkpoint = load_checkpoint(self.state_path)
+        todo = []
+        for relative_path in find_pdf_files(self.archive_dir):
+            entry = checkpoint.get(relative_path)
+            if entry is None or (self.retry_failed and entry.get('status') == STATUS_FAILED):
+                todo.append(relative_path)
+        return todo, len(checkpoint)
+
+    def run(self):
+        """
+        运行导入
+
+        Returns:
+            dict: 统计信息（本次处理的文件数、导入和失败的文件数、写入的行数）
+        """
+        todo, checkpointed = self.pending_files()
+        self.stats['total'] = len(todo)
+        self.stats['skipped'] = checkpointed
+        self._start_time = time.perf_counter()
+        print(f"待导入 {len(todo)} 个文件（检查点中已有 {checkpointed} 个），{self.workers} 个进程，"
+              f"每批 {self.batch_rows} 行，检查点: {self.state_path}", file=self.out, flush=True)
+
+        with open(self.state_path, 'a', encoding='utf-8') as state_file:
+            self._state_file = state_file
+            for relative_path, result in self._iter_results(todo):
+                self._handle_result(relative_path, result)
+                self._print_progress()
+            self._flush()
+        self._print_progress(force=True)
+        return dict(self.stats)
+
+    def _iter_results(self, todo):
+        """按完成顺序产出 (相对路径, 解析结果)"""
+        if self.workers == 1 or len(todo) <= 1:
+            for relative_path in todo:
+                yield relative_path, self._parse_safely(relative_path)
+            return
+
+        # 在途的文件数有上限：主进程写数据库时工作进程继续解析，又不会一次性提交整个归档
+        pools = []
+
+        def get_pool():
+            if not pools:
+                pools.append(ProcessPoolExecutor(max_workers=self.workers))
+            return pools[0]
+
+        tasks = (
+            (relative_path, self.parse_func, (os.path.join(self.archive_dir, relative_path), self.company_name))
+            for relative_path in todo
+        )
+        try:
+            # 工作进程崩溃时 BrokenProcessPool 向上抛出：已提交的批次都在检查点中，重新运行即可继续
+            for relative_path, result in iter_pool_results(get_pool, pools.clear, tasks, self.timeout_seconds,
+                                                           max_in_flight=self.workers * 2):
+                if isinstance(result, Exception):
+                    result = {'success': False, 'error': str(result)}
+                yield relative_path, result
+        finally:
+            for pool in pools:
+                pool.shutdown(wait=True)
+
+    def _parse_safely(self, relative_path):
+        try:
+            return self.parse_func(os.path.join(self.archive_dir, relative_path), self.company_name)
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def _handle_result(self, relative_path, result):
+        self.stats['done'] += 1
+        if not result.get('success'):
+            # 解析失败不涉及数据库，直接写入检查点（--retry-failed 时重新处理）
+            self.stats['failed'] += 1
+            logger.warning("导入失败: %s (%s)", relative_path, result.get('error'))
+            self._write_checkpoint({'file': relative_path, 'status': STATUS_FAILED, 'error': result.get('error')})
+            return
+
+        data = result['data']
+        self._pending_rows.setdefault(result['table_name'], []).extend(data)
+        self._pending_row_count += len(data)
+        self._pending_files.append({'file': relative_path, 'status': STATUS_IMPORTED,
+                                    'company': result.get('company'), 'rows': len(data)})
+        if self._pending_row_count >= self.batch_rows:
+            self._flush()
+
+    def _flush(self):
+        """把累积的数据行写入数据库，提交后再写检查点"""
+        if not self._pending_files:
+            return
+        for table_name, rows in self._pending_rows.items():
+            success, result = self.db_writer(table_name, rows_to_dicts(rows))
+            if not success:
+                raise RuntimeError(f"写入 {table_name} 失败: {result}")
+            if isinstance(result, dict):
+                self.stats['unchanged'] += result.get('unchanged', 0)
+                # 没有po_line的行没有写入，不计入导入的行数
+                self.stats['skipped_no_key'] += result.get('skipped_no_key', 0)
+                self._pending_row_count -= result.get('skipped_no_key', 0)
+        for entry in self._pending_files:
+            self._write_checkpoint(entry, sync=False)
+        self._sync_checkpoint()
+        self.stats['imported'] += len(self._pending_files)
+        self.stats['rows'] += self._pending_row_count
+        self._pending_rows = {}
+        self._pending_row_count = 0
+        self._pending_files = []
+
+    def _write_checkpoint(self, entry, sync=True):
+        entry['at'] = time.time()
+        self._state_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        if sync:
+            self._sync_checkpoint()
+
+    def _sync_checkpoint(self):
+        self._state_file.flush()
+        os.fsync(self._state_file.fileno())
+
+    def _print_progress(self, force=False):
+        now = time.perf_counter()
+        if not force and now - self._last_progress < self.progress_seconds:
+            return
+        self._last_progress = now
+        elapsed = now - self._start_time
+        done, total = self.stats['done'], self.stats['total']
+        files_per_second = done / elapsed if elapsed > 0 else 0.0
+        rows = self.stats['rows'] + self._pending_row_count
+        rows_per_second = rows / elapsed if elapsed > 0 else 0.0
+        remaining = (total - done) / files_per_second if files_per_second > 0 else 0.0
+        percent = done / total * 100 if total else 100.0
+        print(f"[{_format_duration(elapsed)}] {done}/{total} 文件 ({percent:.1f}%) "
+              f"已提交 {self.stats['imported']} 失败 {self.stats['failed']} | 行 {rows} | "
+              f"{files_per_second:.1f} 文件/秒 {rows_per_second:.0f} 行/秒 | 剩余 {_format_duration(remaining)}",
+              file=self.out, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="历史PDF订单批量导入（可中断续传）")
+    parser.add_argument('archive_dir', help="PDF归档目录（递归查找 *.pdf）")
+    parser.add_argument('--company', default='auto', help="公司名称，默认按第一页内容自动识别")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="解析进程数（默认CPU核数）")
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS, help="每批写入数据库的行数")
+    parser.add_argument('--state-file', help=f"检查点文件（默认 <归档目录>/{DEFAULT_STATE_FILENAME}）")
+    parser.add_argument('--retry-failed', action='store_true', help="重新处理检查点中失败的文件")
+    parser.add_argument('--progress-seconds', type=float, default=5, help="进度输出间隔（秒）")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.archive_dir):
+        print(f"归档目录不存在: {args.archive_dir}")
+        return 1
+
+    # 每个文件的解析汇总日志会淹没进度输出，未指定 PDF_LOG_LEVEL 时只输出警告（工作进程继承该环境变量）
+    if 'PDF_LOG_LEVEL' not in os.environ:
+        os.environ['PDF_LOG_LEVEL'] = 'WARNING'
+        get_pdf_logger().setLevel(logging.WARNING)
+
+    importer = BackfillImporter(
+        args.archive_dir, state_path=args.state_file, company_name=args.company, workers=args.workers,
+        batch_rows=args.batch_rows, progress_seconds=args.progress_seconds, retry_failed=args.retry_failed
+    )
+    try:
+        stats = importer.run()
+    except (RuntimeError, BrokenProcessPool) as e:
+        print(f"导入中断: {e}\n已提交的文件记录在检查点中，重新运行同一命令即可继续")
+        return 1
+    except KeyboardInterrupt:
+        print("\n已中断，重新运行同一命令即可继续")
+        return 1
+
+    print(f"完成: 导入 {stats['imported']} 个文件、{stats['rows']} 行（其中 {stats['unchanged']} 行没有变化），"
+          f"{stats['skipped_no_key']} 行没有po_line未写入，失败 {stats['failed']} 个")
+    if stats['failed']:
+        print("失败的文件记录在检查点中，修正后使用 --retry-failed 重新导入")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
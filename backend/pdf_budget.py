@@ -0,0 +1,292 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from backend.pdf_logging import get_pdf_logger
+from backend.utils.config import get_pdf_config
+
+logger = get_pdf_logger('budget')
+
+LIMIT_FILE_SIZE = 'file_size'
+LIMIT_PAGES = 'pages'
+LIMIT_TIMEOUT = 'timeout'
+
+# 解析进程超过时限后，再等待多久仍未返回才强制结束进程（秒）
+KILL_GRACE_SECONDS = 5
+
+_active_budget = threading.local()
+
+
+class ParseBudgetExceeded(Exception):
+    """PDF超出了文件大小、页数或解析时间的上限"""
+
+    def __init__(self, limit, maximum, actual, pages_parsed=None):
+        self.limit = limit
+        self.maximum = maximum
+        self.actual = actual
+        self.pages_parsed = pages_parsed
+        super().__init__(self._message())
+
+    def _message(self):
+        if self.limit == LIMIT_FILE_SIZE:
+            return f"文件大小 {self.actual / 1024 / 1024:.1f}MB 超过上限 {self.maximum / 1024 / 1024:g}MB"
+        if self.limit == LIMIT_PAGES:
+            return f"PDF共 {self.actual} 页，超过页数上限 {self.maximum} 页"
+        message = f"解析时间超过上限 {self.maximum:g} 秒，已取消"
+        if self.pages_parsed is not None:
+            message += f"（已解析 {self.pages_parsed} 页）"
+        return message
+
+    def __reduce__(self):
+        # 从工作进程传回主进程时保留各字段
+        return (self.__class__, (self.limit, self.maximum, self.actual, self.pages_parsed))
+
+    def to_dict(self):
+        """接口返回结果中的 budget_exceeded 字段"""
+        return {
+            'limit': self.limit,
+            'maximum': self.maximum,
+            'actual': round(self.actual, 3) if isinstance(self.actual, float) else self.actual,
+            'pages_parsed': self.pages_parsed
+        }
+
+
+class ParseBudget:
+    """
+    单个PDF的解析预算：文件大小、页数和解析时间的上限，0表示不限制
+
+    解析时间从 start() 开始计算，截止时间使用墙钟时间，传给工作进程后依然有效。
+    """
+
+    def __init__(self, max_file_bytes=0, max_pages=0, timeout_seconds=0):
+        self.max_file_bytes = max_file_bytes
+        self.max_pages = max_pages
+        self.timeout_seconds = timeout_seconds
+        self.deadline = None
+
+    @classmethod
+    def from_config(cls):
+        pdf_config = get_pdf_config()
+        return cls(
+            max_file_bytes=pdf_config['max_file_mb'] * 1024 * 1024,
+            max_pages=pdf_config['max_pages'],
+            timeout_seconds=pdf_config['parse_timeout_seconds']
+        )
+
+    def start(self):
+        """开始计时（已经开始时保持原来的截止时间）"""
+        if self.timeout_seconds and self.deadline is None:
+            self.deadline = time.time() + self.timeout_seconds
+        return self
+
+    def remaining(self):
+        """距截止时间的秒数，不限时返回None"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.time()
+
+    def check_file_size(self, pdf_source):
+        """检查文件大小，pdf_source 可以是文件路径或可 seek 的文件对象"""
+        if not self.max_file_bytes:
+            return
+        if hasattr(pdf_source, 'seek'):
+            position = pdf_source.tell()
+            size = pdf_source.seek(0, os.SEEK_END)
+            pdf_source.seek(position)
+        else:
+            size = os.path.getsize(pdf_source)
+        if size > self.max_file_bytes:
+            raise ParseBudgetExceeded(LIMIT_FILE_SIZE, self.max_file_bytes, size)
+
+    def check_pages(self, page_count):
+        if self.max_pages and page_count > self.max_pages:
+            raise ParseBudgetExceeded(LIMIT_PAGES, self.max_pages, page_count)
+
+    def check_time(self, pages_parsed=None):
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise ParseBudgetExceeded(LIMIT_TIMEOUT, self.timeout_seconds,
+                                      self.timeout_seconds - remaining, pages_parsed)
+
+
+@contextmanager
+def enforce_parse_budget(budget):
+    """
+    在当前线程中启用解析预算
+
+    提取器打开PDF后用 check_page_limit() 检查页数，每解析一页前用 check_parse_deadline() 检查时间，
+    超出时抛出 ParseBudgetExceeded，解析在页面之间干净地停止。budget 为None时不做任何限制。
+    """
+    previous = getattr(_active_budget, 'budget', None)
+    _active_budget.budget = budget.start() if budget is not None else None
+    try:
+        yield budget
+    finally:
+        _active_budget.budget = previous
+
+
+def current_parse_budget():
+    """当前线程中启用的解析预算，没有时返回None"""
+    return getattr(_active_budget, 'budget', None)
+
+
+def check_page_limit(page_count):
+    budget = current_parse_budget()
+    if budget is not None:
+        budget.check_pages(page_count)
+
+
+def check_parse_deadline(pages_parsed=None):
+    budget = current_parse_budget()
+    if budget is not None:
+        budget.check_time(pages_parsed)
+
+
+def kill_process_pool(pool):
+    """
+    强制结束进程池的所有工作进程
+
+    卡在 pdfminer / pdfplumber 内部的任务无法在页面之间停止，只能结束进程；
+    进程池随之失效，调用方需要重新创建进程池。
+    """
+    processes = list((getattr(pool, '_processes', None) or {}).values())
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.join(timeout=1)
+        if process.is_alive():
+            process.kill()
+
+
+class ProcessPoolLeases:
+    """
+    可复用的预热进程池，每次调用独占一个
+
+    多个请求同时解析时共用一个进程池，超时强制结束进程池会连带结束其他请求正在解析的任务。
+    这里每次调用 acquire() 借出一个只供自己使用的进程池（没有空闲的就新建），正常完成后 release()
+    归还给下一次调用复用；超时、出错或中途放弃时 discard() 丢弃，只影响借出它的那次调用。
+    最多保留 max_idle 个空闲进程池，借出和归还都在锁内进行。
+    """
+
+    def __init__(self, max_idle=2, initializer=None):
+        self.max_idle = max_idle
+        self.initializer = initializer
+        # [(进程数, 进程池), ...]
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self, workers):
+        """借出一个有 workers 个进程的进程池"""
+        with self._lock:
+            for position, (pool_workers, pool) in enumerate(self._idle):
+                if pool_workers == workers:
+                    del self._idle[position]
+                    return pool
+        return ProcessPoolExecutor(max_workers=workers, initializer=self.initializer)
+
+    def release(self, pool):
+        """归还正常完成的进程池，空闲进程池已满时关闭"""
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((pool._max_workers, pool))
+                return
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def discard(self, pool, kill=False):
+        """丢弃进程池，kill=True 时强制结束仍在运行的工作进程"""
+        if kill:
+            kill_process_pool(pool)
+        else:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        """关闭所有空闲的进程池"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for _, pool in idle:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_pool_results(get_pool, reset_pool, tasks, timeout_seconds, max_in_flight=None, poll_seconds=1.0):
+    """
+    在进程池中执行任务，按完成顺序产出 (key, 结果或异常)，单个任务运行超时时结束卡住的进程
+
+    任务运行时间从在主进程中观察到它开始运行算起（只会比实际开始时间晚，不会误判）；
+    同时提交的任务数不超过进程池的进程数——进程池会把多出的任务预先放入调用队列并标记为运行中，
+    这些任务其实还在排队，不能按运行时间判断是否卡住。超过 timeout_seconds + KILL_GRACE_SECONDS 仍未返回时强制结束整个进程池，超时的任务产出
+    ParseBudgetExceeded，其余未完成的任务提交到重新创建的进程池。进程池因其他原因损坏时抛出 BrokenProcessPool。
+
+    Args:
+        get_pool: 返回（可能新建的）进程池的函数
+        reset_pool: 丢弃当前进程池的函数，下次 get_pool() 时重新创建
+        tasks: [(key, 函数, 参数元组), ...]
+        timeout_seconds: 单个任务的运行时间上限，0表示不限制
+        max_in_flight: 同时提交的任务数上限，None表示一次全部提交（限时运行时不超过进程池的进程数）
+    """
+    pending_tasks = iter(tasks)
+    in_flight = {}
+    running_since = {}
+    pool = get_pool()
+    if timeout_seconds:
+        pool_workers = getattr(pool, '_max_workers', 1)
+        max_in_flight = min(max_in_flight or pool_workers, pool_workers)
+
+    def submit_next():
+        task = next(pending_tasks, None)
+        if task is None:
+            return False
+        key, func, args = task
+        in_flight[pool.submit(func, *args)] = task
+        return True
+
+    while max_in_flight is None or len(in_flight) < max_in_flight:
+        if not submit_next():
+            break
+
+    hard_limit = timeout_seconds + KILL_GRACE_SECONDS if timeout_seconds else None
+    while in_flight:
+        done, _ = wait(in_flight, timeout=poll_seconds if hard_limit else None, return_when=FIRST_COMPLETED)
+        for future in done:
+            key, _, _ = in_flight.pop(future)
+            running_since.pop(future, None)
+            try:
+                outcome = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                outcome = e
+            submit_next()
+            yield key, outcome
+
+        if hard_limit is None:
+            continue
+        now = time.monotonic()
+        for future in in_flight:
+            if future not in running_since and future.running():
+                running_since[future] = now
+        hung = [future for future, since in running_since.items() if now - since > hard_limit]
+        if not hung:
+            continue
+
+        resubmit = [task for future, task in in_flight.items() if future not in hung]
+        for future in hung:
+            key, _, _ = in_flight[future]
+            logger.warning("解析进程超过 %s 秒未返回，强制结束: %s", hard_limit, key)
+        kill_process_pool(pool)
+        reset_pool()
+        for future in hung:
+            key, _, _ = in_flight[future]
+            yield key, ParseBudgetExceeded(LIMIT_TIMEOUT, timeout_seconds, now - running_since[future])
+        in_flight.clear()
+        running_since.clear()
+        pool = get_pool()
+        for key, func, args in resubmit:
+            in_flight[pool.submit(func, *args)] = (key, func, args)
+        while len(in_flight) < max_in_flight:
+            if not submit_next():
+                break
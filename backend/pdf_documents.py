@@ -0,0 +1,397 @@
+import datetime
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import threading
+
+from backend.pdf_logging import get_pdf_logger
+from backend.pdf_parse_cache import sha256_file
+
+logger = get_pdf_logger('documents')
+
+
+class DocumentStore:
+    """
+    按内容寻址的PDF归档目录
+
+    文件以内容的SHA-256命名、gzip压缩后保存（<前两位>/<哈希值>.pdf.gz），同一份文档无论上传多少次、
+    用什么文件名上传都只保存一份。总大小超过上限时按最后访问时间淘汰最早的文件（登记表中的记录保留）。
+    """
+
+    FILE_SUFFIX = '.pdf.gz'
+
+    def __init__(self, root_dir, max_bytes=2048 * 1024 * 1024, compresslevel=6):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self.compresslevel = compresslevel
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # 内容哈希 -> (压缩后大小, 最后访问时间)
+        self._index = None
+        self._total_bytes = 0
+
+        if not os.path.exists(self.root_dir):
+            os.makedirs(self.root_dir)
+
+    def path_for(self, content_hash):
+        return os.path.join(self.root_dir, content_hash[:2], content_hash + self.FILE_SUFFIX)
+
+    def _load_index(self):
+        """首次使用时扫描归档目录，重建索引"""
+        if self._index is not None:
+            return
+        self._index = {}
+        self._total_bytes = 0
+        for dir_path, _, filenames in os.walk(self.root_dir):
+            for filename in filenames:
+                if not filename.endswith(self.FILE_SUFFIX):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(dir_path, filename))
+                except OSError:
+                    continue
+                self._index[filename[:-len(self.FILE_SUFFIX)]] = (stat.st_size, stat.st_mtime)
+                self._total_bytes += stat.st_size
+
+    def contains(self, content_hash):
+        with self._lock:
+            self._load_index()
+            return content_hash in self._index
+
+    def put(self, source, content_hash=None):
+        """
+        保存PDF（已保存的文件不重复写入）
+
+        Args:
+            source: 文件路径，或可 seek 的二进制文件对象（写入后回到开头）
+            content_hash: 已经计算好的内容哈希
+
+        Returns:
+            tuple: (内容哈希, 压缩后大小)
+        """
+        if content_hash is None:
+            content_hash = sha256_file(source)
+        with self._lock:
+            self._load_index()
+            if content_hash in self._index:
+                self._touch(content_hash)
+                return content_hash, self._index[content_hash][0]
+
+        # 压缩在锁外进行，同时上传的其他文件不用等待；锁只保护索引和替换文件
+        entry_path = self.path_for(content_hash)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with gzip.open(tmp_path, 'wb', compresslevel=self.compresslevel) as f:
+                if hasattr(source, 'read'):
+                    source.seek(0)
+                    shutil.copyfileobj(source, f)
+                    source.seek(0)
+                else:
+                    with open(source, 'rb') as src:
+                        shutil.copyfileobj(src, f)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._load_index()
+            if content_hash in self._index:
+                # 同样内容的文件已由其他线程保存
+                os.remove(tmp_path)
+                self._touch(content_hash)
+                return content_hash, self._index[content_hash][0]
+            os.replace(tmp_path, entry_path)
+            stat = os.stat(entry_path)
+            self._index[content_hash] = (stat.st_size, stat.st_mtime)
+            self._total_bytes += stat.st_size
+            self._evict(keep=content_hash)
+            return content_hash, stat.st_size
+
+    def open(self, content_hash):
+        """读取归档的PDF，返回解压后的内存文件对象，不存在时返回None"""
+        with self._lock:
+            self._load_index()
+            if content_hash not in self._index:
+                return None
+            with gzip.open(self.path_for(content_hash), 'rb') as f:
+                data = f.read()
+            self._touch(content_hash)
+        return io.BytesIO(data)
+
+    def _touch(self, content_hash):
+        size, _ = self._index[content_hash]
+        try:
+            os.utime(self.path_for(content_hash))
+            access_time = os.stat(self.path_for(content_hash)).st_mtime
+        except OSError:
+            return
+        self._index[content_hash] = (size, access_time)
+
+    def _evict(self, keep=None):
+        """淘汰最久未访问的文件，直到总大小不超过上限（刚写入的文件保留）"""
+        if not self.max_bytes or self._total_bytes <= self.max_bytes:
+            return
+        for content_hash, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if content_hash == keep:
+                continue
+            size, _ = self._index.pop(content_hash)
+            self._total_bytes -= size
+            try:
+                os.remove(self.path_for(content_hash))
+            except OSError:
+                pass
+            self.evictions += 1
+
+    def get_stats(self):
+        with self._lock:
+            self._load_index()
+            return {
+                'files': len(self._index),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions
+            }
+
+
+class DocumentRegistry:
+    """
+    上传文件登记表（purchase_orders.pdf_documents，由 init_db.py 创建）
+
+    每份文档（按内容哈希）一条记录：文件名、大小、上传次数、识别出的公司、订单号、页数、
+    解析和导入时间，把导入的数据行和原始文件关联起来。
+    """
+
+    COLUMNS = (
+        'content_hash', 'filename', 'size_bytes', 'stored_bytes', 'upload_count', 'company', 'po',
+        'table_name', 'page_count', 'row_count', 'parse_error', 'first_uploaded_at', 'last_uploaded_at',
+        'parse_started_at', 'parsed_at', 'imported_at', 'imported_by'
+    )
+
+    def _execute(self, query, params, fetch=False):
+        """在一个连接上执行一条语句并提交（连接由 DatabaseManager 提供）"""
+        from backend.models.database import get_db_manager
+        conn = get_db_manager().get_connection()
+        if not conn:
+            raise RuntimeError("数据库连接失败")
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            row = cursor.fetchone() if fetch else None
+            conn.commit()
+            cursor.close()
+            return row
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def get(self, content_hash):
+        """获取文档记录，不存在时返回None"""
+        row = self._execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM purchase_orders.pdf_documents WHERE content_hash = %s",
+            (content_hash,), fetch=True
+        )
+        return dict(zip(self.COLUMNS, row)) if row else None
+
+    def register_upload(self, content_hash, filename, size_bytes, stored_bytes):
+        """
+        登记一次上传
+
+        插入和查询之前的记录在同一条语句中完成：已登记的文件走 ON CONFLICT 分支，更新时锁定该行，
+        RETURNING 返回的解析、导入等字段不受这次更新影响，即这次上传之前的值；
+        同一文件同时上传时后一次会等前一次提交后再读取，不会都当作第一次上传。
+
+        Returns:
+            dict: 这次上传之前的记录，第一次上传时返回None
+        """
+        row = self._execute(f"""
+            INSERT INTO purchase_orders.pdf_documents (content_hash, filename, size_bytes, stored_bytes)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (content_hash) DO UPDATE SET
+                upload_count = pdf_documents.upload_count + 1,
+                last_uploaded_at = CURRENT_TIMESTAMP,
+                stored_bytes = COALESCE(EXCLUDED.stored_bytes, pdf_documents.stored_bytes)
+            RETURNING {', '.join(self.COLUMNS)}
+        """, (content_hash, filename, size_bytes, stored_bytes), fetch=True)
+        record = dict(zip(self.COLUMNS, row))
+        # 第一次登记时 upload_count 为默认值1
+        if record['upload_count'] <= 1:
+            return None
+        record['upload_count'] -= 1
+        return record
+
+    def record_stored(self, content_hash, stored_bytes):
+        """记录后台归档完成后压缩文件的大小"""
+        self._execute("""
+            UPDATE purchase_orders.pdf_documents SET stored_bytes = %s WHERE content_hash = %s
+        """, (stored_bytes, content_hash))
+
+    def record_parse(self, content_hash, company, po, table_name, page_count, row_count, parse_error,
+                     started_at, finished_at):
+        """记录解析结果（页数未知时保留原来的值）"""
+        self._execute("""
+            UPDATE purchase_orders.pdf_documents SET
+                company = COALESCE(%s, company), po = COALESCE(%s, po), table_name = COALESCE(%s, table_name),
+                page_count = COALESCE(%s, page_count), row_count = %s, parse_error = %s,
+                parse_started_at = %s, parsed_at = %s
+            WHERE content_hash = %s
+        """, (company, po, table_name, page_count, row_count, parse_error, started_at, finished_at, content_hash))
+
+    def record_import(self, content_hash, user_email):
+        """记录数据行已写入数据库"""
+        self._execute("""
+            UPDATE purchase_orders.pdf_documents SET imported_at = CURRENT_TIMESTAMP, imported_by = %s
+            WHERE content_hash = %s
+        """, (user_email, content_hash))
+
+
+class UploadedDocument:
+    """一次上传的文件：内容哈希和这次上传之前的登记记录"""
+
+    def __init__(self, content_hash, filename, previous=None):
+        self.content_hash = content_hash
+        self.filename = filename
+        self.previous = previous
+
+    @property
+    def already_imported(self):
+        """同样内容的文件是否已经导入过"""
+        return bool(self.previous and self.previous.get('imported_at'))
+
+    def duplicate_result(self):
+        """已导入过的文件不再解析，返回的失败结果"""
+        previous = self.previous
+        return {
+            "success": False,
+            "error": f"该文件已于 {previous['imported_at']} 导入过"
+                     f"（{previous.get('company') or '未知公司'}，订单 {previous.get('po') or '-'}）",
+            "duplicate_upload": {
+                'content_hash': self.content_hash,
+                'filename': previous.get('filename'),
+                'company': previous.get('company'),
+                'po': previous.get('po'),
+                'page_count': previous.get('page_count'),
+                'imported_at': previous.get('imported_at'),
+                'imported_by': previous.get('imported_by')
+            }
+        }
+
+
+class DocumentArchive:
+    """
+    上传文件的归档和登记
+
+    receive() 在解析之前计算内容哈希并登记上传，已导入过的文件可以直接跳过解析；
+    record_parse() / record_import() 记录解析和导入的结果。登记表不可用（如数据库连接失败）时
+    只记录警告，不影响导入。
+
+    传入 executor 时，尚未归档的文件只在请求中复制一份原始内容，gzip压缩在 executor 中进行，
+    不占用解析前的时间；没有 executor 时在 receive() 中直接压缩保存。
+    """
+
+    STAGING_SUFFIX = '.upload'
+
+    def __init__(self, store, registry, executor=None):
+        self.store = store
+        self.registry = registry
+        self.executor = executor
+
+    def receive(self, source, filename=None):
+        """
+        归档并登记上传的文件
+
+        Args:
+            source: 文件路径，或可 seek 的二进制文件对象
+            filename: 原始文件名
+
+        Returns:
+            UploadedDocument
+        """
+        content_hash = sha256_file(source)
+        if hasattr(source, 'read'):
+            source.seek(0, os.SEEK_END)
+            size_bytes = source.tell()
+            source.seek(0)
+        else:
+            size_bytes = os.path.getsize(source)
+        stored_bytes = None
+        staged_path = None
+        if self.store is not None:
+            try:
+                if self.executor is None or self.store.contains(content_hash):
+                    _, stored_bytes = self.store.put(source, content_hash)
+                else:
+                    staged_path = self._stage(source)
+            except Exception as e:
+                logger.warning("归档上传文件失败: %s (%s)", filename, e)
+        previous = None
+        if self.registry is not None:
+            try:
+                previous = self.registry.register_upload(content_hash, filename, size_bytes, stored_bytes)
+            except Exception as e:
+                logger.warning("登记上传文件失败: %s (%s)", filename, e)
+        if staged_path is not None:
+            # 登记之后再提交，后台记录的压缩大小不会被这次登记覆盖
+            self.executor.submit(self._archive_staged, staged_path, content_hash, filename)
+        return UploadedDocument(content_hash, filename, previous)
+
+    def _stage(self, source):
+        """把上传的文件原样复制到归档目录下的临时文件（调用方稍后会删除或关闭原文件）"""
+        with tempfile.NamedTemporaryFile(dir=self.store.root_dir, suffix=self.STAGING_SUFFIX, delete=False) as f:
+            if hasattr(source, 'read'):
+                source.seek(0)
+                shutil.copyfileobj(source, f)
+                source.seek(0)
+            else:
+                with open(source, 'rb') as src:
+                    shutil.copyfileobj(src, f)
+            return f.name
+
+    def _archive_staged(self, staged_path, content_hash, filename):
+        """后台压缩保存复制出的文件，并登记压缩后的大小"""
+        try:
+            _, stored_bytes = self.store.put(staged_path, content_hash)
+            if self.registry is not None:
+                self.registry.record_stored(content_hash, stored_bytes)
+        except Exception as e:
+            logger.warning("归档上传文件失败: %s (%s)", filename, e)
+        finally:
+            os.remove(staged_path)
+
+    def record_parse(self, document, result, started_at, finished_at=None):
+        """记录解析结果：公司、订单号、目标表、页数、行数或错误"""
+        if self.registry is None or document is None:
+            return
+        data = result.get('data') or []
+        po_numbers = sorted({row.get('po') for row in data if row.get('po')})
+        pages = (result.get('timings') or {}).get('pages')
+        try:
+            self.registry.record_parse(
+                document.content_hash,
+                result.get('company'),
+                ','.join(po_numbers) or None,
+                result.get('table_name'),
+                pages,
+                len(data) if result.get('success') else None,
+                None if result.get('success') else result.get('error'),
+                started_at,
+                finished_at or datetime.datetime.now()
+            )
+        except Exception as e:
+            logger.warning("登记解析结果失败: %s (%s)", document.filename, e)
+
+    def record_import(self, content_hash, user_email):
+        """记录数据行已写入数据库"""
+        if self.registry is None or not content_hash:
+            return
+        try:
+            self.registry.record_import(content_hash, user_email)
+        except Exception as e:
+            logger.warning("登记导入结果失败: %s (%s)", content_hash, e)
@@ -0,0 +1,164 @@
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+# 各供应商订单中日期的已知格式，作为 parse_date 的 hint 优先尝试
+WEFARICATE_DATE_FORMAT = '%b %d, %Y'
+CENTURION_DATE_FORMAT = '%d/%m/%Y'
+MAGIC_FX_DATE_FORMAT = '%d-%m-%Y'
+
+# 通用日期格式（按尝试顺序）
+DATE_FORMATS = (
+    '%m/%d/%y',
+    '%m/%d/%Y',
+    '%d/%m/%Y',  # Centurion使用dd/mm/yyyy格式
+    '%Y/%m/%d',
+    '%Y-%m-%d',
+    '%m-%d-%Y',
+    '%m-%d-%y',
+    '%b %d, %Y',
+    '%B %d, %Y'
+)
+# Wefaricate订单不使用日在前的格式
+WEFARICATE_DATE_FORMATS = tuple(fmt for fmt in DATE_FORMATS if fmt != '%d/%m/%Y')
+MAGIC_FX_DATE_FORMATS = (MAGIC_FX_DATE_FORMAT,)
+# Centurion两位年份的日期同样是日在前（dd/mm/yy），在月在前的格式之前尝试
+CENTURION_DATE_FORMATS = ('%d/%m/%y',) + DATE_FORMATS
+
+_NUMBER_RE = re.compile(r'[\d,]+\.?\d*')
+_PLAIN_NUMBER_RE = re.compile(r'[\d]+\.?\d*')
+_PER_QUANTITY_RE = re.compile(r'per\s+(\d+)', re.IGNORECASE)
+# parse_decimal 需要去掉的字符：货币符号和千分位逗号
+_DECIMAL_DELETE = str.maketrans('', '', '€$£,')
+_CURRENCY_DELETE = str.maketrans('', '', '€$£')
+
+
+def remove_leading_zeros(value):
+    """去掉前导零"""
+    if not value:
+        return value
+    # 如果是纯数字字符串，去掉前导零
+    if value.isdigit():
+        return str(int(value))
+    return value
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_cached(text, hint, formats):
+    if hint:
+        formats = (hint,) + tuple(fmt for fmt in formats if fmt != hint)
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_date(date_str, hint=None, formats=DATE_FORMATS):
+    """
+    解析日期字符串
+
+    同一份订单中的日期大量重复，结果按 (文本, hint, 格式列表) 缓存。
+
+    Args:
+        date_str: 日期字符串
+        hint: 供应商的已知日期格式（如 CENTURION_DATE_FORMAT），优先尝试
+        formats: 依次尝试的日期格式
+
+    Returns:
+        date: 解析失败时返回None
+    """
+    if not date_str:
+        return None
+    return _parse_date_cached(date_str.strip(), hint, tuple(formats))
+
+
+def parse_decimal(value, decimal_separator='.'):
+    """
+    解析Decimal值，处理货币符号和千分位
+
+    Args:
+        value: 数值字符串，如 "€1,234.56"
+        decimal_separator: 小数点符号；MAGIC FX 使用 ','（"1.234,56" 表示 1234.56）
+    """
+    if not value:
+        return None
+
+    try:
+        if decimal_separator == ',':
+            # 点是千分位，逗号是小数点
+            clean_value = str(value).translate(_CURRENCY_DELETE).replace('.', '').replace(',', '.')
+        else:
+            # 移除货币符号和逗号，保留所有小数位
+            clean_value = str(value).translate(_DECIMAL_DELETE)
+        return Decimal(clean_value)
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def parse_eur_price(price_str, unit_decimals=None):
+    """
+    解析欧元价格，提取数值并按 "per N" 计算单价
+
+    Args:
+        price_str: 价格字符串，如 "1,234.50 EUR per 100"
+        unit_decimals: 单价保留的小数位数（总价保留2位）；None表示保留10位并去掉末尾的0
+
+    Returns:
+        tuple: (单价, 总价)，如 ("€12.345", "€1234.5")
+    """
+    if not price_str:
+        return "", ""
+
+    # 清理字符串，移除换行符
+    price_str = price_str.replace('\n', ' ').strip()
+
+    # 提取价格数值
+    price_match = _NUMBER_RE.search(price_str.replace(',', ''))
+    if not price_match:
+        return price_str, ""
+
+    # 提取per后的数量
+    per_match = _PER_QUANTITY_RE.search(price_str)
+    quantity = int(per_match.group(1)) if per_match else 1
+
+    # 计算单价
+    try:
+        price_value = float(price_match.group(0))
+        unit_price = price_value / quantity
+    except (ValueError, ZeroDivisionError):
+        return price_str, ""
+    if unit_decimals is not None:
+        return f"€{unit_price:.{unit_decimals}f}", f"€{price_value:.2f}"
+    # 保留更多小数位以确保精度
+    unit_price_str = f"€{unit_price:.10f}".rstrip('0').rstrip('.')
+    return unit_price_str, f"€{price_value:.10f}".rstrip('0').rstrip('.')
+
+
+def clean_currency_value(value):
+    """清理货币值，只保留货币符号和数字"""
+    if not value:
+        return value
+
+    # 移除逗号后提取数字部分
+    number_match = _PLAIN_NUMBER_RE.search(value.replace(',', ''))
+    if not number_match:
+        return value
+
+    # 检查货币符号（可能在前面或后面）
+    currency_symbol = ""
+    if '€' in value or 'EUR' in value:
+        currency_symbol = "€"
+    elif '$' in value:
+        currency_symbol = "$"
+    elif '£' in value:
+        currency_symbol = "£"
+    # 没有货币符号时，从常见的货币代码中提取
+    elif 'USD' in value:
+        currency_symbol = "$"
+    elif 'GBP' in value:
+        currency_symbol = "£"
+
+    return f"{currency_symbol}{number_match.group(0)}"
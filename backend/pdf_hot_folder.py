@@ -0,0 +1,248 @@
+import argparse
+import functools
+import json
+import os
+import shutil
+import signal
+import threading
+import time
+
+from backend.pdf_logging import get_pdf_logger
+from backend.pdf_parse_cache import sha256_file
+from backend.pdf_po_line import rows_to_dicts
+from backend.utils.config import get_pdf_config
+
+logger = get_pdf_logger('hot_folder')
+
+PROCESSED_DIR = 'processed'
+FAILED_DIR = 'failed'
+REPORT_SUFFIX = '.report.json'
+DEFAULT_USER_EMAIL = 'pdf_importer@example.com'
+
+STATUS_PROCESSED = 'processed'
+STATUS_DUPLICATE = 'duplicate'
+STATUS_FAILED = 'failed'
+
+
+class HotFolderIngestor:
+    """
+    投递目录自动导入服务
+
+    定时扫描投递目录中的PDF，按文件内容的SHA-256去重，自动识别供应商后在进程池中并行解析，
+    每个文件的数据行在一个事务中写入（覆盖）wf_open / non_wf_open（没有变化的行不重写），
+    然后把PDF移动到 processed/ 或 failed/ 子目录，并在旁边写一个 <文件名>.report.json 记录处理结果。
+
+    已导入文件的哈希值从 processed/ 中的报告重建，服务重启后同一份文件不会重复导入；
+    failed/ 中的文件修正后重新放回投递目录即可再次导入。
+    """
+
+    def __init__(self, processor, watch_dir, workers=None, poll_seconds=5, settle_seconds=2,
+                 company_name='auto', user_email=DEFAULT_USER_EMAIL, db_writer=None):
+        self.processor = processor
+        # db_writer(table_name, rows, user_email) -> (success, {'inserted', 'updated', 'unchanged', 'skipped_no_key'} 或 错误信息)
+        if db_writer is None:
+            from backend.models.database import upsert_table_rows
+            # 和界面导入一样，每个写入的行记录一条操作日志
+            db_writer = functools.partial(upsert_table_rows, audit_rows=True)
+        self.db_writer = db_writer
+        self.watch_dir = watch_dir
+        self.workers = workers or get_pdf_config()['hot_folder_workers']
+        self.poll_seconds = poll_seconds
+        self.settle_seconds = settle_seconds
+        self.company_name = company_name
+        self.user_email = user_email
+        self.processed_dir = os.path.join(watch_dir, PROCESSED_DIR)
+        self.failed_dir = os.path.join(watch_dir, FAILED_DIR)
+        for directory in (self.watch_dir, self.processed_dir, self.failed_dir):
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+        # SHA-256 -> 已导入的文件名
+        self.ingested_hashes = self._load_ingested_hashes()
+        self._stop_event = threading.Event()
+
+    def _load_ingested_hashes(self):
+        """从 processed/ 中的报告重建已导入文件的哈希索引"""
+        hashes = {}
+        for filename in os.listdir(self.processed_dir):
+            if not filename.endswith(REPORT_SUFFIX):
+                continue
+            try:
+                with open(os.path.join(self.processed_dir, filename), 'r', encoding='utf-8') as f:
+                    report = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("无法读取导入报告 %s: %s", filename, e)
+                continue
+            if report.get('status') == STATUS_PROCESSED and report.get('sha256'):
+                hashes[report['sha256']] = report.get('file')
+        return hashes
+
+    def find_ready_files(self):
+        """返回投递目录中已写入完成的PDF（最后修改时间超过 settle_seconds 秒），按修改时间排序"""
+        ready = []
+        now = time.time()
+        for filename in os.listdir(self.watch_dir):
+            path = os.path.join(self.watch_dir, filename)
+            if not filename.lower().endswith('.pdf') or not os.path.isfile(path):
+                continue
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            # 文件可能仍在复制中，等修改时间稳定后再处理
+            if now - mtime >= self.settle_seconds:
+                ready.append((mtime, filename))
+        return [filename for _, filename in sorted(ready)]
+
+    def scan_once(self):
+        """
+        处理投递目录中当前所有已就绪的PDF
+
+        Returns:
+            list: 本次处理的各文件报告
+        """
+        filenames = self.find_ready_files()
+        if not filenames:
+            return []
+
+        reports = []
+        to_parse = []
+        # 文件名 -> (SHA-256, 开始时间)
+        pending = {}
+        for filename in filenames:
+            path = os.path.join(self.watch_dir, filename)
+            started_at = time.time()
+            try:
+                content_hash = sha256_file(path)
+            except OSError as e:
+                logger.error("读取 %s 失败: %s", filename, e)
+                continue
+            if any(other_hash == content_hash for other_hash, _ in pending.values()):
+                # 与本次扫描中的另一个文件内容相同：留到下次扫描，届时按那个文件是否导入成功决定
+                continue
+            duplicate_of = self.ingested_hashes.get(content_hash)
+            if duplicate_of is not None:
+                reports.append(self._finish_file(filename, STATUS_DUPLICATE, {
+                    'sha256': content_hash,
+                    'duplicate_of': duplicate_of,
+                }, started_at))
+                continue
+            pending[filename] = (content_hash, started_at)
+            to_parse.append((filename, path))
+
+        if to_parse:
+            logger.info("投递目录中有 %d 个新文件，开始导入（%d 个进程）", len(to_parse), self.workers)
+        results = self.processor.process_pdf_batch(to_parse, self.company_name, workers=self.workers,
+                                                   check_duplicates=False)
+        for result in results:
+            filename = result['filename']
+            content_hash, started_at = pending[filename]
+            reports.append(self._ingest_result(filename, content_hash, result, started_at))
+        return reports
+
+    def _ingest_result(self, filename, content_hash, result, started_at):
+        """把单个文件的解析结果写入数据库，并移动文件、写报告"""
+        details = {'sha256': content_hash, 'company': result.get('company')}
+        if not result.get('success'):
+            details['error'] = result.get('error', '处理失败')
+            return self._finish_file(filename, STATUS_FAILED, details, started_at)
+
+        data = result['data']
+        details['table_name'] = result['table_name']
+        details['rows'] = len(data)
+        try:
+            success, outcome = self.db_writer(result['table_name'], rows_to_dicts(data), self.user_email)
+        except Exception as e:
+            success, outcome = False, str(e)
+        if not success:
+            # 整个文件在一个事务中写入，失败时没有写入任何行，修正后重新投递即可
+            details['error'] = outcome or '写入数据库失败'
+            return self._finish_file(filename, STATUS_FAILED, details, started_at)
+
+        for key in ('inserted', 'updated', 'unchanged', 'skipped_no_key'):
+            details[key] = outcome.get(key, 0)
+        self.ingested_hashes[content_hash] = filename
+        return self._finish_file(filename, STATUS_PROCESSED, details, started_at)
+
+    def _finish_file(self, filename, status, details, started_at):
+        """移动文件到 processed/ 或 failed/ 子目录并写报告"""
+        target_dir = self.failed_dir if status == STATUS_FAILED else self.processed_dir
+        target_path = self._unique_path(target_dir, filename)
+        finished_at = time.time()
+        report = {
+            'file': os.path.basename(target_path),
+            'original_file': filename,
+            'status': status,
+            'started_at': started_at,
+            'finished_at': finished_at,
+            'elapsed_seconds': round(finished_at - started_at, 3)
+        }
+        report.update(details)
+        try:
+            shutil.move(os.path.join(self.watch_dir, filename), target_path)
+            with open(target_path + REPORT_SUFFIX, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            logger.error("移动 %s 或写入报告失败: %s", filename, e)
+        if status == STATUS_FAILED:
+            logger.warning("导入失败: %s (%s)", filename, report.get('error'))
+        else:
+            logger.info("导入完成: %s 状态=%s 行数=%s 耗时=%.3fs",
+                        filename, status, report.get('rows', 0), report['elapsed_seconds'])
+        return report
+
+    @staticmethod
+    def _unique_path(directory, filename):
+        """目标目录中已有同名文件时在文件名后加序号"""
+        path = os.path.join(directory, filename)
+        base, ext = os.path.splitext(filename)
+        counter = 1
+        while os.path.exists(path):
+            path = os.path.join(directory, f"{base} ({counter}){ext}")
+            counter += 1
+        return path
+
+    def run_forever(self):
+        """持续扫描投递目录，直到调用 stop()"""
+        logger.info("开始监视投递目录: %s（每 %s 秒扫描一次）", os.path.abspath(self.watch_dir), self.poll_seconds)
+        while not self._stop_event.is_set():
+            try:
+                self.scan_once()
+            except Exception as e:
+                logger.error("扫描投递目录出错: %s", e)
+            self._stop_event.wait(self.poll_seconds)
+        logger.info("已停止监视投递目录")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def main():
+    from backend.pdf_import_processor import PDFImportProcessor
+
+    pdf_config = get_pdf_config()
+    parser = argparse.ArgumentParser(description="投递目录PDF自动导入服务")
+    parser.add_argument('watch_dir', nargs='?', default=pdf_config['hot_folder_dir'], help="投递目录")
+    parser.add_argument('--workers', type=int, default=pdf_config['hot_folder_workers'], help="同时解析的文件数")
+    parser.add_argument('--poll', type=float, default=pdf_config['hot_folder_poll_seconds'], help="扫描间隔（秒）")
+    parser.add_argument('--company', default='auto', help="公司名称，默认按第一页内容自动识别")
+    parser.add_argument('--once', action='store_true', help="只处理当前已有的文件后退出")
+    args = parser.parse_args()
+
+    ingestor = HotFolderIngestor(
+        PDFImportProcessor(), args.watch_dir, workers=args.workers, poll_seconds=args.poll,
+        settle_seconds=pdf_config['hot_folder_settle_seconds'], company_name=args.company
+    )
+    if args.once:
+        ingestor.scan_once()
+        return 0
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: ingestor.stop())
+    try:
+        ingestor.run_forever()
+    except KeyboardInterrupt:
+        ingestor.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+import datetime
+from decimal import Decimal, InvalidOperation
+
+# 主键列，不参与比较，也不更新
+PRIMARY_KEY = 'po_line'
+
+
+def _as_decimal(value, scale=None):
+    """数值统一为Decimal；指定小数位数时按数据库列的精度舍入（与写入后读出的值一致）"""
+    if isinstance(value, bool):
+        return None
+    try:
+        number = value if isinstance(value, Decimal) else Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        return None
+    if scale is not None and number.is_finite():
+        number = number.quantize(Decimal(1).scaleb(-scale))
+    return number
+
+
+def _as_text(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value).strip()
+
+
+def values_equal(new, old, scale=None):
+    """
+    新解析的值与数据库中已有的值是否相同
+
+    数据库返回的类型（numeric 为Decimal、date 为日期）与解析结果不一定相同，
+    数值按列的小数位数舍入后比较，其余类型按文本比较。
+    """
+    if new is None or old is None:
+        return new is None and old is None
+    if new == old:
+        return True
+    if isinstance(old, (Decimal, int, float)) and not isinstance(old, bool):
+        new_number = _as_decimal(new, scale)
+        return new_number is not None and new_number == _as_decimal(old, scale)
+    return _as_text(new) == _as_text(old)
+
+
+class RowDiff:
+    """一批数据行与数据库中已有行的比较结果"""
+
+    def __init__(self):
+        # 数据库中不存在的行
+        self.inserts = []
+        # [(数据行, 有变化的列), ...]
+        self.updates = []
+        self.unchanged = 0
+
+    def update_groups(self):
+        """按有变化的列分组：{列元组: [数据行, ...]}，同一组用一条 UPDATE 语句写入"""
+        groups = {}
+        for row, columns in self.updates:
+            groups.setdefault(columns, []).append(row)
+        return groups
+
+    def counts(self):
+        return {
+            'inserted': len(self.inserts),
+            'updated': len(self.updates),
+            'unchanged': self.unchanged
+        }
+
+
+def diff_rows(rows, existing, scales=None):
+    """
+    逐字段比较数据行与数据库中已有的行
+
+    Args:
+        rows: 清理后的数据字典列表（po_line 不重复）
+        existing: {po_line: {列名: 值}}，一次查询得到的已有行
+        scales: {列名: 小数位数}，numeric 列的精度
+
+    Returns:
+        RowDiff: 新增的行、有变化的行及变化的列、未变化的行数
+    """
+    scales = scales or {}
+    diff = RowDiff()
+    for row in rows:
+        current = existing.get(row[PRIMARY_KEY])
+        if current is None:
+            diff.inserts.append(row)
+            continue
+        changed = tuple(
+            column for column, value in row.items()
+            if column != PRIMARY_KEY and not values_equal(value, current.get(column), scales.get(column))
+        )
+        if changed:
+            diff.updates.append((row, changed))
+        else:
+            diff.unchanged += 1
+    return diff
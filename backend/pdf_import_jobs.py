@@ -0,0 +1,155 @@
+import datetime
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.pdf_logging import get_pdf_logger
+
+logger = get_pdf_logger('jobs')
+
+JOB_QUEUED = 'queued'
+JOB_PARSING = 'parsing'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+
+class ImportJob:
+    """单个PDF导入任务"""
+
+    def __init__(self, pdf_path, company_name, filename=None, document=None):
+        self.id = uuid.uuid4().hex
+        self.pdf_path = pdf_path
+        self.company_name = company_name
+        self.filename = filename or os.path.basename(pdf_path)
+        # 上传文件的登记信息（UploadedDocument）
+        self.document = document
+        self.status = JOB_QUEUED
+        self.error = None
+        self.result = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # 各阶段耗时（秒）
+        self.timings = {}
+
+    @property
+    def finished(self):
+        return self.status in (JOB_DONE, JOB_FAILED)
+
+    def to_dict(self, include_result=True):
+        """转换为接口返回的字典"""
+        job_dict = {
+            'job_id': self.id,
+            'filename': self.filename,
+            'company': self.company_name,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'timings': dict(self.timings)
+        }
+        if include_result and self.status == JOB_DONE:
+            job_dict['result'] = self.result
+        return job_dict
+
+
+class ImportJobManager:
+    """
+    异步PDF导入任务管理器
+
+    上传后立即返回任务ID，解析在后台线程池中进行，请求线程不再被慢文件占用。
+    任务状态依次为 queued -> parsing -> done / failed，已完成的任务保留 retention_seconds 秒后清除。
+    指定 sessions（ImportSessionManager）时解析出的数据行暂存在导入会话中，任务结果只含会话ID；
+    指定 documents（DocumentArchive）时解析结果记录到上传文件登记表。
+    """
+
+    def __init__(self, processor, workers=2, retention_seconds=1800, sessions=None, documents=None):
+        self.processor = processor
+        self.retention_seconds = retention_seconds
+        self.sessions = sessions
+        self.documents = documents
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pdf-import')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, pdf_path, company_name, filename=None, delete_file=True, document=None):
+        """
+        提交导入任务
+
+        Args:
+            pdf_path: PDF文件路径
+            company_name: 公司名称，'auto' 表示自动识别
+            filename: 原始文件名
+            delete_file: 任务结束后是否删除PDF文件（上传的临时文件）
+            document: 上传文件的登记信息（DocumentArchive.receive 的返回值）
+
+        Returns:
+            ImportJob: 新建的任务
+        """
+        job = ImportJob(pdf_path, company_name, filename, document)
+        with self._lock:
+            self._purge_expired()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, delete_file)
+        return job
+
+    def get(self, job_id):
+        """获取任务，不存在或已过期时返回None"""
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        """获取所有未过期的任务"""
+        with self._lock:
+            self._purge_expired()
+            return sorted(self._jobs.values(), key=lambda job: job.created_at)
+
+    def _purge_expired(self):
+        """清除保留期已过的已完成任务（调用方持有锁）"""
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and now - job.finished_at > self.retention_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _run(self, job, delete_file):
+        """任务主体：调用 process_pdf_with_duplicate_check"""
+        job.started_at = time.time()
+        job.timings['queued'] = job.started_at - job.created_at
+        job.status = JOB_PARSING
+        status = JOB_FAILED
+        parse_started_at = datetime.datetime.now()
+        try:
+            result = self.processor.process_pdf_with_duplicate_check(job.pdf_path, job.company_name)
+            if self.documents is not None:
+                self.documents.record_parse(job.document, result, parse_started_at)
+            if result.get('success'):
+                if self.sessions is not None:
+                    content_hash = job.document.content_hash if job.document is not None else None
+                    result = self.sessions.stage(result, job.filename, content_hash)
+                job.result = result
+                job.company_name = result.get('company', job.company_name)
+                status = JOB_DONE
+            else:
+                job.error = result.get('error', '处理失败')
+        except Exception as e:
+            logger.error("导入任务 %s 出错: %s", job.id, e)
+            job.error = str(e)
+        finally:
+            if delete_file and os.path.exists(job.pdf_path):
+                os.unlink(job.pdf_path)
+            job.finished_at = time.time()
+            job.timings['parsing'] = job.finished_at - job.started_at
+            job.timings['total'] = job.finished_at - job.created_at
+            # 最后更新状态，轮询方看到 done/failed 时结果和耗时已经完整
+            job.status = status
+
+    def shutdown(self, wait=False):
+        """关闭后台线程池"""
+        self._executor.shutdown(wait=wait)
@@ -1,17 +1,120 @@
+import atexit
+import datetime
+import io
 import json
 import os
-from backend.db_pdf_processor import extract_wefaricate_data, extract_centurion_data, extract_magic_fx_data
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from backend.db_pdf_processor import extract_wefaricate_data, extract_centurion_data, extract_magic_fx_data, extraction_cache_version
 from backend.models.database import insert_table_data
+from backend.pdf_budget import (
+    ParseBudget, ParseBudgetExceeded, ProcessPoolLeases, current_parse_budget, enforce_parse_budget,
+    iter_pool_results
+)
+from backend.pdf_logging import collect_parse_summaries, get_pdf_logger, pdf_source_name, record_parse_summaries
+from backend.pdf_metrics import ImportTimer, parse_metrics
+from backend.pdf_parse_cache import PDFParseCache, sha256_file
+from backend.pdf_po_line import rows_to_dicts
+from backend.utils.config import get_pdf_config
+from backend.vendor_profiles import TABLE_EXTRACTOR, VendorProfile, compile_vendor_profiles, extract_profile_data
+from backend.vendor_fingerprint import VendorFingerprinter
+
+logger = get_pdf_logger('import')
+
+# 批量解析进程池，进程在多次批量导入之间复用；每次批量导入独占一个，超时强制结束时不影响其他请求
+_batch_pools = ProcessPoolLeases(max_idle=1)
+atexit.register(_batch_pools.shutdown)
+
+
+def _new_page_cache(pdf_config):
+    """按配置创建单页解析结果缓存，未启用时返回None"""
+    if not (pdf_config['cache_enabled'] and pdf_config['page_cache_enabled']):
+        return None
+    return PDFParseCache(
+        os.path.join(pdf_config['cache_dir'], 'pages'),
+        max_bytes=pdf_config['page_cache_max_mb'] * 1024 * 1024
+    )
+
+
+_worker_page_cache = None
+
+
+def _get_worker_page_cache():
+    """工作进程中的页面缓存实例（与主进程共用同一个缓存目录），每个进程只创建一次"""
+    global _worker_page_cache
+    if _worker_page_cache is None:
+        _worker_page_cache = _new_page_cache(get_pdf_config())
+    return _worker_page_cache
+
+
+def _extract_in_batch_worker(pdf_path, company_name, use_page_cache=False, budget=None, profile=None):
+    """
+    批量解析的工作进程：文件之间已经并行，单个文件内部串行解析
+
+    budget 为该文件的解析预算，profile 为主进程中编译好的供应商配置（随任务传入，工作进程不再读取配置文件）
+    """
+    page_cache = _get_worker_page_cache() if use_page_cache else None
+    with enforce_parse_budget(budget):
+        return PDFImportProcessor.extract_by_company(pdf_path, company_name, workers=1, page_cache=page_cache,
+                                                     profile=profile)
+
+
+def _extract_in_batch_task(pdf_path, company_name, use_page_cache=False, budget=None, profile=None):
+    """批量解析进程池中的任务：返回 (开始解析的时间, 数据行)，排队等待的时间不计入"""
+    started_at = datetime.datetime.now()
+    return started_at, _extract_in_batch_worker(pdf_path, company_name, use_page_cache, budget, profile)
+
+
+def _extract_in_isolated_worker(pdf_source, company_name, use_page_cache, budget, profile=None):
+    """隔离解析的工作进程：pdf_source 为文件路径或文件内容，返回数据行和解析汇总记录"""
+    if isinstance(pdf_source, bytes):
+        pdf_source = io.BytesIO(pdf_source)
+    with collect_parse_summaries() as summaries:
+        data = _extract_in_batch_worker(pdf_source, company_name, use_page_cache, budget, profile)
+    return data, summaries
+
+
+# 内置提取器，按供应商配置中的 extractor 选择（见 VendorProfile）
+BUILTIN_EXTRACTORS = {
+    'wefabricate': lambda pdf_path, workers, page_cache: extract_wefaricate_data(
+        pdf_path, workers=workers, page_cache=page_cache),
+    'centurion': lambda pdf_path, workers, page_cache: extract_centurion_data(pdf_path, page_cache=page_cache),
+    'magic_fx': lambda pdf_path, workers, page_cache: extract_magic_fx_data(pdf_path)
+}
+
+
+def _budget_exceeded_result(error):
+    """超出解析预算时的失败结果"""
+    return {
+        "success": False,
+        "error": str(error),
+        "budget_exceeded": error.to_dict()
+    }
+
 
 class PDFImportProcessor:
     def __init__(self, config_path="config/column_mapping.json", upload_folder="uploads"):
         self.config_path = config_path
         self.upload_folder = upload_folder
         self.mapping_config = self.load_mapping_config()
+        self.fingerprinter = VendorFingerprinter(self.mapping_config)
+        # 供应商解析规则，按配置内容缓存，同一份配置只编译一次
+        self.profiles = compile_vendor_profiles(self.mapping_config)
         
         # 确保上传文件夹存在
         if not os.path.exists(self.upload_folder):
             os.makedirs(self.upload_folder)
+        
+        # 解析结果缓存（按文件内容寻址）
+        pdf_config = get_pdf_config()
+        self.parse_cache = None
+        if pdf_config['cache_enabled']:
+            self.parse_cache = PDFParseCache(
+                pdf_config['cache_dir'],
+                max_bytes=pdf_config['cache_max_mb'] * 1024 * 1024
+            )
+        # 单页中间结果缓存（按页面内容寻址），修订版订单只重新解析改动过的页面
+        self.page_cache = _new_page_cache(pdf_config)
     
     def load_mapping_config(self):
         """加载映射配置文件"""
@@ -33,92 +136,364 @@ class PDFImportProcessor:
             return False
     
     def get_available_companies(self):
-        """获取可用的公司列表"""
-        # 返回固定的公司列表
-        companies = ['wefabricate', 'centurion', 'magic_fx']
-        return companies
-    
-    def add_company_mapping(self, company_name, pdf_patterns, table_columns, database_mapping):
-        """添加新的公司映射配置"""
-        self.mapping_config[company_name] = {
+        """
+        获取可选择的公司列表（配置文件中有解析规则的公司）
+
+        generic_wf* / generic_non_wf* 是历史配置中沿用 Wefaricate / Centurion 解析方式的通用配置，
+        不是具体的供应商，不在列表中
+        """
+        return [
+            name for name in self.profiles
+            if not (name.startswith('generic_wf') or name.startswith('generic_non_wf'))
+        ]
+    
+    def get_profile(self, company_name):
+        """公司的解析规则，没有配置时返回None"""
+        return self.profiles.get(company_name)
+    
+    def add_company_mapping(self, company_name, pdf_patterns, table_columns, database_mapping,
+                            fingerprint=None, table_name=None):
+        """
+        添加新的公司映射配置
+        
+        没有内置提取器的公司按 table_columns 和 database_mapping 用通用表格提取器解析，不需要新增代码；
+        提供 fingerprint 时可以自动识别该公司，table_name 指定写入的表（默认按公司名称选择）。
+        配置无效（如正则表达式错误）时不保存并返回False。
+        """
+        company_config = {
             "pdf_patterns": pdf_patterns,
             "table_columns": table_columns,
             "database_mapping": database_mapping
         }
+        if fingerprint:
+            company_config["fingerprint"] = fingerprint
+        if table_name:
+            company_config["table_name"] = table_name
+        try:
+            VendorProfile(company_name, company_config)
+        except ValueError as e:
+            logger.error("公司映射配置无效: %s (%s)", company_name, e)
+            return False
+        self.mapping_config[company_name] = company_config
+        self.fingerprinter = VendorFingerprinter(self.mapping_config)
+        self.profiles = compile_vendor_profiles(self.mapping_config)
         return self.save_mapping_config()
     
-    def save_uploaded_file(self, file_data, filename):
-        """保存上传的文件"""
-        try:
-            file_path = os.path.join(self.upload_folder, filename)
-            with open(file_path, 'wb') as f:
-                f.write(file_data)
-            return file_path
-        except Exception as e:
-            print(f"保存上传文件失败: {e}")
-            return None
+    def detect_company(self, pdf_path):
+        """根据第一页的关键字识别PDF所属的公司，无法识别时返回None"""
+        result = self.fingerprinter.detect(pdf_path)
+        logger.info("供应商识别: %s (得分: %s, 区域: %s, 耗时: %.1fms)",
+                    result['company'], result['scores'], result['region'], result['elapsed_ms'])
+        return result['company']
+    
+    def resolve_company(self, pdf_path, company_name):
+        """
+        确定处理PDF使用的公司名称
+        
+        已知公司直接使用；company_name 为空或 'auto' 时自动识别，识别失败抛出ValueError；
+        未知的公司名称先尝试自动识别，识别失败时保持原名称（按默认方式处理）
+        """
+        if company_name and company_name != 'auto':
+            if (company_name in self.profiles
+                    or company_name.startswith('generic_wf')
+                    or company_name.startswith('generic_non_wf')):
+                return company_name
+        
+        detected = self.detect_company(pdf_path)
+        if detected:
+            return detected
+        if not company_name or company_name == 'auto':
+            raise ValueError("无法自动识别PDF所属的公司，请手动选择公司")
+        return company_name
     
     def process_pdf_by_company(self, pdf_path, company_name):
-        """根据公司名称处理PDF文件"""
-        # 根据公司类型调用相应的处理函数
-        if company_name == 'wefabricate':
-            data = extract_wefaricate_data(pdf_path)
-            return data
-        elif company_name == 'centurion':
-            data = extract_centurion_data(pdf_path)
-            return data
-        elif company_name == 'magic_fx':
-            data = extract_magic_fx_data(pdf_path)
-            return data
-        elif company_name.startswith('generic_wf'):
-            # 通用WF处理方式
-            data = extract_wefaricate_data(pdf_path)
-            return data
-        elif company_name.startswith('generic_non_wf'):
-            # 通用Non-WF处理方式
-            data = extract_centurion_data(pdf_path)
+        """根据公司名称处理PDF文件，相同内容的文件直接返回缓存的解析结果"""
+        if self.parse_cache is None:
+            return self._extract_within_budget(pdf_path, company_name)
+        
+        cache_key = PDFParseCache.make_key(sha256_file(pdf_path), company_name, self.extractor_version(company_name))
+        data = self.parse_cache.get(cache_key)
+        if data is not None:
+            logger.info("解析缓存命中: %s", pdf_source_name(pdf_path))
             return data
+        
+        data = self._extract_within_budget(pdf_path, company_name)
+        if data:
+            self.parse_cache.put(cache_key, data)
+        return data
+    
+    def extractor_version(self, company_name):
+        """解析缓存键中的解析器版本，内置提取器的版本包含提取配置，通用表格提取器的版本包含该公司配置的摘要"""
+        profile = self.get_profile(company_name)
+        return (profile.cache_version if profile is not None else None) or extraction_cache_version()
+    
+    def _extract_within_budget(self, pdf_path, company_name):
+        """
+        提取数据行
+        
+        默认在当前线程中解析，解析预算在页面之间检查（见 enforce_parse_budget）。
+        配置 PDF_PARSE_ISOLATION=True 且设置了解析时间上限时，改为在独立的进程池中解析：
+        卡在单页内部、无法在页面之间停止的解析超时后强制结束工作进程，请求不会一直挂起。
+        """
+        pdf_config = get_pdf_config()
+        budget = current_parse_budget()
+        if not (pdf_config['parse_isolation'] and budget is not None and budget.timeout_seconds):
+            return self.extract_by_company(pdf_path, company_name, page_cache=self.page_cache,
+                                           profile=self.get_profile(company_name))
+        
+        if hasattr(pdf_path, 'read'):
+            # 文件对象无法传给工作进程，传文件内容
+            pdf_path.seek(0)
+            pdf_source = pdf_path.read()
+            pdf_path.seek(0)
         else:
-            # 对于其他公司，使用默认处理方式
-            data = extract_wefaricate_data(pdf_path)
-            return data
+            pdf_source = pdf_path
+        task = (pdf_source_name(pdf_path), _extract_in_isolated_worker,
+                (pdf_source, company_name, self.page_cache is not None, budget, self.get_profile(company_name)))
+        # 每次导入使用单独的单进程进程池：超时强制结束时不会影响其他请求的解析
+        pools = []
+        
+        def get_pool():
+            if not pools:
+                pools.append(ProcessPoolExecutor(max_workers=1))
+            return pools[0]
+        
+        try:
+            for _, outcome in iter_pool_results(get_pool, pools.clear, [task], max(0.0, budget.remaining())):
+                if isinstance(outcome, Exception):
+                    raise outcome
+                data, summaries = outcome
+                record_parse_summaries(summaries)
+                return data
+        except BrokenProcessPool as e:
+            logger.warning("隔离解析进程异常，改为在当前线程中解析: %s", e)
+        finally:
+            for pool in pools:
+                pool.shutdown(wait=False)
+        return self.extract_by_company(pdf_path, company_name, page_cache=self.page_cache,
+                                       profile=self.get_profile(company_name))
+    
+    def get_cache_stats(self):
+        """获取解析缓存的命中统计"""
+        if self.parse_cache is None:
+            return {'enabled': False}
+        stats = self.parse_cache.get_stats()
+        stats['enabled'] = True
+        stats['pages'] = self.page_cache.get_stats() if self.page_cache is not None else {'enabled': False}
+        return stats
+    
+    @staticmethod
+    def extract_by_company(pdf_path, company_name, workers=None, page_cache=None, profile=None):
+        """
+        按公司的解析规则调用对应的提取函数（不经过整份文件的解析缓存）
+        
+        Args:
+            workers: Wefaricate订单的页面并行进程数，None表示使用配置
+            page_cache: 单页解析结果缓存，None表示不使用（MAGIC FX订单只解析第一页、通用表格提取器不使用页面缓存）
+            profile: 公司的 VendorProfile；为None时按公司名称选择内置提取器
+        """
+        if profile is None:
+            profile = VendorProfile(company_name, {})
+        if profile.extractor == TABLE_EXTRACTOR:
+            if not profile.column_labels:
+                # 没有配置表格列的公司使用默认处理方式
+                return extract_wefaricate_data(pdf_path, workers=workers, page_cache=page_cache)
+            return extract_profile_data(pdf_path, profile)
+        return BUILTIN_EXTRACTORS[profile.extractor](pdf_path, workers, page_cache)
     
     def process_pdf_with_duplicate_check(self, pdf_path, company_name):
-        """处理PDF文件并检查重复数据"""
+        """
+        处理PDF文件并检查重复数据
+        
+        pdf_path 可以是文件路径，也可以是可 seek 的二进制文件对象（如上传请求中的文件流），
+        文件对象不写入临时文件。
+        
+        识别公司和解析受解析预算（PDF_MAX_FILE_MB / PDF_MAX_PAGES / PDF_PARSE_TIMEOUT_SECONDS）限制，
+        超出时返回失败结果，budget_exceeded 给出超出的限制项。
+        
+        返回结果中的 timings 给出各阶段耗时（毫秒）：识别公司(detect)、解析(parse，含缓存查询)、
+        查询重复数据(duplicate_check)，parse_stages 为提取器内部的细分耗时（open / text / tables / rows 等），
+        以及页数、行数和是否命中解析缓存；同时计入 parse_metrics 的耗时直方图。
+        """
+        timer = ImportTimer()
+        summaries = []
+        data = None
         try:
-            print(f"正在处理: {pdf_path}")
-            data = self.process_pdf_by_company(pdf_path, company_name)
-            
-            if not data:
-                return {
-                    "success": False,
-                    "error": "未从PDF中提取到有效数据"
-                }
-            
-            # 为每条数据添加公司字段
-            for item in data:
-                item['company'] = company_name
-            
-            # 确定目标表名
-            table_name = 'wf_open'
-            if company_name == 'centurion' or company_name == 'magic_fx' or 'non_wf' in company_name:
-                table_name = 'non_wf_open'
-            
-            # 检查重复数据
-            duplicates = self.check_duplicates(table_name, data)
-            
-            return {
-                "success": True,
-                "data": data,
-                "duplicates": duplicates,
-                "table_name": table_name
-            }
+            logger.info("正在处理: %s", pdf_source_name(pdf_path))
+            budget = ParseBudget.from_config()
+            budget.check_file_size(pdf_path)
+            with enforce_parse_budget(budget):
+                with timer.stage('detect'):
+                    company_name = self.resolve_company(pdf_path, company_name)
+                with collect_parse_summaries() as summaries, timer.stage('parse'):
+                    data = self.process_pdf_by_company(pdf_path, company_name)
+            with timer.stage('duplicate_check'):
+                result = self.build_import_result(data, company_name)
+        except ParseBudgetExceeded as e:
+            logger.warning("解析超出限制，已取消: %s (%s)", pdf_source_name(pdf_path), e)
+            result = _budget_exceeded_result(e)
         except Exception as e:
-            print(f"处理 {pdf_path} 时出错: {e}")
-            return {
+            logger.error("处理 %s 时出错: %s", pdf_source_name(pdf_path), e)
+            result = {
                 "success": False,
                 "error": str(e)
             }
+        # 解析成功但提取器没有运行，说明结果来自解析缓存
+        cache_hit = data is not None and not summaries and self.parse_cache is not None
+        result['timings'] = timer.to_dict(summaries, rows=len(data) if data is not None else None, cache_hit=cache_hit)
+        parse_metrics.observe(result['timings'], company_name, success=result['success'])
+        return result
+    
+    def build_import_result(self, data, company_name, check_duplicates=True):
+        """为解析出的数据行添加公司字段、确定目标表并检查重复数据（check_duplicates=False 时跳过查询）"""
+        if not data:
+            return {
+                "success": False,
+                "error": "未从PDF中提取到有效数据"
+            }
+        
+        # 为每条数据添加公司字段
+        for item in data:
+            item['company'] = company_name
+        
+        # 确定目标表名
+        profile = self.get_profile(company_name) or VendorProfile(company_name, {})
+        table_name = profile.table_name
+        
+        # 检查重复数据
+        duplicates = self.check_duplicates(table_name, data) if check_duplicates else []
+        
+        return {
+            "success": True,
+            "data": data,
+            "duplicates": duplicates,
+            "table_name": table_name,
+            "company": company_name
+        }
+    
+    def process_pdf_batch(self, pdf_files, company_name, workers=None, check_duplicates=True):
+        """
+        并行处理一批PDF文件，每个文件处理完成后立即产出它的结果
+        
+        识别公司和查询解析缓存在当前进程完成（只需几毫秒），未命中缓存的文件提交到批量解析进程池，
+        结果按完成顺序产出，不需要等待最慢的文件。
+        
+        Args:
+            pdf_files: [(文件名, PDF文件路径), ...]
+            company_name: 公司名称，'auto' 表示逐个文件自动识别
+            workers: 同时解析的文件数，None表示使用配置 PDF_BATCH_WORKERS
+            check_duplicates: 是否查询数据库中已存在的重复数据
+            
+        Yields:
+            dict: 与 process_pdf_with_duplicate_check 相同的结果，另含 index、filename 和该文件开始解析的时间
+                  parse_started_at
+        """
+        pdf_config = get_pdf_config()
+        if workers is None:
+            workers = pdf_config['batch_workers']
+        
+        # 文件序号 -> (文件名, 路径, 公司名称, 缓存键)
+        pending = {}
+        # 文件序号 -> 开始解析的时间（进程池中的文件为工作进程实际开始解析的时间）
+        started_at = {}
+        for index, (filename, pdf_path) in enumerate(pdf_files):
+            started_at[index] = datetime.datetime.now()
+            try:
+                ParseBudget.from_config().check_file_size(pdf_path)
+                file_company = self.resolve_company(pdf_path, company_name)
+                cache_key = None
+                if self.parse_cache is not None:
+                    cache_key = PDFParseCache.make_key(sha256_file(pdf_path), file_company,
+                                                      self.extractor_version(file_company))
+                    data = self.parse_cache.get(cache_key)
+                    if data is not None:
+                        logger.info("解析缓存命中: %s", filename)
+                        yield self._batch_result(index, filename, file_company, data=data,
+                                                 check_duplicates=check_duplicates, parse_started_at=started_at[index])
+                        continue
+                pending[index] = (filename, pdf_path, file_company, cache_key)
+            except Exception as e:
+                logger.error("处理 %s 时出错: %s", filename, e)
+                yield self._batch_result(index, filename, company_name, error=e, parse_started_at=started_at[index])
+        
+        if workers > 1 and len(pending) > 1:
+            pool_workers = min(workers, len(pending))
+            # 每个文件的解析预算在工作进程开始解析时计时，卡住的工作进程超时后被强制结束
+            tasks = [
+                (index, _extract_in_batch_task,
+                 (pdf_path, file_company, self.page_cache is not None, ParseBudget.from_config(),
+                  self.get_profile(file_company)))
+                for index, (_, pdf_path, file_company, _) in pending.items()
+            ]
+            pools = []
+
+            def get_pool():
+                if not pools:
+                    pools.append(_batch_pools.acquire(pool_workers))
+                return pools[0]
+
+            completed = False
+            try:
+                # 超时的进程池由 iter_pool_results 强制结束，pools.clear 丢弃后重新借用一个
+                for index, outcome in iter_pool_results(get_pool, pools.clear, tasks,
+                                                        pdf_config['parse_timeout_seconds']):
+                    filename, _, file_company, cache_key = pending.pop(index)
+                    if isinstance(outcome, Exception):
+                        logger.error("处理 %s 时出错: %s", filename, outcome)
+                        yield self._batch_result(index, filename, file_company, error=outcome,
+                                                 parse_started_at=started_at[index])
+                        continue
+                    started_at[index], data = outcome
+                    self._put_parse_cache(cache_key, data)
+                    yield self._batch_result(index, filename, file_company, data=data,
+                                             check_duplicates=check_duplicates, parse_started_at=started_at[index])
+                completed = True
+            except BrokenProcessPool as e:
+                # 进程池异常时，剩余的文件回退到逐个解析
+                logger.warning("批量并行解析失败，剩余文件逐个解析: %s", e)
+            finally:
+                # 正常完成时归还进程池；进程池损坏或调用方中途停止读取结果时丢弃
+                for pool in pools:
+                    if completed:
+                        _batch_pools.release(pool)
+                    else:
+                        _batch_pools.discard(pool)
+        
+        for index in sorted(pending):
+            filename, pdf_path, file_company, cache_key = pending[index]
+            started_at[index] = datetime.datetime.now()
+            try:
+                with enforce_parse_budget(ParseBudget.from_config()):
+                    data = self.extract_by_company(pdf_path, file_company, page_cache=self.page_cache,
+                                                   profile=self.get_profile(file_company))
+            except Exception as e:
+                logger.error("处理 %s 时出错: %s", filename, e)
+                yield self._batch_result(index, filename, file_company, error=e, parse_started_at=started_at[index])
+                continue
+            self._put_parse_cache(cache_key, data)
+            yield self._batch_result(index, filename, file_company, data=data,
+                                     check_duplicates=check_duplicates, parse_started_at=started_at[index])
+    
+    def _put_parse_cache(self, cache_key, data):
+        if self.parse_cache is not None and cache_key is not None and data:
+            self.parse_cache.put(cache_key, data)
+    
+    def _batch_result(self, index, filename, company_name, data=None, error=None, check_duplicates=True,
+                      parse_started_at=None):
+        """生成批量处理中单个文件的结果"""
+        if isinstance(error, ParseBudgetExceeded):
+            result = _budget_exceeded_result(error)
+        elif error is not None:
+            result = {"success": False, "error": str(error)}
+        else:
+            try:
+                result = self.build_import_result(data, company_name, check_duplicates)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+        result['index'] = index
+        result['filename'] = filename
+        result['parse_started_at'] = parse_started_at
+        return result
     
     def check_duplicates(self, table_name, data_list):
         """检查数据列表中是否存在主键冲突"""
@@ -141,8 +516,8 @@ class PDFImportProcessor:
             if user_email is None:
                 user_email = "pdf_importer@example.com"
             
-            # 逐条插入数据并记录操作日志
-            for data in data_list:
+            # 逐条插入数据并记录操作日志（POLine 数据行在这里转换为字典）
+            for data in rows_to_dicts(data_list):
                 # 使用数据库管理器的插入方法，它会处理重复数据的情况
                 from backend.models.database import insert_table_data
                 success, message = insert_table_data(table_name, data, user_email)
@@ -169,18 +544,19 @@ class PDFImportProcessor:
         
         for pdf_path in pdf_files:
             try:
-                print(f"正在处理: {pdf_path}")
-                data = self.process_pdf_by_company(pdf_path, company_name)
+                logger.info("正在处理: %s", pdf_path)
+                file_company = self.resolve_company(pdf_path, company_name)
+                data = self.process_pdf_by_company(pdf_path, file_company)
                 if data:
                     # 为每条数据添加公司字段
                     for item in data:
-                        item['company'] = company_name
+                        item['company'] = file_company
                     all_data.extend(data)
                     success_count += 1
                 else:
                     error_count += 1
             except Exception as e:
-                print(f"处理 {pdf_path} 时出错: {e}")
+                logger.error("处理 %s 时出错: %s", pdf_path, e)
                 error_count += 1
         
         return {
@@ -0,0 +1,170 @@
+import threading
+import time
+import uuid
+
+from backend.pdf_logging import get_pdf_logger
+from backend.pdf_po_line import rows_to_dicts
+
+logger = get_pdf_logger('sessions')
+
+# 提交方式：覆盖已存在的行 / 只写入新行
+COMMIT_OVERWRITE = 'overwrite'
+COMMIT_SKIP_DUPLICATES = 'skip_duplicates'
+COMMIT_MODES = (COMMIT_OVERWRITE, COMMIT_SKIP_DUPLICATES)
+
+
+def _upsert_rows(table_name, rows, user_email):
+    """
+    默认的写入方式：整批数据在一个事务中写入（每条语句最多1000行），新增的行用多行INSERT，
+    已有的行只更新有变化的列；和原来逐行导入一样，每个写入的行记录一条操作日志
+    """
+    from backend.models.database import upsert_table_rows
+    return upsert_table_rows(table_name, rows, user_email, audit_rows=True)
+
+
+class ImportSession:
+    """一个文件解析出的、等待确认导入的数据行"""
+
+    def __init__(self, rows, table_name, company_name, duplicates=None, filename=None, content_hash=None):
+        self.id = uuid.uuid4().hex
+        self.rows = rows
+        self.table_name = table_name
+        self.company_name = company_name
+        self.duplicates = duplicates or []
+        self.filename = filename
+        # 上传文件的内容哈希（见 backend.pdf_documents），导入后据此登记
+        self.content_hash = content_hash
+        self.created_at = time.time()
+
+    def duplicate_keys(self):
+        """数据库中已存在的主键（po_line）"""
+        return {duplicate['primary_key'] for duplicate in self.duplicates}
+
+    def to_dict(self):
+        """转换为接口返回的字典（不含数据行）"""
+        return {
+            'session_id': self.id,
+            'filename': self.filename,
+            'company': self.company_name,
+            'table_name': self.table_name,
+            'row_count': len(self.rows),
+            'duplicate_count': len(self.duplicates),
+            'created_at': self.created_at
+        }
+
+
+class ImportSessionManager:
+    """
+    暂存在服务端的导入会话
+
+    解析结果不再整批返回给浏览器再提交回来：stage() 把数据行保存在会话中，接口只返回会话ID、
+    行数和重复数据；用户确认后 commit() 按会话ID在一个事务中写入全部数据行（没有变化的行不重写）。
+    未提交的会话保留 retention_seconds 秒后清除，会话数超过 max_sessions 时清除最早的会话。
+    """
+
+    def __init__(self, writer=None, retention_seconds=1800, max_sessions=200, on_commit=None):
+        # writer(table_name, rows, user_email) -> (success, {'inserted', 'updated', 'unchanged', 'skipped_no_key'} 或 错误信息)
+        self.writer = writer or _upsert_rows
+        # 写入成功后调用 on_commit(session, user_email)
+        self.on_commit = on_commit
+        self.retention_seconds = retention_seconds
+        self.max_sessions = max_sessions
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def stage(self, result, filename=None, content_hash=None):
+        """
+        暂存一个解析结果
+
+        Args:
+            result: process_pdf_with_duplicate_check 等返回的结果字典
+            filename: 原始文件名
+            content_hash: 上传文件的内容哈希
+
+        Returns:
+            dict: 去掉 data 后的结果，另含 session_id 和 row_count；失败的结果原样返回
+        """
+        if not result.get('success') or 'data' not in result:
+            return result
+        session = ImportSession(result['data'], result['table_name'], result.get('company'),
+                                duplicates=result.get('duplicates'), filename=filename or result.get('filename'),
+                                content_hash=content_hash)
+        with self._lock:
+            self._purge_expired()
+            while self.max_sessions and len(self._sessions) >= self.max_sessions:
+                # 会话按创建顺序保存，第一个即最早的会话
+                oldest_id = next(iter(self._sessions))
+                logger.warning("导入会话过多，清除最早的会话: %s", oldest_id)
+                del self._sessions[oldest_id]
+            self._sessions[session.id] = session
+        staged = {key: value for key, value in result.items() if key != 'data'}
+        staged['session_id'] = session.id
+        staged['row_count'] = len(session.rows)
+        return staged
+
+    def get(self, session_id):
+        """获取会话，不存在或已过期时返回None"""
+        with self._lock:
+            self._purge_expired()
+            return self._sessions.get(session_id)
+
+    def discard(self, session_id):
+        """放弃会话，返回会话是否存在"""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def commit(self, session_id, user_email=None, mode=COMMIT_OVERWRITE):
+        """
+        把会话中的数据行写入数据库
+
+        Args:
+            session_id: 会话ID
+            user_email: 用户邮箱（用于记录操作日志）
+            mode: overwrite 覆盖已存在的行；skip_duplicates 跳过数据库中已存在的行
+
+        Returns:
+            dict: {'success': True, 'count': 写入的行数, 'inserted': 新增行数, 'updated': 更新行数,
+                   'unchanged': 未变化行数, 'skipped': 跳过的重复行数, 'skipped_no_key': 没有po_line的行数}
+                  或 {'success': False, 'error': ...}
+        """
+        if mode not in COMMIT_MODES:
+            return {'success': False, 'error': f"不支持的提交方式: {mode}"}
+        with self._lock:
+            self._purge_expired()
+            # 先取出会话，避免同一会话被重复提交
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return {'success': False, 'error': '导入会话不存在或已过期'}
+
+        rows = session.rows
+        if mode == COMMIT_SKIP_DUPLICATES and session.duplicates:
+            duplicate_keys = session.duplicate_keys()
+            rows = [row for row in rows if row.get('po_line') not in duplicate_keys]
+
+        try:
+            success, outcome = self.writer(session.table_name, rows_to_dicts(rows), user_email)
+        except Exception as e:
+            success, outcome = False, str(e)
+        if not success:
+            # 写入失败时保留会话，可以重试
+            with self._lock:
+                self._sessions.setdefault(session.id, session)
+            logger.error("导入会话 %s 写入失败: %s", session.id, outcome)
+            return {'success': False, 'error': outcome}
+        logger.info("导入会话 %s 已写入 %s: %s", session.id, session.table_name, outcome)
+        if self.on_commit is not None:
+            self.on_commit(session, user_email)
+        result = {'success': True, 'count': outcome['inserted'] + outcome['updated'],
+                  'skipped': len(session.rows) - len(rows)}
+        result.update(outcome)
+        return result
+
+    def _purge_expired(self):
+        """清除保留期已过的会话（调用方持有锁）"""
+        now = time.time()
+        expired = [
+            session_id for session_id, session in self._sessions.items()
+            if now - session.created_at > self.retention_seconds
+        ]
+        for session_id in expired:
+            del self._sessions[session_id]
@@ -0,0 +1,125 @@
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from backend.utils.config import get_pdf_config
+
+PDF_LOGGER_NAME = 'pdf_import'
+
+# 当前线程中正在收集的解析汇总记录（见 collect_parse_summaries）
+_summary_collector = threading.local()
+
+
+def _configure_pdf_logger():
+    """按 PDF_LOG_LEVEL 初始化PDF解析流程的根logger（每个进程只执行一次）"""
+    root = logging.getLogger(PDF_LOGGER_NAME)
+    if getattr(root, '_pdf_configured', False):
+        return root
+    root.setLevel(get_pdf_config()['log_level'])
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s'))
+        root.addHandler(handler)
+    root.propagate = False
+    root._pdf_configured = True
+    return root
+
+
+def get_pdf_logger(name=None):
+    """
+    获取PDF解析流程的logger
+
+    消息使用 logger.debug("... %s", value) 的形式传参，级别不够时不会格式化字符串；
+    逐行循环中先用 logger.isEnabledFor(logging.DEBUG) 取一次开关，INFO级别下每行几乎没有开销。
+    """
+    _configure_pdf_logger()
+    return logging.getLogger(f"{PDF_LOGGER_NAME}.{name}" if name else PDF_LOGGER_NAME)
+
+
+def pdf_source_name(pdf_source):
+    """日志中显示的文件名：文件路径取文件名，文件对象取其 filename / name 属性"""
+    if isinstance(pdf_source, (str, os.PathLike)):
+        return os.path.basename(os.fspath(pdf_source))
+    name = getattr(pdf_source, 'filename', None) or getattr(pdf_source, 'name', None)
+    if isinstance(name, str) and name:
+        return os.path.basename(name)
+    return '<内存文件>'
+
+
+@contextmanager
+def collect_parse_summaries():
+    """
+    收集当前线程中 ParseSummary.finish() 产生的汇总记录
+
+    用法:
+        with collect_parse_summaries() as summaries:
+            extract_centurion_data(pdf_path)
+        summaries[-1]['stages']
+    """
+    previous = getattr(_summary_collector, 'records', None)
+    records = []
+    _summary_collector.records = records
+    try:
+        yield records
+    finally:
+        _summary_collector.records = previous
+
+
+def record_parse_summaries(records):
+    """把其他进程中产生的汇总记录加入当前线程的收集列表（没有在收集时忽略）"""
+    collected = getattr(_summary_collector, 'records', None)
+    if collected is not None:
+        collected.extend(records)
+
+
+class ParseSummary:
+    """
+    单次PDF解析的汇总记录
+
+    解析过程中累加计数（页数、跳过的行数等）并用 lap() 记录各阶段耗时，结束时输出一条INFO日志，
+    汇总字典同时挂在日志记录的 pdf_summary 属性上，便于结构化的日志处理器（如基准测试）读取。
+    """
+
+    def __init__(self, logger, vendor, pdf_path):
+        self.logger = logger
+        self.vendor = vendor
+        self.pdf_path = pdf_path
+        self.counters = {}
+        self.stages = {}
+        self._start_time = time.perf_counter()
+        self._lap_time = self._start_time
+
+    def add(self, name, value=1):
+        """累加计数"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def lap(self, stage):
+        """记录从上一个阶段结束（或开始解析）到现在的耗时，作为 stage 阶段的耗时"""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._lap_time)
+        self._lap_time = now
+
+    def finish(self, rows):
+        """输出汇总日志并返回汇总字典"""
+        record = {
+            'vendor': self.vendor,
+            'file': pdf_source_name(self.pdf_path),
+            'rows': rows,
+            'elapsed': time.perf_counter() - self._start_time,
+            'stages': dict(self.stages)
+        }
+        record.update(self.counters)
+        collected = getattr(_summary_collector, 'records', None)
+        if collected is not None:
+            collected.append(record)
+        if self.logger.isEnabledFor(logging.INFO):
+            fields = [f"vendor={self.vendor}", f"file={record['file']}", f"rows={rows}"]
+            fields.extend(f"{name}={value}" for name, value in self.counters.items())
+            if self.stages:
+                fields.append("stages=" + ",".join(f"{name}:{seconds:.3f}s" for name, seconds in self.stages.items()))
+            fields.append(f"elapsed={record['elapsed']:.3f}s")
+            self.logger.info("PDF解析完成: %s", " ".join(fields), extra={'pdf_summary': record})
+        return record
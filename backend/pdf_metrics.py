@@ -0,0 +1,176 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# 耗时直方图的桶上限（毫秒），最后一个桶为 +Inf
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class ImportTimer:
+    """
+    单次PDF导入的分阶段计时
+
+    导入流程的阶段（detect / parse / duplicate_check）用 stage() 计时；
+    parse 阶段内部的细分耗时（open / text / tables / rows ...）来自提取器的解析汇总（ParseSummary）。
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._start_time = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """记录 with 块的耗时，异常时同样记录"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start)
+
+    def to_dict(self, parse_summaries=None, rows=None, cache_hit=False):
+        """
+        生成接口返回的耗时信息（毫秒）
+
+        Args:
+            parse_summaries: parse 阶段中收集到的解析汇总记录（命中解析缓存时为空）
+            rows: 提取出的数据行数
+            cache_hit: 是否命中了解析缓存
+        """
+        summary = parse_summaries[-1] if parse_summaries else None
+        return {
+            'total_ms': _to_ms(time.perf_counter() - self._start_time),
+            'stages': {name: _to_ms(seconds) for name, seconds in self.stages.items()},
+            'parse_stages': {name: _to_ms(seconds) for name, seconds in (summary or {}).get('stages', {}).items()},
+            'pages': summary.get('pages') if summary else None,
+            'rows': rows,
+            'cache_hit': cache_hit
+        }
+
+
+def _to_ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+class DurationHistogram:
+    """累积式耗时直方图（与Prometheus histogram的语义相同）"""
+
+    def __init__(self, buckets=DURATION_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+
+    def observe(self, value_ms):
+        for index, upper in enumerate(self.buckets):
+            if value_ms <= upper:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+
+    def cumulative(self):
+        """返回 [(桶上限, 累积次数), ...]，最后一项的上限为 '+Inf'"""
+        result = []
+        total = 0
+        for upper, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            result.append((upper, total))
+        return result
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum_ms': round(self.sum_ms, 1),
+            'buckets': {str(upper): count for upper, count in self.cumulative()}
+        }
+
+
+# 计数字段 -> Prometheus指标名
+_PROMETHEUS_COUNTERS = (
+    ('count', 'pdf_imports_total'),
+    ('failed', 'pdf_import_failures_total'),
+    ('cache_hits', 'pdf_import_cache_hits_total'),
+    ('pages', 'pdf_import_pages_total'),
+    ('rows', 'pdf_import_rows_total'),
+)
+
+
+class ParseMetrics:
+    """
+    PDF导入耗时的进程内统计
+
+    按 (阶段, 公司) 累计耗时直方图，另外统计每个公司的导入次数、失败次数、缓存命中次数、页数和行数。
+    导入流程的阶段直接使用阶段名，parse 阶段内部的细分阶段加 parse. 前缀（如 parse.tables）。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (阶段, 公司) -> DurationHistogram
+        self._histograms = {}
+        # 公司 -> 计数
+        self._imports = {}
+
+    def observe(self, timings, company_name, success=True):
+        """记录一次导入的耗时信息（ImportTimer.to_dict() 的结果）"""
+        company_name = company_name or 'unknown'
+        stages = dict(timings.get('stages', {}))
+        stages['total'] = timings.get('total_ms', 0.0)
+        stages.update({f"parse.{name}": value for name, value in timings.get('parse_stages', {}).items()})
+        with self._lock:
+            for stage, value_ms in stages.items():
+                histogram = self._histograms.get((stage, company_name))
+                if histogram is None:
+                    histogram = self._histograms[(stage, company_name)] = DurationHistogram()
+                histogram.observe(value_ms)
+            counters = self._imports.setdefault(
+                company_name, {'count': 0, 'failed': 0, 'cache_hits': 0, 'pages': 0, 'rows': 0}
+            )
+            counters['count'] += 1
+            if not success:
+                counters['failed'] += 1
+            if timings.get('cache_hit'):
+                counters['cache_hits'] += 1
+            counters['pages'] += timings.get('pages') or 0
+            counters['rows'] += timings.get('rows') or 0
+
+    def snapshot(self):
+        """返回统计数据的字典：{'imports': {公司: 计数}, 'stages': {阶段: {公司: 直方图}}}"""
+        with self._lock:
+            stages = {}
+            for (stage, company_name), histogram in sorted(self._histograms.items()):
+                stages.setdefault(stage, {})[company_name] = histogram.to_dict()
+            return {
+                'buckets_ms': list(DURATION_BUCKETS_MS),
+                'imports': {name: dict(counters) for name, counters in self._imports.items()},
+                'stages': stages
+            }
+
+    def to_prometheus(self):
+        """以Prometheus文本格式输出"""
+        lines = [
+            "# HELP pdf_import_stage_duration_ms PDF导入各阶段耗时（毫秒）",
+            "# TYPE pdf_import_stage_duration_ms histogram",
+        ]
+        with self._lock:
+            for (stage, company_name), histogram in sorted(self._histograms.items()):
+                labels = f'stage="{stage}",company="{company_name}"'
+                for upper, count in histogram.cumulative():
+                    lines.append(f'pdf_import_stage_duration_ms_bucket{{{labels},le="{upper}"}} {count}')
+                lines.append(f"pdf_import_stage_duration_ms_sum{{{labels}}} {histogram.sum_ms:.1f}")
+                lines.append(f"pdf_import_stage_duration_ms_count{{{labels}}} {histogram.count}")
+            for name, metric in _PROMETHEUS_COUNTERS:
+                lines.append(f"# TYPE {metric} counter")
+                for company_name, counters in sorted(self._imports.items()):
+                    lines.append(f'{metric}{{company="{company_name}"}} {counters[name]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._imports = {}
+
+
+# 进程内共享的统计实例
+parse_metrics = ParseMetrics()
@@ -0,0 +1,378 @@
+import hashlib
+import os
+import re
+from bisect import bisect_left
+
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdftypes import PDFObjRef, PDFStream, resolve1
+from pdfminer.psparser import PSLiteral
+import pdfplumber
+from pdfplumber import utils
+from pdfplumber.page import Page
+from pdfplumber.table import TableSettings
+from pdfplumber.utils.clustering import cluster_objects
+from pdfplumber.utils.text import WordExtractor
+
+
+class PageAnalysis:
+    """
+    单页版面分析结果
+
+    pdfplumber 的 extract_text() 和 extract_tables() 各自独立地处理同一页的字符流：
+    前者对整页字符做一次分词和分行，后者对表格的每一行都重新扫描整页字符。
+    这里每页只取一次字符、只做一次分词，文本、文本行和表格单元格都基于同一份结果生成，
+    输出与 page.extract_text() / page.extract_tables() 完全一致。
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.chars = page.chars
+        self._wordmap = None
+        self._text = None
+        self._lines = None
+        self._positioned_lines = None
+        self._char_index = None
+
+    @property
+    def words(self):
+        """页面上的单词对象列表"""
+        return [word for word, _ in self._get_wordmap().tuples]
+
+    @property
+    def text(self):
+        """页面文本，等价于 page.extract_text()"""
+        if self._text is None:
+            self._text = self._get_wordmap().to_textmap(presorted=True).as_string
+        return self._text
+
+    @property
+    def lines(self):
+        """页面文本行，等价于 page.extract_text().split('\\n')"""
+        if self._lines is None:
+            self._lines = self.text.split('\n')
+        return self._lines
+
+    @property
+    def positioned_lines(self):
+        """带位置的文本行列表 [(top, bottom, text), ...]，按从上到下排序"""
+        if self._positioned_lines is None:
+            positioned = []
+            for line_words in cluster_objects(self.words, 'top', 3):
+                positioned.append((
+                    min(word['top'] for word in line_words),
+                    max(word['bottom'] for word in line_words),
+                    " ".join(word['text'] for word in sorted(line_words, key=lambda word: word['x0']))
+                ))
+            positioned.sort(key=lambda line: line[0])
+            self._positioned_lines = positioned
+        return self._positioned_lines
+
+    def _get_wordmap(self):
+        if self._wordmap is None:
+            self._wordmap = WordExtractor().extract_wordmap(self.chars)
+        return self._wordmap
+
+    def _get_char_index(self):
+        """按字符垂直中点排序的索引，用于快速取出落在某一行内的字符"""
+        if self._char_index is None:
+            entries = sorted(
+                ((char['top'] + char['bottom']) / 2, position)
+                for position, char in enumerate(self.chars)
+            )
+            self._char_index = ([v_mid for v_mid, _ in entries], [position for _, position in entries])
+        return self._char_index
+
+    def _chars_in_band(self, top, bottom):
+        """取出垂直中点落在 [top, bottom) 内的字符，保持原始字符顺序"""
+        v_mids, positions = self._get_char_index()
+        start = bisect_left(v_mids, top)
+        end = bisect_left(v_mids, bottom)
+        chars = self.chars
+        return [chars[position] for position in sorted(positions[start:end])]
+
+    def extract_tables(self, table_settings=None, bbox=None):
+        """
+        提取页面上所有表格的单元格文本，等价于 page.extract_tables()
+
+        Args:
+            table_settings: pdfplumber 表格识别参数
+            bbox: 只在该区域 (x0, top, x1, bottom) 内查找表格，None表示整页
+        """
+        tset = TableSettings.resolve(table_settings)
+        if bbox is None:
+            tables = self.page.find_tables(tset)
+        elif tset.vertical_strategy == 'lines' and tset.horizontal_strategy == 'lines':
+            # 只把区域内的线条交给表格识别，效果等同于裁剪页面，但不需要逐个裁剪页面上的字符对象
+            settings = self._region_table_settings(tset, bbox)
+            if len(settings['explicit_vertical_lines']) < 2 or len(settings['explicit_horizontal_lines']) < 2:
+                # 区域内的线条不足以构成表格（pdfplumber 的 explicit 策略也不接受少于两条线）
+                return []
+            tables = self.page.find_tables(settings)
+        else:
+            tables = self.page.crop(bbox).find_tables(tset)
+        return [self._extract_table(table, dict(tset.text_settings or {})) for table in tables]
+
+    def _region_table_settings(self, tset, bbox):
+        """把 lines 策略转换为只包含区域内线条的 explicit 策略"""
+        x0, top, x1, bottom = bbox
+        vertical = []
+        horizontal = []
+        for edge in self.page.edges:
+            if edge['x1'] < x0 or edge['x0'] > x1 or edge['bottom'] < top or edge['top'] > bottom:
+                continue
+            if edge['orientation'] == 'v':
+                vertical.append(edge)
+            else:
+                horizontal.append(edge)
+        settings = {
+            name: getattr(tset, name)
+            for name in tset.__dataclass_fields__
+            if name not in ('text_settings', 'explicit_vertical_lines', 'explicit_horizontal_lines')
+        }
+        settings.update({
+            'vertical_strategy': 'explicit',
+            'horizontal_strategy': 'explicit',
+            'explicit_vertical_lines': vertical,
+            'explicit_horizontal_lines': horizontal
+        })
+        return settings
+
+    def _extract_table(self, table, text_settings):
+        """提取单个表格的单元格文本（与 Table.extract 逻辑一致，但每行只取该行范围内的字符）"""
+        table_arr = []
+        for row in table.rows:
+            x0, top, x1, bottom = row.bbox
+            row_chars = [
+                char for char in self._chars_in_band(top, bottom)
+                if x0 <= (char['x0'] + char['x1']) / 2 < x1
+            ]
+            arr = []
+            for cell in row.cells:
+                if cell is None:
+                    arr.append(None)
+                    continue
+                cell_chars = [char for char in row_chars if _char_in_bbox(char, cell)]
+                if cell_chars:
+                    text_settings['x_shift'] = cell[0]
+                    text_settings['y_shift'] = cell[1]
+                    if 'layout' in text_settings:
+                        text_settings['layout_width'] = cell[2] - cell[0]
+                        text_settings['layout_height'] = cell[3] - cell[1]
+                    arr.append(utils.extract_text(cell_chars, **text_settings))
+                else:
+                    arr.append("")
+            table_arr.append(arr)
+        return table_arr
+
+
+def _char_in_bbox(char, bbox):
+    v_mid = (char['top'] + char['bottom']) / 2
+    h_mid = (char['x0'] + char['x1']) / 2
+    x0, top, x1, bottom = bbox
+    return (h_mid >= x0) and (h_mid < x1) and (v_mid >= top) and (v_mid < bottom)
+
+
+def is_pdf_path(pdf_source):
+    """PDF来源是文件路径（而不是已打开的文件对象）"""
+    return isinstance(pdf_source, (str, os.PathLike))
+
+
+def open_pdf(pdf_source):
+    """
+    用 pdfplumber 打开PDF，pdf_source 可以是文件路径，也可以是可 seek 的二进制文件对象
+
+    文件对象会先回到开头；关闭返回的PDF时不会关闭调用方传入的文件对象。
+    """
+    if not is_pdf_path(pdf_source):
+        pdf_source.seek(0)
+    return pdfplumber.open(pdf_source)
+
+
+def count_pdf_pages(pdf):
+    """从页面树读取页数，不为每一页创建Page对象"""
+    try:
+        count = resolve1(resolve1(pdf.doc.catalog['Pages']).get('Count'))
+        if isinstance(count, int):
+            return count
+    except Exception:
+        pass
+    return len(pdf.pages)
+
+
+def iter_pdf_pages(pdf, start_page=0, end_page=None):
+    """
+    逐页产出 (页码, Page)，页码从0开始
+
+    与 pdf.pages 不同，这里不会保留已处理页面的对象：调用方处理完一页、请求下一页时，
+    上一页解析出的版面对象被释放，pdfminer 文档级的对象缓存也会被清空，
+    因此峰值内存只取决于单页大小，而不随页数增长。
+    """
+    doctop = 0
+    for page_num, page_obj in enumerate(PDFPage.create_pages(pdf.doc)):
+        if end_page is not None and page_num >= end_page:
+            break
+        page = Page(pdf, page_obj, page_number=page_num + 1, initial_doctop=doctop)
+        doctop += page.height
+        if page_num < start_page:
+            continue
+        try:
+            yield page_num, page
+        finally:
+            page.flush_cache()
+            # 已解码的内容流保存在文档级对象缓存中，清空后由pdfminer按需重新读取
+            pdf.doc._cached_objs.clear()
+            del page
+
+
+class PageContentHasher:
+    """
+    计算页面内容的哈希值
+
+    哈希覆盖页面尺寸、旋转、内容流（解码后的字节）以及页面引用的资源（字体、XObject 等），
+    不包含对象编号，因此同一页内容在不同版本的文件中（对象编号、页码不同）哈希值相同，
+    只要内容流或资源有任何变化哈希值就不同。同一文档中共享的资源对象只计算一次。
+    """
+
+    # 资源对象嵌套深度上限，防止异常文件中的深层引用
+    MAX_DEPTH = 32
+
+    def __init__(self):
+        # 对象编号 -> 该对象内容的摘要
+        self._object_digests = {}
+
+    def hash_page(self, page_obj):
+        """返回 pdfminer PDFPage 的内容哈希（十六进制字符串）"""
+        digest = hashlib.sha256()
+        digest.update(repr((list(page_obj.mediabox), list(page_obj.cropbox), page_obj.rotate)).encode('utf-8'))
+        digest.update(b'C')
+        for stream in page_obj.contents:
+            self._update(digest, stream, 0)
+        digest.update(b'R')
+        self._update(digest, page_obj.attrs.get('Resources'), 0)
+        return digest.hexdigest()
+
+    def hash_pages(self, pdf):
+        """按页码顺序返回 pdfplumber PDF 中每一页的内容哈希"""
+        hashes = []
+        for page_obj in PDFPage.create_pages(pdf.doc):
+            hashes.append(self.hash_page(page_obj))
+            # 与 iter_pdf_pages 一样，不在文档级缓存中保留已解码的内容流
+            pdf.doc._cached_objs.clear()
+        return hashes
+
+    def _update(self, digest, obj, depth):
+        if isinstance(obj, PDFObjRef):
+            object_digest = self._object_digests.get(obj.objid)
+            if object_digest is None:
+                # 先占位，循环引用时使用空摘要
+                self._object_digests[obj.objid] = b''
+                sub_digest = hashlib.sha256()
+                self._update(sub_digest, obj.resolve(), depth + 1)
+                object_digest = self._object_digests[obj.objid] = sub_digest.digest()
+            digest.update(b'@' + object_digest)
+        elif depth > self.MAX_DEPTH:
+            digest.update(b'~')
+        elif isinstance(obj, PDFStream):
+            digest.update(b's')
+            self._update(digest, obj.attrs, depth + 1)
+            data = obj.get_data()
+            digest.update(len(data).to_bytes(8, 'big') + data)
+        elif isinstance(obj, dict):
+            digest.update(b'd%d' % len(obj))
+            for key in sorted(obj, key=str):
+                digest.update(str(key).encode('utf-8', 'replace') + b'=')
+                self._update(digest, obj[key], depth + 1)
+        elif isinstance(obj, (list, tuple)):
+            digest.update(b'l%d' % len(obj))
+            for item in obj:
+                self._update(digest, item, depth + 1)
+        elif isinstance(obj, bytes):
+            digest.update(b'b' + len(obj).to_bytes(8, 'big') + obj)
+        elif isinstance(obj, PSLiteral):
+            digest.update(b'/' + str(obj.name).encode('utf-8', 'replace') + b';')
+        else:
+            digest.update(b'v' + repr(obj).encode('utf-8', 'replace') + b';')
+
+
+class TableRegionLocator:
+    """
+    根据表头和页脚关键字定位订单明细表格所在的区域
+
+    表格位于表头块之下、页脚文字（如 Page:、Incoterms:、Total Amount）之上。
+    先用已有的文本行定位区域，再只在该区域内查找表格，既减少表格识别要处理的线条，
+    也避免页脚文字混入数据行。同一文档后续页面的版面相同时直接复用上一页的区域。
+    """
+
+    # 区域上边界留出的余量，保证表头行上方的表格边框在区域内
+    TOP_MARGIN = 15
+
+    def __init__(self, header_keywords, footer_keywords):
+        self.header_patterns = [re.compile(r'\b' + re.escape(keyword) + r'\b') for keyword in header_keywords]
+        self.footer_keywords = list(footer_keywords)
+        self.region = None
+        self.header_top = None
+        self.reused = 0
+
+    def _is_header(self, text):
+        return all(pattern.search(text) for pattern in self.header_patterns)
+
+    def _is_footer(self, text):
+        return any(keyword in text for keyword in self.footer_keywords)
+
+    def _region_still_valid(self, analysis):
+        """检查上一页的区域在当前页是否仍然适用：表头和第一个页脚都在原来的位置"""
+        x0, top, x1, bottom = self.region
+        if (x0, x1) != (analysis.page.bbox[0], analysis.page.bbox[2]):
+            return False
+        header_top = self.header_top
+        header_found = False
+        for line_top, _, text in analysis.positioned_lines:
+            if not header_found:
+                if line_top > header_top + 1:
+                    return False
+                header_found = abs(line_top - header_top) <= 1 and self._is_header(text)
+            elif self._is_footer(text):
+                return abs(line_top - 1 - bottom) <= 1
+        return header_found and bottom == analysis.page.bbox[3]
+
+    def locate(self, analysis):
+        """
+        定位当前页的表格区域
+
+        Returns:
+            tuple: (x0, top, x1, bottom)，找不到表头时返回None（调用方应使用整页）
+        """
+        if self.region is not None and self._region_still_valid(analysis):
+            self.reused += 1
+            return self.region
+
+        page_x0, page_top, page_x1, page_bottom = analysis.page.bbox
+        header_top = None
+        region_bottom = page_bottom
+        for line_top, _, text in analysis.positioned_lines:
+            if header_top is None:
+                if self._is_header(text):
+                    header_top = line_top
+            elif self._is_footer(text):
+                region_bottom = line_top - 1
+                break
+
+        if header_top is None:
+            return None
+
+        self.header_top = header_top
+        self.region = (page_x0, max(page_top, header_top - self.TOP_MARGIN), page_x1, region_bottom)
+        return self.region
+
+
+def extract_tables_in_region(analysis, region_locator=None):
+    """
+    在表格区域内提取表格，定位不到区域或区域内没有表格时退回整页识别
+    """
+    if region_locator is not None:
+        region = region_locator.locate(analysis)
+        if region is not None:
+            tables = analysis.extract_tables(bbox=region)
+            if tables:
+                return tables
+    return analysis.extract_tables()
@@ -0,0 +1,186 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+from backend.pdf_logging import get_pdf_logger
+
+logger = get_pdf_logger('cache')
+
+
+def sha256_file(file_path, chunk_size=1024 * 1024):
+    """计算文件内容的SHA-256哈希值，file_path 也可以是可 seek 的二进制文件对象（读完后回到开头）"""
+    digest = hashlib.sha256()
+    if hasattr(file_path, 'read'):
+        file_path.seek(0)
+        for chunk in iter(lambda: file_path.read(chunk_size), b''):
+            digest.update(chunk)
+        file_path.seek(0)
+        return digest.hexdigest()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PDFParseCache:
+    """
+    基于内容寻址的PDF解析结果磁盘缓存
+
+    缓存键由文件内容的SHA-256、公司名称和解析器版本组成，同一份文档无论上传多少次、
+    用什么文件名上传，都只需要解析一次。缓存总大小超过上限时按最近最少使用(LRU)淘汰。
+    """
+
+    FILE_SUFFIX = '.pkl'
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024, rescan_seconds=30):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # 写入时距上次扫描目录超过该秒数就重新扫描（见 _evict）
+        self.rescan_seconds = rescan_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> (文件大小, 最后访问时间)
+        self._index = None
+        self._total_bytes = 0
+        self._scanned_at = 0
+
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    @staticmethod
+    def make_key(content_hash, company_name, extractor_version):
+        """生成缓存键"""
+        raw = f"{content_hash}:{company_name}:{extractor_version}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + self.FILE_SUFFIX)
+
+    def _load_index(self):
+        """首次使用时扫描缓存目录，重建LRU索引"""
+        if self._index is not None:
+            return
+        self._index = {}
+        self._total_bytes = 0
+        self._scanned_at = time.monotonic()
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(self.FILE_SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, filename))
+            except OSError:
+                continue
+            key = filename[:-len(self.FILE_SUFFIX)]
+            self._index[key] = (stat.st_size, stat.st_mtime)
+            self._total_bytes += stat.st_size
+
+    def _touch(self, key):
+        """更新条目的访问时间（同时写回文件mtime，重启后LRU顺序不丢失）"""
+        size, _ = self._index[key]
+        try:
+            os.utime(self._entry_path(key))
+            access_time = os.stat(self._entry_path(key)).st_mtime
+        except OSError:
+            return
+        self._index[key] = (size, access_time)
+
+    def _remove(self, key):
+        size, _ = self._index.pop(key, (0, 0))
+        self._total_bytes -= size
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """
+        淘汰最久未访问的条目，直到缓存大小不超过上限
+
+        并行解析、批量导入的工作进程共用同一个缓存目录，但各自维护索引，本进程的索引中没有其他进程
+        写入的文件、也可能还有已被其他进程淘汰的文件；因此距上次扫描超过 rescan_seconds 秒或本进程
+        统计的大小超过上限时，先重新扫描目录，按整个目录的大小和访问时间淘汰。
+        """
+        if (self._total_bytes <= self.max_bytes
+                and time.monotonic() - self._scanned_at < self.rescan_seconds):
+            return
+        self._index = None
+        self._load_index()
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+            self.evictions += 1
+
+    def get(self, key):
+        """
+        读取缓存的解析结果
+
+        Returns:
+            list: 缓存的数据行列表，未命中时返回None
+        """
+        with self._lock:
+            self._load_index()
+            if key not in self._index:
+                self.misses += 1
+                return None
+            try:
+                with open(self._entry_path(key), 'rb') as f:
+                    data = pickle.load(f)
+            except Exception as e:
+                logger.warning("读取解析缓存失败: %s (%s)", key, e)
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._touch(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        """写入解析结果（先写临时文件再原子替换）"""
+        with self._lock:
+            self._load_index()
+            entry_path = self._entry_path(key)
+            tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, entry_path)
+            except Exception as e:
+                logger.warning("写入解析缓存失败: %s (%s)", key, e)
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return False
+
+            if key in self._index:
+                self._total_bytes -= self._index[key][0]
+            stat = os.stat(entry_path)
+            self._index[key] = (stat.st_size, stat.st_mtime)
+            self._total_bytes += stat.st_size
+            self._evict()
+            return True
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._load_index()
+            for key in list(self._index.keys()):
+                self._remove(key)
+
+    def get_stats(self):
+        """获取缓存命中统计"""
+        with self._lock:
+            self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._index),
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
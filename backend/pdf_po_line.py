@@ -0,0 +1,159 @@
+import threading
+from collections.abc import Mapping, MutableMapping
+
+# wf_open 数据行的列（与原来提取器输出的字典键顺序相同）
+WF_OPEN_COLUMNS = (
+    'po', 'pn', 'line', 'po_line', 'description', 'qty', 'net_price', 'total_price', 'req_date_wf',
+    'eta_wfsz', 'shipping_mode', 'comment', 'po_placed_date', 'purchaser', 'record_no', 'shipping_cost',
+    'tracking_no', 'so_number', 'latest_departure_date', 'chinese_name', 'unit'
+)
+# non_wf_open 数据行的列
+NON_WF_OPEN_COLUMNS = (
+    'po', 'pn', 'line', 'po_line', 'description', 'qty', 'net_price', 'total_price', 'req_date',
+    'po_placed_date', 'eta_wfsz', 'shipping_mode', 'comment', 'purchaser', 'qc_result', 'shipping_cost',
+    'tracking_no', 'so_number', 'yes_not_paid'
+)
+
+
+class POLineLayout:
+    """
+    一组数据行共用的列名和列序号
+
+    同样的列组合只创建一个实例（见 get_layout），数据行只保存值列表和对布局的引用。
+    """
+
+    __slots__ = ('columns', 'index', '_changed')
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.index = {column: position for position, column in enumerate(columns)}
+        # 增加或删除一列后的布局：{(操作, 列名): 布局}
+        self._changed = {}
+
+    def with_column(self, column):
+        layout = self._changed.get(('add', column))
+        if layout is None:
+            layout = self._changed[('add', column)] = get_layout(self.columns + (column,))
+        return layout
+
+    def without_column(self, column):
+        layout = self._changed.get(('remove', column))
+        if layout is None:
+            layout = self._changed[('remove', column)] = get_layout(tuple(c for c in self.columns if c != column))
+        return layout
+
+    def __reduce__(self):
+        # 反序列化时重新取得共享的实例
+        return (get_layout, (self.columns,))
+
+
+_layouts = {}
+_layouts_lock = threading.Lock()
+
+
+def get_layout(columns):
+    """返回列组合对应的共享布局"""
+    columns = tuple(columns)
+    layout = _layouts.get(columns)
+    if layout is None:
+        with _layouts_lock:
+            layout = _layouts.setdefault(columns, POLineLayout(columns))
+    return layout
+
+
+WF_OPEN_LAYOUT = get_layout(WF_OPEN_COLUMNS)
+NON_WF_OPEN_LAYOUT = get_layout(NON_WF_OPEN_COLUMNS)
+
+
+def _restore_po_line(layout, values):
+    return POLine(layout, list(values))
+
+
+class POLine(MutableMapping):
+    """
+    提取出的一条订单明细行
+
+    原来每行是一个20多个键的字典，其中大部分值为None，解析大文件时字典本身就占了大部分内存。
+    这里每行只保存一个值列表，列名和列序号由同一批数据行共享的 POLineLayout 提供：
+    wf_open 的一行从约460字节（添加 company 后字典扩容到约830字节）降到约270字节，
+    pickle（解析缓存、进程间传输）时列名元组在同一批数据中只写入一次。
+
+    仍然支持字典的读写接口（row['po']、row.get()、row['company'] = ...），原有代码不需要修改；
+    序列化为JSON（见 backend.utils.json_provider）和写入数据库时才用 to_dict() 转换为普通字典。
+    """
+
+    __slots__ = ('_layout', '_values')
+
+    def __init__(self, layout, values):
+        self._layout = layout
+        self._values = values
+
+    @classmethod
+    def create(cls, layout, **fields):
+        """按列名创建数据行，未给出的列为None"""
+        values = [None] * len(layout.columns)
+        index = layout.index
+        for column, value in fields.items():
+            values[index[column]] = value
+        return cls(layout, values)
+
+    @classmethod
+    def from_dict(cls, row):
+        """从字典创建数据行（列的顺序与字典相同）"""
+        return cls(get_layout(tuple(row)), list(row.values()))
+
+    def __getitem__(self, column):
+        return self._values[self._layout.index[column]]
+
+    def get(self, column, default=None):
+        position = self._layout.index.get(column)
+        return default if position is None else self._values[position]
+
+    def __setitem__(self, column, value):
+        position = self._layout.index.get(column)
+        if position is None:
+            self._layout = self._layout.with_column(column)
+            self._values.append(value)
+        else:
+            self._values[position] = value
+
+    def __delitem__(self, column):
+        position = self._layout.index[column]
+        self._layout = self._layout.without_column(column)
+        del self._values[position]
+
+    def __contains__(self, column):
+        return column in self._layout.index
+
+    def __iter__(self):
+        return iter(self._layout.columns)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __eq__(self, other):
+        if isinstance(other, POLine):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def copy(self):
+        return POLine(self._layout, list(self._values))
+
+    def to_dict(self):
+        """转换为普通字典（JSON序列化、写入数据库等边界处使用）"""
+        return dict(zip(self._layout.columns, self._values))
+
+    def __reduce__(self):
+        return (_restore_po_line, (self._layout, tuple(self._values)))
+
+    def __repr__(self):
+        return f"POLine({self.to_dict()!r})"
+
+
+def rows_to_dicts(rows):
+    """把数据行列表转换为字典列表，已经是字典的行保持不变"""
+    return [row.to_dict() if isinstance(row, POLine) else row for row in rows]
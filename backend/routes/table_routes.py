@@ -1,7 +1,14 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from backend.controllers.table_controller import TableController
 from backend.pdf_import_processor import PDFImportProcessor
 from backend.operation_logger import operation_logger
+from backend.pdf_import_jobs import ImportJobManager
+from backend.pdf_import_sessions import COMMIT_OVERWRITE, ImportSessionManager
+from backend.pdf_documents import DocumentArchive, DocumentRegistry, DocumentStore
+from backend.pdf_metrics import parse_metrics
+from backend.utils.config import get_pdf_config
+from concurrent.futures import ThreadPoolExecutor
+import datetime
 import os
 import tempfile
 
@@ -11,6 +18,37 @@ table_bp = Blueprint('table', __name__, url_prefix='/api')
 # 创建控制器实例
 table_controller = TableController()
 pdf_processor = PDFImportProcessor()
+pdf_config = get_pdf_config()
+# 上传文件按内容哈希登记，已导入过的文件在解析前识别出来；压缩归档在后台线程中进行，不占用解析前的时间
+documents = None
+if pdf_config['archive_enabled']:
+    documents = DocumentArchive(
+        DocumentStore(pdf_config['archive_dir'], max_bytes=pdf_config['archive_max_mb'] * 1024 * 1024),
+        DocumentRegistry(),
+        executor=ThreadPoolExecutor(max_workers=1, thread_name_prefix='pdf-archive')
+    )
+
+def _record_session_import(session, user_email):
+    """导入会话写入数据库后，在登记表中记录导入时间"""
+    if documents is not None:
+        documents.record_import(session.content_hash, user_email)
+
+def _content_hash(document):
+    return document.content_hash if document is not None else None
+
+# 解析出的数据行暂存在服务端，前端按会话ID确认导入
+import_sessions = ImportSessionManager(
+    retention_seconds=pdf_config['session_retention_seconds'],
+    max_sessions=pdf_config['session_max'],
+    on_commit=_record_session_import
+)
+import_jobs = ImportJobManager(
+    pdf_processor,
+    workers=pdf_config['job_workers'],
+    retention_seconds=pdf_config['job_retention_seconds'],
+    sessions=import_sessions,
+    documents=documents
+)
 
 @table_bp.route('/tables/<table_name>', methods=['GET'])
 def get_table_data(table_name):
@@ -60,34 +98,228 @@ def process_pdf():
     try:
         # 获取上传的文件和公司信息
         file = request.files.get('file')
-        company = request.form.get('company')
+        # 未指定公司时根据PDF内容自动识别
+        company = request.form.get('company') or 'auto'
+        # force=1 时已导入过的文件也重新解析
+        force = request.form.get('force') == '1'
         
         # 从请求头获取用户邮箱
         user_email = request.headers.get('X-User-Email', 'pdf_importer@example.com')
         
-        if not file or not company:
-            return jsonify({'success': False, 'error': '缺少文件或公司信息'}), 400
+        if not file:
+            return jsonify({'success': False, 'error': '缺少文件'}), 400
+        
+        # 解析前登记文件（归档在后台进行），已导入过的文件直接返回
+        document = None
+        if documents is not None:
+            document = documents.receive(file.stream, file.filename)
+            if document.already_imported and not force:
+                return jsonify(document.duplicate_result())
+        
+        # 直接解析上传的文件流（内存缓冲，大文件由请求类转存到磁盘），不再另存临时文件
+        parse_started_at = datetime.datetime.now()
+        result = pdf_processor.process_pdf_with_duplicate_check(file.stream, company)
+        if documents is not None:
+            documents.record_parse(document, result, parse_started_at)
+        
+        # 注意：这里不再自动插入数据，解析出的数据行暂存在导入会话中，只返回会话ID、行数和重复数据
+        # 如果没有重复数据，前端直接调用 /api/import_sessions/<session_id>/commit 导入
+        # 如果有重复数据，前端会显示确认对话框，用户确认后再提交会话
+        
+        return jsonify(import_sessions.stage(result, file.filename, _content_hash(document)))
+                
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@table_bp.route('/import_jobs', methods=['POST'])
+def create_import_job():
+    """上传PDF并创建异步导入任务，立即返回任务ID"""
+    try:
+        file = request.files.get('file')
+        company = request.form.get('company') or 'auto'
+        force = request.form.get('force') == '1'
+        
+        if not file:
+            return jsonify({'success': False, 'error': '缺少文件'}), 400
         
-        # 创建临时文件
+        # 临时文件在任务结束后由任务管理器删除
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
             file.save(tmp_file.name)
             tmp_file_path = tmp_file.name
         
-        try:
-            # 处理PDF文件并检查重复数据
-            result = pdf_processor.process_pdf_with_duplicate_check(tmp_file_path, company)
-            
-            # 注意：这里不再自动插入数据，而是返回处理结果给前端
-            # 前端会根据是否有重复数据来决定是否调用插入接口
-            # 如果没有重复数据，前端可以直接调用插入接口
-            # 如果有重复数据，前端会显示确认对话框，用户确认后再调用插入接口
-            
-            return jsonify(result)
-        finally:
-            # 删除临时文件
-            if os.path.exists(tmp_file_path):
+        document = None
+        if documents is not None:
+            document = documents.receive(tmp_file_path, file.filename)
+            if document.already_imported and not force:
                 os.unlink(tmp_file_path)
-                
+                return jsonify(document.duplicate_result())
+        
+        job = import_jobs.submit(tmp_file_path, company, filename=file.filename, document=document)
+        return jsonify({'success': True, 'data': job.to_dict(include_result=False)}), 202
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@table_bp.route('/import_jobs', methods=['GET'])
+def list_import_jobs():
+    """列出保留期内的导入任务（不含解析结果）"""
+    return jsonify({
+        'success': True,
+        'data': [job.to_dict(include_result=False) for job in import_jobs.list_jobs()]
+    })
+
+@table_bp.route('/import_jobs/<job_id>', methods=['GET'])
+def get_import_job(job_id):
+    """查询导入任务的状态和结果"""
+    job = import_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': '任务不存在或已过期'}), 404
+    return jsonify({'success': True, 'data': job.to_dict()})
+
+@table_bp.route('/process_pdf_batch', methods=['POST'])
+def process_pdf_batch():
+    """
+    批量处理上传的PDF文件
+    
+    文件并行解析，每个文件处理完成后立即以一行JSON（application/x-ndjson）返回它的结果，
+    结果格式与 /api/process_pdf 相同（数据行暂存在导入会话中），另含文件序号 index 和文件名 filename；
+    已导入过的文件不解析，最先返回
+    """
+    try:
+        files = request.files.getlist('files')
+        company = request.form.get('company') or 'auto'
+        force = request.form.get('force') == '1'
+        
+        if not files:
+            return jsonify({'success': False, 'error': '缺少文件'}), 400
+        
+        # 请求结束前把上传的文件保存为临时文件
+        saved_files = []
+        for file in files:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+                file.save(tmp_file.name)
+                saved_files.append((file.filename, tmp_file.name))
+        
+        # 解析前登记文件（归档在后台进行），已导入过的文件不参与解析
+        file_documents = [None] * len(saved_files)
+        duplicate_results = []
+        parse_indexes = []
+        for index, (filename, tmp_file_path) in enumerate(saved_files):
+            if documents is not None:
+                file_documents[index] = documents.receive(tmp_file_path, filename)
+                if file_documents[index].already_imported and not force:
+                    result = file_documents[index].duplicate_result()
+                    result['index'] = index
+                    result['filename'] = filename
+                    duplicate_results.append(result)
+                    continue
+            parse_indexes.append(index)
+        
+        def generate():
+            try:
+                for result in duplicate_results:
+                    yield current_app.json.dumps(result) + "\n"
+                parse_files = [saved_files[index] for index in parse_indexes]
+                for result in pdf_processor.process_pdf_batch(parse_files, company):
+                    # 换算回上传时的文件序号
+                    result['index'] = parse_indexes[result['index']]
+                    document = file_documents[result['index']]
+                    # 每个文件自己的开始解析时间（只用于登记，不返回给前端）
+                    parse_started_at = result.pop('parse_started_at', None) or datetime.datetime.now()
+                    if documents is not None:
+                        documents.record_parse(document, result, parse_started_at)
+                    yield current_app.json.dumps(
+                        import_sessions.stage(result, content_hash=_content_hash(document))
+                    ) + "\n"
+            finally:
+                # 删除临时文件
+                for _, tmp_file_path in saved_files:
+                    if os.path.exists(tmp_file_path):
+                        os.unlink(tmp_file_path)
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@table_bp.route('/import_sessions/<session_id>', methods=['GET'])
+def get_import_session(session_id):
+    """查询导入会话（不含数据行）"""
+    session = import_sessions.get(session_id)
+    if session is None:
+        return jsonify({'success': False, 'error': '导入会话不存在或已过期'}), 404
+    return jsonify({'success': True, 'data': session.to_dict()})
+
+@table_bp.route('/import_sessions/<session_id>/commit', methods=['POST'])
+def commit_import_session(session_id):
+    """
+    确认导入会话中暂存的数据行
+    
+    请求体可选 {"mode": "overwrite" | "skip_duplicates"}：overwrite（默认）覆盖已存在的行，
+    skip_duplicates 只写入新行。全部数据行在一个事务中写入。
+    """
+    try:
+        mode = (request.get_json(silent=True) or {}).get('mode', COMMIT_OVERWRITE)
+        
+        # 从请求头获取用户邮箱
+        user_email = request.headers.get('X-User-Email', 'pdf_importer@example.com')
+        
+        result = import_sessions.commit(session_id, user_email, mode)
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@table_bp.route('/import_sessions/<session_id>', methods=['DELETE'])
+def discard_import_session(session_id):
+    """放弃导入会话"""
+    if not import_sessions.discard(session_id):
+        return jsonify({'success': False, 'error': '导入会话不存在或已过期'}), 404
+    return jsonify({'success': True})
+
+@table_bp.route('/pdf_documents/<content_hash>', methods=['GET'])
+def get_pdf_document(content_hash):
+    """查询上传文件的登记记录（公司、订单号、页数、解析和导入时间）"""
+    try:
+        if documents is None:
+            return jsonify({'success': False, 'error': '未启用上传文件归档'}), 404
+        record = documents.registry.get(content_hash)
+        if record is None:
+            return jsonify({'success': False, 'error': '文件不存在'}), 404
+        record['archived'] = documents.store.contains(content_hash)
+        return jsonify({'success': True, 'data': record})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@table_bp.route('/pdf_companies', methods=['GET'])
+def get_pdf_companies():
+    """获取可选择的公司列表（导入页面的公司下拉框）"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': pdf_processor.get_available_companies()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@table_bp.route('/pdf_cache/stats', methods=['GET'])
+def get_pdf_cache_stats():
+    """获取PDF解析缓存的命中统计"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': pdf_processor.get_cache_stats()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@table_bp.route('/pdf_metrics', methods=['GET'])
+def get_pdf_metrics():
+    """获取PDF导入各阶段的耗时直方图，format=prometheus 时以Prometheus文本格式返回"""
+    try:
+        if request.args.get('format') == 'prometheus':
+            return Response(parse_metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+        return jsonify({
+            'success': True,
+            'data': parse_metrics.snapshot()
+        })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -20,4 +20,51 @@ def get_app_config():
         'host': os.getenv('APP_HOST', '127.0.0.1'),
         'port': int(os.getenv('APP_PORT', '5000')),
         'debug': os.getenv('APP_DEBUG', 'True').lower() == 'true'
-    }
\ No newline at end of file
+    }
+
+
+def get_pdf_config():
+    """获取PDF解析配置"""
+    return {
+        # 并行解析的进程数，1表示串行解析
+        'parse_workers': max(1, int(os.getenv('PDF_PARSE_WORKERS', '1'))),
+        # 页数达到该值才启用并行解析，页数少时进程间通信的开销大于收益
+        'parallel_min_pages': max(1, int(os.getenv('PDF_PARALLEL_MIN_PAGES', '8'))),
+        # 批量导入时同时解析的文件数（进程数），1表示逐个解析
+        'batch_workers': max(1, int(os.getenv('PDF_BATCH_WORKERS', str(min(4, os.cpu_count() or 1))))),
+        # 异步导入任务的后台线程数，以及已完成任务结果的保留时间
+        'job_workers': max(1, int(os.getenv('PDF_JOB_WORKERS', '2'))),
+        'job_retention_seconds': max(0, int(os.getenv('PDF_JOB_RETENTION_MINUTES', '30'))) * 60,
+        # 服务端暂存的导入会话（解析后等待确认导入的数据行）的保留时间和最大会话数
+        'session_retention_seconds': max(0, int(os.getenv('PDF_IMPORT_SESSION_RETENTION_MINUTES', '30'))) * 60,
+        'session_max': max(1, int(os.getenv('PDF_IMPORT_SESSION_MAX', '200'))),
+        # 投递目录自动导入服务：监视的目录、同时解析的文件数（默认为CPU核数）、扫描间隔，
+        # 以及文件最后修改后等待多久才处理（避免读取仍在复制中的文件）
+        'hot_folder_dir': os.getenv('PDF_HOT_FOLDER_DIR', os.path.join('uploads', 'hot_folder')),
+        'hot_folder_workers': max(1, int(os.getenv('PDF_HOT_FOLDER_WORKERS', str(os.cpu_count() or 1)))),
+        'hot_folder_poll_seconds': max(1, int(os.getenv('PDF_HOT_FOLDER_POLL_SECONDS', '5'))),
+        'hot_folder_settle_seconds': max(0, int(os.getenv('PDF_HOT_FOLDER_SETTLE_SECONDS', '2'))),
+        # 单个PDF的解析预算：文件大小（MB）、页数和解析时间（秒），0表示不限制；
+        # 开启隔离解析后单个文件的解析也在独立进程中进行，超时后强制结束卡住的进程
+        'max_file_mb': max(0, int(os.getenv('PDF_MAX_FILE_MB', '50'))),
+        'max_pages': max(0, int(os.getenv('PDF_MAX_PAGES', '1000'))),
+        'parse_timeout_seconds': max(0, int(os.getenv('PDF_PARSE_TIMEOUT_SECONDS', '120'))),
+        'parse_isolation': os.getenv('PDF_PARSE_ISOLATION', 'False').lower() == 'true',
+        # 上传文件在内存中缓冲的上限（MB），超过后转存到临时文件
+        'upload_spool_mb': max(0, int(os.getenv('PDF_UPLOAD_SPOOL_MB', '16'))),
+        # PDF解析日志级别（DEBUG 输出逐行诊断信息，INFO 只输出每次解析的汇总）
+        'log_level': os.getenv('PDF_LOG_LEVEL', 'INFO').upper(),
+        # 提取表格前先裁剪到表头和页脚之间的区域
+        'table_crop': os.getenv('PDF_TABLE_CROP', 'True').lower() == 'true',
+        # 解析结果缓存
+        'cache_enabled': os.getenv('PDF_CACHE_ENABLED', 'True').lower() == 'true',
+        'cache_dir': os.getenv('PDF_CACHE_DIR', os.path.join('uploads', '.parse_cache')),
+        'cache_max_mb': max(1, int(os.getenv('PDF_CACHE_MAX_MB', '256'))),
+        # 单页解析结果缓存（保存在 cache_dir/pages 下），修订版订单只重新解析改动过的页面
+        'page_cache_enabled': os.getenv('PDF_PAGE_CACHE_ENABLED', 'True').lower() == 'true',
+        'page_cache_max_mb': max(1, int(os.getenv('PDF_PAGE_CACHE_MAX_MB', '256'))),
+        # 上传文件归档：按内容哈希gzip压缩保存并登记到 pdf_documents 表，已导入过的文件不再解析
+        'archive_enabled': os.getenv('PDF_ARCHIVE_ENABLED', 'True').lower() == 'true',
+        'archive_dir': os.getenv('PDF_ARCHIVE_DIR', os.path.join('uploads', 'archive')),
+        'archive_max_mb': max(0, int(os.getenv('PDF_ARCHIVE_MAX_MB', '2048')))
+    }
@@ -0,0 +1,13 @@
+from flask.json.provider import DefaultJSONProvider
+
+from backend.pdf_po_line import POLine
+
+
+class POLineJSONProvider(DefaultJSONProvider):
+    """在JSON响应中把 POLine 数据行序列化为普通对象，其余类型与Flask默认的处理方式相同"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, POLine):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
@@ -0,0 +1,22 @@
+import tempfile
+
+from flask import Request
+
+from backend.utils.config import get_pdf_config
+
+
+class SpooledUploadRequest(Request):
+    """
+    上传文件先缓冲在内存中的请求类
+
+    Werkzeug 默认在请求体超过 500KB 时把上传文件写入临时文件。这里改为 SpooledTemporaryFile：
+    文件不超过 PDF_UPLOAD_SPOOL_MB 时只保存在内存中，超过后才转存到磁盘（设为0时总是写入磁盘），
+    解析时直接读取 request.files 中的文件流，不需要先保存到临时文件再按路径打开。
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        max_size = get_pdf_config()['upload_spool_mb'] * 1024 * 1024
+        if max_size <= 0:
+            # SpooledTemporaryFile 的 max_size=0 表示不限大小，这里按不缓冲处理
+            return tempfile.TemporaryFile('wb+')
+        return tempfile.SpooledTemporaryFile(max_size=max_size, mode='wb+')
@@ -0,0 +1,161 @@
+import re
+import time
+from contextlib import nullcontext
+
+from pdfminer.pdfdevice import PDFTextDevice
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+
+from backend.pdf_logging import get_pdf_logger
+
+logger = get_pdf_logger('fingerprint')
+
+
+class _FirstPageTextCollector(PDFTextDevice):
+    """
+    只记录文字及其位置的pdfminer设备
+
+    pdfplumber 会为每个字符创建 LTChar 并转换成包含全部属性的字典，识别供应商只需要文字内容和所在行，
+    这里跳过这些对象的创建和版面分析，直接记录 (基线y, x, 文字, 宽度)。
+    """
+
+    def begin_page(self, page, ctm):
+        super().begin_page(page, ctm)
+        x0, y0, x1, y1 = page.mediabox
+        self.page_height = y1 - y0
+        self.chars = []
+
+    def render_char(self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate):
+        try:
+            text = font.to_unichr(cid)
+        except PDFUnicodeNotDefined:
+            text = ""
+        adv = font.char_width(cid) * fontsize * scaling
+        self.chars.append((matrix[5], matrix[4], text, adv * matrix[0]))
+        return adv
+
+    def text_above(self, min_y=None):
+        """按从上到下、从左到右的顺序拼出基线高于 min_y 的文字"""
+        lines = {}
+        for y, x, text, width in self.chars:
+            if min_y is None or y >= min_y:
+                lines.setdefault(round(y), []).append((x, text, width))
+        result = []
+        for y in sorted(lines, reverse=True):
+            parts = []
+            end = None
+            for x, text, width in sorted(lines[y]):
+                if end is not None and x - end > 1:
+                    parts.append(" ")
+                parts.append(text)
+                end = x + width
+            result.append("".join(parts))
+        return "\n".join(result)
+
+
+class VendorFingerprinter:
+    """
+    根据第一页的版面文字识别PDF所属的供应商
+
+    每个供应商在 config/column_mapping.json 中配置 fingerprint：
+        "fingerprint": {
+            "signatures": {"Purchase Order No.": 3, "Total Amount": 2},
+            "min_score": 3
+        }
+    signatures 是关键字及其权重，第一页出现的关键字权重之和为该供应商的得分。
+    只读取第一页，并且先只对页面上部（表头区域）的文字打分，表头区域无法区分时才对整页打分，
+    因此识别一个文件只需要几毫秒，不会用错误的解析器完整解析一遍。
+    """
+
+    # 表头区域占页面高度的比例
+    HEADER_RATIO = 0.4
+
+    def __init__(self, mapping_config, header_ratio=None):
+        self.header_ratio = header_ratio if header_ratio is not None else self.HEADER_RATIO
+        # 公司名称 -> ([(关键字正则, 权重), ...], 最低得分)
+        self.profiles = {}
+        for company_name, company_config in (mapping_config or {}).items():
+            if not isinstance(company_config, dict) or 'fingerprint' not in company_config:
+                continue
+            fingerprint = company_config['fingerprint']
+            signatures = [
+                (self._compile_keyword(keyword), weight)
+                for keyword, weight in fingerprint.get('signatures', {}).items()
+            ]
+            if signatures:
+                self.profiles[company_name] = (signatures, fingerprint.get('min_score', 1))
+
+    @staticmethod
+    def _compile_keyword(keyword):
+        """关键字中的空白匹配任意空白（提取的文本中单词间距可能被合并或拆分）"""
+        parts = [re.escape(part) for part in keyword.split()]
+        return re.compile(r'\s*'.join(parts))
+
+    def score_text(self, text):
+        """
+        计算文本对每个供应商的得分
+
+        Returns:
+            dict: {公司名称: 得分}
+        """
+        scores = {}
+        for company_name, (signatures, _) in self.profiles.items():
+            scores[company_name] = sum(weight for pattern, weight in signatures if pattern.search(text))
+        return scores
+
+    def best_match(self, scores):
+        """返回得分最高且达到最低得分的供应商，最高分并列时返回None"""
+        best_company = None
+        best_score = 0
+        tied = False
+        for company_name, score in scores.items():
+            if score < self.profiles[company_name][1]:
+                continue
+            if score > best_score:
+                best_company, best_score, tied = company_name, score, False
+            elif score == best_score:
+                tied = True
+        return None if tied else best_company
+
+    def detect(self, pdf_path):
+        """
+        识别PDF所属的供应商
+
+        Args:
+            pdf_path: PDF文件路径或可 seek 的二进制文件对象
+
+        Returns:
+            dict: {'company': 公司名称或None, 'scores': 各供应商得分,
+                   'region': 'header' 或 'page', 'elapsed_ms': 耗时}
+        """
+        start_time = time.perf_counter()
+        result = {'company': None, 'scores': {}, 'region': None, 'elapsed_ms': 0.0}
+        try:
+            # 传入文件对象时直接读取，不关闭调用方的文件
+            source = nullcontext(pdf_path) if hasattr(pdf_path, 'read') else open(pdf_path, 'rb')
+            with source as f:
+                f.seek(0)
+                document = PDFDocument(PDFParser(f))
+                first_page = next(PDFPage.create_pages(document), None)
+                if first_page is not None:
+                    resource_manager = PDFResourceManager(caching=True)
+                    collector = _FirstPageTextCollector(resource_manager)
+                    PDFPageInterpreter(resource_manager, collector).process_page(first_page)
+
+                    header_min_y = collector.page_height * (1 - self.header_ratio)
+                    result['region'] = 'header'
+                    result['scores'] = self.score_text(collector.text_above(header_min_y))
+                    result['company'] = self.best_match(result['scores'])
+
+                    if result['company'] is None:
+                        result['region'] = 'page'
+                        result['scores'] = self.score_text(collector.text_above())
+                        result['company'] = self.best_match(result['scores'])
+        except Exception as e:
+            logger.warning("识别供应商失败: %s", e)
+
+        result['elapsed_ms'] = (time.perf_counter() - start_time) * 1000
+        return result
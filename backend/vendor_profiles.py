@@ -0,0 +1,274 @@
+import hashlib
+import json
+import re
+import threading
+
+from backend.pdf_budget import check_page_limit, check_parse_deadline
+from backend.pdf_field_parsers import DATE_FORMATS, parse_date, parse_decimal
+from backend.pdf_logging import ParseSummary, get_pdf_logger, pdf_source_name
+from backend.pdf_page_analysis import PageAnalysis, count_pdf_pages, iter_pdf_pages, open_pdf
+from backend.pdf_po_line import POLine
+
+logger = get_pdf_logger('profiles')
+
+# 内置的手写提取器（版面复杂、无法只靠列名描述的供应商）
+BUILTIN_EXTRACTORS = ('wefabricate', 'centurion', 'magic_fx')
+# 按配置中的表格列解析的通用提取器
+TABLE_EXTRACTOR = 'table'
+
+# 通用表格提取器的版本，解析规则变化时修改，使旧的解析缓存失效
+TABLE_EXTRACTOR_VERSION = "2"
+
+# 数值列和日期列的解析方式（按数据库列名）
+DECIMAL_COLUMNS = frozenset(('qty', 'net_price', 'total_price', 'shipping_cost'))
+INTEGER_COLUMNS = frozenset(('line',))
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _normalize_label(text):
+    """表头单元格和列名的比较形式：合并空白、忽略大小写"""
+    return _WHITESPACE_RE.sub(' ', text or '').strip().casefold()
+
+
+def _is_date_column(column):
+    return column.startswith('req_date') or column.endswith('_date')
+
+
+class VendorProfile:
+    """
+    由 config/column_mapping.json 中一个公司的配置编译出的解析规则
+
+        "acme": {
+            "pdf_patterns": {"purchase_order": "PO\\s*No\\.?\\s*(\\d+)"},
+            "table_columns": {"item": "Part", "quantity": "Qty"},
+            "database_mapping": {"purchase_order": "po", "item": "pn", "quantity": "qty"},
+            "extractor": "table",            # 可选，默认按公司名称选择
+            "table_name": "non_wf_open",     # 可选，默认按公司名称选择
+            "decimal_separator": ","         # 可选，金额中的小数点符号
+        }
+
+    pdf_patterns 在第一页文字中匹配订单级字段（取第一个分组），table_columns 为明细表格的列名，
+    database_mapping 把这两类字段映射到数据库列。正则、列名和每个字段的值类型只在编译时处理一次，
+    解析时按表头行得到列序号，逐行套用编译好的行构造规则。
+    """
+
+    def __init__(self, name, company_config, date_formats=DATE_FORMATS):
+        self.name = name
+        self.digest = hashlib.sha256(
+            json.dumps(company_config, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()[:16]
+        self.extractor = company_config.get('extractor') or self._default_extractor(name)
+        if self.extractor not in BUILTIN_EXTRACTORS and self.extractor != TABLE_EXTRACTOR:
+            raise ValueError(f"{name}: 未知的提取器 {self.extractor}")
+        self.table_name = company_config.get('table_name') or self._default_table_name(name)
+        self.decimal_separator = company_config.get('decimal_separator', '.')
+        self.date_formats = tuple(date_formats)
+
+        self.header_patterns = {}
+        for field, pattern in (company_config.get('pdf_patterns') or {}).items():
+            try:
+                self.header_patterns[field] = re.compile(pattern, re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"{name}: pdf_patterns.{field} 不是有效的正则表达式: {e}")
+
+        # 字段 -> 规范化的列名
+        self.column_labels = {
+            field: _normalize_label(label)
+            for field, label in (company_config.get('table_columns') or {}).items() if label
+        }
+        # 识别表头行至少需要匹配的列数
+        self.min_header_matches = max(1, (len(self.column_labels) + 1) // 2)
+
+        # 行构造规则：[(数据库列, 来源, 字段, 值类型), ...]，来源为 'table' 或 'header'
+        self.row_builders = []
+        for field, column in (company_config.get('database_mapping') or {}).items():
+            if field in self.column_labels:
+                source = 'table'
+            elif field in self.header_patterns:
+                source = 'header'
+            else:
+                # 没有对应的列或正则（如 po_line 这类派生字段），由 build_row 统一生成
+                continue
+            self.row_builders.append((column, source, field, self._value_kind(column)))
+        # 数量列为空的行不是数据行（小计、备注、续行等）；没有映射数量时要求第一列非空
+        required = [field for column, source, field, _ in self.row_builders if source == 'table' and column == 'qty']
+        if not required and self.column_labels:
+            required = [next(iter(self.column_labels))]
+        self.required_fields = tuple(required)
+
+    @staticmethod
+    def _default_extractor(name):
+        if name in BUILTIN_EXTRACTORS:
+            return name
+        # 历史配置中的通用公司沿用原来的解析方式
+        if name.startswith('generic_wf'):
+            return 'wefabricate'
+        if name.startswith('generic_non_wf'):
+            return 'centurion'
+        return TABLE_EXTRACTOR
+
+    @staticmethod
+    def _default_table_name(name):
+        if name in ('centurion', 'magic_fx') or 'non_wf' in name:
+            return 'non_wf_open'
+        return 'wf_open'
+
+    @staticmethod
+    def _value_kind(column):
+        if column in DECIMAL_COLUMNS:
+            return 'decimal'
+        if column in INTEGER_COLUMNS:
+            return 'integer'
+        if _is_date_column(column):
+            return 'date'
+        return 'text'
+
+    def parse_value(self, kind, value):
+        """按值类型解析单元格或订单字段的文本"""
+        if not value:
+            return None
+        if kind == 'decimal':
+            return parse_decimal(value, decimal_separator=self.decimal_separator)
+        if kind == 'integer':
+            value = value.strip()
+            return int(value) if value.isdigit() else None
+        if kind == 'date':
+            return parse_date(value, formats=self.date_formats)
+        return _WHITESPACE_RE.sub(' ', value).strip()
+
+    @property
+    def cache_version(self):
+        """解析缓存键中的版本：通用表格提取器的结果还取决于该公司的配置"""
+        if self.extractor == TABLE_EXTRACTOR:
+            return f"{TABLE_EXTRACTOR}{TABLE_EXTRACTOR_VERSION}-{self.digest}"
+        return None
+
+    def match_header_fields(self, text):
+        """在订单文字中匹配 pdf_patterns，返回 {字段: 文本}"""
+        values = {}
+        for field, pattern in self.header_patterns.items():
+            match = pattern.search(text or '')
+            if match:
+                values[field] = (match.group(1) if pattern.groups else match.group(0)).strip()
+        return values
+
+    def map_columns(self, row):
+        """
+        如果 row 是明细表格的表头行，返回 {字段: 列序号}，否则返回None
+
+        单元格与列名相同或以列名开头（如 "Quantity Unit"）即视为匹配。
+        """
+        cells = [_normalize_label(cell) for cell in row]
+        column_index = {}
+        for field, label in self.column_labels.items():
+            for index, cell in enumerate(cells):
+                if cell and (cell == label or cell.startswith(label)) and index not in column_index.values():
+                    column_index[field] = index
+                    break
+        if len(column_index) < self.min_header_matches:
+            return None
+        return column_index
+
+    def build_row(self, row, column_index, header_values, line_number):
+        """按编译好的规则把一行表格单元格转换为数据行，不是数据行时返回None"""
+        cells = {
+            field: (row[index] if index < len(row) else None)
+            for field, index in column_index.items()
+        }
+        if any(not (cells.get(field) or '').strip() for field in self.required_fields):
+            return None
+
+        data_row = {}
+        for column, source, field, kind in self.row_builders:
+            raw = cells.get(field) if source == 'table' else header_values.get(field)
+            data_row[column] = self.parse_value(kind, raw)
+        po_number = data_row.get('po') or ''
+        if data_row.get('line') is None:
+            data_row['line'] = line_number
+        data_row['po'] = po_number
+        data_row['po_line'] = f"{po_number}/{data_row['line']}" if po_number else str(data_row['line'])
+        return POLine.from_dict(data_row)
+
+
+def extract_profile_data(pdf_path, profile):
+    """
+    按供应商配置解析PDF（通用表格提取器）
+
+    订单级字段取自第一页文字；明细行取自各页的表格：遇到表头行时按列名确定列序号，
+    之后的行（包括后续页面上没有表头的续表）按列序号构造数据行。
+    """
+    data = []
+    summary = ParseSummary(logger, profile.name, pdf_path)
+    header_values = None
+    column_index = None
+
+    with open_pdf(pdf_path) as pdf:
+        page_count = count_pdf_pages(pdf)
+        check_page_limit(page_count)
+        summary.lap('open')
+        for page_num, page in iter_pdf_pages(pdf):
+            check_parse_deadline(page_num)
+            analysis = PageAnalysis(page)
+            if header_values is None:
+                header_values = profile.match_header_fields(analysis.text)
+                logger.debug("订单字段: %s", header_values)
+                summary.lap('text')
+            tables = analysis.extract_tables()
+            summary.lap('tables')
+            for table in tables:
+                for row in table:
+                    header = profile.map_columns(row)
+                    if header is not None:
+                        column_index = header
+                        continue
+                    if column_index is None:
+                        continue
+                    data_row = profile.build_row(row, column_index, header_values, len(data) + 1)
+                    if data_row is not None:
+                        data.append(data_row)
+            summary.lap('rows')
+        summary.add('pages', page_count)
+
+    if column_index is None:
+        logger.warning("未找到 %s 的明细表头: %s", profile.name, pdf_source_name(pdf_path))
+    summary.finish(len(data))
+    return data
+
+
+# 按配置内容缓存编译结果：同一份配置在每个进程中只编译一次，请求之间共享
+# （编译结果可以pickle，随任务传给工作进程）
+_compiled_profiles = {}
+_COMPILED_PROFILES_MAX = 8
+_compiled_profiles_lock = threading.Lock()
+
+
+def compile_vendor_profiles(mapping_config):
+    """
+    编译 column_mapping.json 中的所有公司配置
+
+    Returns:
+        dict: {公司名称: VendorProfile}；配置无效的公司记录错误后跳过
+    """
+    cache_key = hashlib.sha256(
+        json.dumps(mapping_config or {}, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    ).hexdigest()
+    with _compiled_profiles_lock:
+        profiles = _compiled_profiles.get(cache_key)
+    if profiles is not None:
+        return profiles
+
+    date_formats = (mapping_config or {}).get('date_formats') or DATE_FORMATS
+    profiles = {}
+    for company_name, company_config in (mapping_config or {}).items():
+        if not isinstance(company_config, dict) or 'database_mapping' not in company_config:
+            continue
+        try:
+            profiles[company_name] = VendorProfile(company_name, company_config, date_formats)
+        except ValueError as e:
+            logger.error("供应商配置无效，已跳过: %s", e)
+    with _compiled_profiles_lock:
+        if len(_compiled_profiles) >= _COMPILED_PROFILES_MAX:
+            _compiled_profiles.clear()
+        _compiled_profiles[cache_key] = profiles
+    return profiles
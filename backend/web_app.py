@@ -6,7 +6,9 @@ import hashlib
 import json
 import os
 from functools import wraps
+from backend.utils.json_provider import POLineJSONProvider
 from backend.utils.jwt_utils import verify_token
+from backend.utils.upload_stream import SpooledUploadRequest
 
 # 导入路由蓝图
 from backend.routes.table_routes import table_bp
@@ -19,6 +21,10 @@ template_dir = os.path.join(project_root, 'frontend')
 static_dir = os.path.join(project_root, 'frontend')
 
 app = Flask(__name__, template_folder=template_dir, static_folder=static_dir, static_url_path='')
+# 上传的PDF缓冲在内存中，超过 PDF_UPLOAD_SPOOL_MB 才写入磁盘
+app.request_class = SpooledUploadRequest
+# 解析出的 POLine 数据行在生成JSON响应时才转换为字典
+app.json = POLineJSONProvider(app)
 
 # 注册路由蓝图
 app.register_blueprint(table_bp)
@@ -187,6 +187,39 @@ def create_users_table(cursor):
     except Exception as e:
         print(f"✗ 创建用户表时出错: {e}")
 
+def create_pdf_documents_table(cursor):
+    """创建上传文件登记表"""
+    try:
+        create_table_query = """
+        CREATE TABLE IF NOT EXISTS purchase_orders.pdf_documents (
+            content_hash CHAR(64) PRIMARY KEY,
+            filename VARCHAR(255),
+            size_bytes BIGINT,
+            stored_bytes BIGINT,
+            upload_count INTEGER DEFAULT 1,
+            company VARCHAR(100),
+            po TEXT,
+            table_name VARCHAR(50),
+            page_count INTEGER,
+            row_count INTEGER,
+            parse_error TEXT,
+            first_uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            parse_started_at TIMESTAMP,
+            parsed_at TIMESTAMP,
+            imported_at TIMESTAMP,
+            imported_by VARCHAR(255)
+        )
+        """
+        cursor.execute(create_table_query)
+        
+        # 创建索引
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_pdf_documents_po ON purchase_orders.pdf_documents(po)")
+        
+        print("✓ 成功创建上传文件登记表")
+    except Exception as e:
+        print(f"✗ 创建上传文件登记表时出错: {e}")
+
 def main():
     """主函数"""
     print("开始初始化数据库...")
@@ -206,6 +239,7 @@ def main():
         create_non_wf_open_table(cursor)
         create_non_wf_closed_table(cursor)
         create_users_table(cursor)  # 添加用户表创建
+        create_pdf_documents_table(cursor)
         
         # 提交更改
         connection.commit()
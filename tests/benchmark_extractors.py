@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF提取器性能基准测试脚本
+
+离线生成 Wefaricate、Centurion、MAGIC FX 格式的合成采购订单（1、10、100、1000行，
+Wefaricate订单包含跨页断开的Schedule Lines块），分别计时各提取器的各个阶段，
+输出每秒行数和峰值内存，并与基准文件比较，耗时超出容差的用例标记为退化。
+
+每个用例在独立的子进程中运行，峰值内存（ru_maxrss）互不影响。
+
+用法:
+    python tests/benchmark_extractors.py                  # 运行并与基准文件比较
+    python tests/benchmark_extractors.py --save-baseline  # 运行并更新基准文件
+    python tests/benchmark_extractors.py --sizes 1 10 --vendors wefabricate --repeat 5
+"""
+
+import sys
+import os
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_pdfs import GENERATORS
+
+DEFAULT_SIZES = [1, 10, 100, 1000]
+BASELINE_PATH = os.path.join(project_root, 'tests', 'benchmark_baseline.json')
+# 耗时超过基准的比例（同时至少慢 MIN_REGRESSION_SECONDS 秒）视为退化
+DEFAULT_TOLERANCE = 0.25
+MIN_REGRESSION_SECONDS = 0.05
+
+
+class _SummaryCollector(logging.Handler):
+    """收集提取器输出的解析汇总记录（ParseSummary）"""
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.summaries = []
+
+    def emit(self, record):
+        summary = getattr(record, 'pdf_summary', None)
+        if summary is not None:
+            self.summaries.append(summary)
+
+
+def _run_case(vendor, line_count, pdf_path, repeat):
+    """在子进程中运行单个用例，返回最快一次的耗时、各阶段耗时和峰值内存"""
+    import resource
+    from backend.db_pdf_processor import extract_wefaricate_data, extract_centurion_data, extract_magic_fx_data
+    from backend.pdf_logging import get_pdf_logger
+    from backend.vendor_fingerprint import VendorFingerprinter
+
+    extractors = {
+        'wefabricate': lambda path: extract_wefaricate_data(path, workers=1),
+        'centurion': extract_centurion_data,
+        'magic_fx': extract_magic_fx_data,
+    }
+
+    # 只收集汇总记录，不向控制台输出解析日志
+    pdf_logger = get_pdf_logger()
+    pdf_logger.handlers = []
+    pdf_logger.setLevel(logging.INFO)
+    collector = _SummaryCollector()
+    pdf_logger.addHandler(collector)
+
+    with open(os.path.join(project_root, 'config', 'column_mapping.json'), 'r', encoding='utf-8') as f:
+        fingerprinter = VendorFingerprinter(json.load(f))
+
+    best = None
+    for _ in range(repeat):
+        collector.summaries = []
+        start = time.perf_counter()
+        detected = fingerprinter.detect(pdf_path)
+        fingerprint_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        rows = extractors[vendor](pdf_path)
+        total_seconds = time.perf_counter() - start
+
+        stages = {'fingerprint': fingerprint_seconds}
+        if collector.summaries:
+            stages.update(collector.summaries[-1].get('stages', {}))
+        if best is None or total_seconds < best['seconds']:
+            best = {
+                'seconds': total_seconds,
+                'stages': stages,
+                'rows': len(rows),
+                'detected': detected['company'],
+            }
+
+    best['vendor'] = vendor
+    best['lines'] = line_count
+    best['rows_per_second'] = best['rows'] / best['seconds'] if best['seconds'] > 0 else 0.0
+    best['peak_memory_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return best
+
+
+def run_benchmark(vendors, sizes, repeat):
+    """生成合成PDF并逐个运行用例"""
+    results = []
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as work_dir:
+        for vendor in vendors:
+            for line_count in sizes:
+                pdf_path = GENERATORS[vendor](os.path.join(work_dir, f"{vendor}_{line_count}.pdf"), line_count)
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(_run_case, vendor, line_count, pdf_path, repeat).result()
+                results.append(result)
+                print_result(result)
+    return results
+
+
+def print_header():
+    print(f"{'供应商':<12} {'行数':>6} {'提取行':>6} {'耗时(秒)':>10} {'行/秒':>10} {'峰值内存(MB)':>12}  阶段耗时(秒)")
+
+
+def print_result(result):
+    stages = " ".join(f"{name}={seconds:.3f}" for name, seconds in result['stages'].items())
+    detected = "" if result['detected'] == result['vendor'] else f"  [识别为: {result['detected']}]"
+    print(f"{result['vendor']:<12} {result['lines']:>6} {result['rows']:>6} {result['seconds']:>10.3f} "
+          f"{result['rows_per_second']:>10.1f} {result['peak_memory_mb']:>12.1f}  {stages}{detected}")
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    baseline = {
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': {f"{result['vendor']}:{result['lines']}": result for result in results}
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False, sort_keys=True)
+    print(f"\n基准文件已更新: {path}")
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """与基准比较，返回退化的用例列表"""
+    regressions = []
+    print(f"\n与基准比较（容差 {tolerance:.0%}，基准机器: {baseline.get('machine', {}).get('platform', '未知')}）")
+    print(f"{'用例':<18} {'基准(秒)':>10} {'本次(秒)':>10} {'变化':>8}  结论")
+    for result in results:
+        key = f"{result['vendor']}:{result['lines']}"
+        base = baseline.get('results', {}).get(key)
+        if base is None:
+            print(f"{key:<18} {'-':>10} {result['seconds']:>10.3f} {'-':>8}  无基准")
+            continue
+        change = (result['seconds'] - base['seconds']) / base['seconds'] if base['seconds'] > 0 else 0.0
+        verdict = "正常"
+        if result['rows'] != base['rows']:
+            verdict = f"提取行数变化 ({base['rows']} -> {result['rows']})"
+            regressions.append(key)
+        elif change > tolerance and result['seconds'] - base['seconds'] > MIN_REGRESSION_SECONDS:
+            verdict = "退化"
+            regressions.append(key)
+        print(f"{key:<18} {base['seconds']:>10.3f} {result['seconds']:>10.3f} {change:>+8.0%}  {verdict}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF提取器性能基准测试")
+    parser.add_argument('--vendors', nargs='+', choices=sorted(GENERATORS), default=list(GENERATORS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3, help="每个用例重复次数，取最快一次")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="基准文件路径")
+    parser.add_argument('--save-baseline', action='store_true', help="用本次结果更新基准文件")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="允许的耗时增长比例")
+    args = parser.parse_args()
+
+    print_header()
+    results = run_benchmark(args.vendors, args.sizes, args.repeat)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\n未找到基准文件 {args.baseline}，使用 --save-baseline 生成")
+        return 0
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n性能退化: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
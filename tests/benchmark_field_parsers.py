@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字段解析函数的性能测试脚本
+
+用模拟订单中的日期、数量和金额字符串，对比各提取器原来内联的解析写法（旧实现）
+和 backend.pdf_field_parsers 中的共享实现的耗时，并检查两者的结果完全一致。
+
+用法: python tests/benchmark_field_parsers.py [字段数 ...]
+"""
+
+import sys
+import os
+import re
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.pdf_field_parsers import (
+    MAGIC_FX_DATE_FORMAT, MAGIC_FX_DATE_FORMATS, WEFARICATE_DATE_FORMAT, WEFARICATE_DATE_FORMATS,
+    parse_date, parse_decimal, parse_eur_price
+)
+
+REFERENCE_DATE_FORMATS = [
+    '%m/%d/%y', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d', '%Y-%m-%d', '%m-%d-%Y', '%m-%d-%y', '%b %d, %Y', '%B %d, %Y'
+]
+REFERENCE_WEFARICATE_DATE_FORMATS = [fmt for fmt in REFERENCE_DATE_FORMATS if fmt != '%d/%m/%Y']
+
+
+def reference_parse_date(date_str, date_formats=REFERENCE_DATE_FORMATS):
+    """旧实现：每次依次尝试所有格式"""
+    if not date_str:
+        return None
+    for fmt in date_formats:
+        try:
+            return datetime.strptime(date_str.strip(), fmt).date()
+        except:
+            continue
+    return None
+
+
+def reference_magic_fx_date(date_str):
+    try:
+        return datetime.strptime(date_str, '%d-%m-%Y').date()
+    except:
+        return None
+
+
+def reference_parse_decimal(value):
+    if not value:
+        return None
+    try:
+        clean_value = re.sub(r'[€$£]', '', str(value))
+        clean_value = clean_value.replace(',', '')
+        return Decimal(clean_value)
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def reference_magic_fx_decimal(value):
+    """旧实现：先把MAGIC FX的逗号小数转换为点小数，再调用 parse_decimal"""
+    return reference_parse_decimal(f"€{value.replace('.', '').replace(',', '.')}")
+
+
+def reference_wf_eur_price(price_str):
+    if not price_str:
+        return "", ""
+    price_match = re.search(r'[\d,]+\.?\d*', price_str.replace(',', ''))
+    if not price_match:
+        return price_str, ""
+    per_match = re.search(r'per\s+(\d+)', price_str, re.IGNORECASE)
+    quantity = int(per_match.group(1)) if per_match else 1
+    try:
+        price_value = float(price_match.group(0))
+        unit_price = price_value / quantity
+        return f"€{unit_price:.4f}", f"€{price_value:.2f}"
+    except:
+        return price_str, ""
+
+
+def build_samples(count):
+    """构造与真实订单相似的字段：交期集中在少数几天，金额各不相同"""
+    base_date = date(2025, 10, 1)
+    dates = [base_date + timedelta(days=n % 30) for n in range(count)]
+    return {
+        'wefabricate_dates': [d.strftime('%b %d, %Y').replace(' 0', ' ') for d in dates],
+        'magic_fx_dates': [d.strftime('%d-%m-%Y') for d in dates],
+        'us_dates': [d.strftime('%m/%d/%Y') for d in dates],
+        'amounts': [f"€{n * 13.37:,.2f}" for n in range(1, count + 1)],
+        'magic_fx_amounts': [f"{n * 13.37:,.2f}".replace(',', ' ').replace('.', ',').replace(' ', '.')
+                             for n in range(1, count + 1)],
+        'eur_prices': [f"{n * 1.5:,.2f} EUR per {1 + n % 3 * 99}" for n in range(1, count + 1)],
+    }
+
+
+def time_call(func, values):
+    start = time.perf_counter()
+    results = [func(value) for value in values]
+    return results, time.perf_counter() - start
+
+
+def run_benchmark(counts):
+    cases = [
+        ('Wefaricate日期', 'wefabricate_dates',
+         lambda value: reference_parse_date(value, REFERENCE_WEFARICATE_DATE_FORMATS),
+         lambda value: parse_date(value, WEFARICATE_DATE_FORMAT, WEFARICATE_DATE_FORMATS)),
+        ('MAGIC FX日期', 'magic_fx_dates', reference_magic_fx_date,
+         lambda value: parse_date(value, MAGIC_FX_DATE_FORMAT, MAGIC_FX_DATE_FORMATS)),
+        ('通用日期', 'us_dates', reference_parse_date, parse_date),
+        ('金额', 'amounts', reference_parse_decimal, parse_decimal),
+        ('MAGIC FX金额', 'magic_fx_amounts', reference_magic_fx_decimal,
+         lambda value: parse_decimal(value, decimal_separator=',')),
+        ('欧元单价', 'eur_prices', reference_wf_eur_price, lambda value: parse_eur_price(value, unit_decimals=4)),
+    ]
+    print(f"{'字段':<14} {'字段数':>8} {'旧实现(秒)':>12} {'共享实现(秒)':>14} {'加速':>8}")
+    for count in counts:
+        samples = build_samples(count)
+        for name, sample_key, reference, current in cases:
+            values = samples[sample_key]
+            expected, old_seconds = time_call(reference, values)
+            actual, new_seconds = time_call(current, values)
+            assert expected == actual, f"{name}: 解析结果不一致"
+            speedup = old_seconds / new_seconds if new_seconds > 0 else float('inf')
+            print(f"{name:<14} {count:>8} {old_seconds:>12.4f} {new_seconds:>14.4f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    run_benchmark(counts)
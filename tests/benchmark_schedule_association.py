@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wefaricate Schedule Lines 跨页关联的性能测试脚本
+
+构造不同行数的页面信息，对比逐行向后查找（旧实现）和一次反向扫描（当前实现）的耗时，
+并检查两者的关联结果完全一致。
+
+用法: python tests/benchmark_schedule_association.py [行数 ...]
+"""
+
+import sys
+import os
+import io
+import time
+import contextlib
+from datetime import date, timedelta
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.db_pdf_processor import (
+    ELEMENT_DATA, ELEMENT_SCHEDULE, _associate_wefaricate_pages, _find_next_schedule_dates,
+    _sorted_wefaricate_elements
+)
+
+ROWS_PER_PAGE = 40
+
+
+def build_pages_info(line_count, schedule_every=1, trailing_without_schedule=0):
+    """
+    构造页面信息：每 schedule_every 个数据行后跟一个Schedule Lines，
+    最后 trailing_without_schedule 个数据行后面没有Schedule Lines（旧实现的最坏情况）
+    """
+    pages_info = []
+    page = None
+    row_index = 0
+    base_date = date(2025, 10, 1)
+
+    def current_page():
+        nonlocal page, row_index
+        if page is None or row_index >= ROWS_PER_PAGE:
+            page = {
+                'page_num': len(pages_info),
+                'data_rows': [],
+                'schedule_lines': [],
+                'po_number': "4500012345" if not pages_info else "",
+                'po_placed_date': base_date if not pages_info else None,
+                'purchaser': "Jane Buyer" if not pages_info else ""
+            }
+            pages_info.append(page)
+            row_index = 1
+        return page
+
+    for n in range(1, line_count + 1):
+        item = f"{n * 10:05d}"
+        current_page()['data_rows'].append({
+            "item": item,
+            "item_no_zero": str(n * 10),
+            "id_part": f"1000-2000-{n % 10000:04d}",
+            "description": f"PART {n}",
+            "quantity": "10",
+            "net_price": "€1.5000",
+            "net_value": "€15.00",
+            "table_row_index": row_index
+        })
+        row_index += 1
+        if n <= line_count - trailing_without_schedule and n % schedule_every == 0:
+            current_page()['schedule_lines'].append({
+                'table_row_index': row_index,
+                'date_row_index': row_index + 1,
+                'req_date': base_date + timedelta(days=n % 90),
+                'date_cell': "",
+                'quantity': "10"
+            })
+            row_index += 2
+    return pages_info
+
+
+def reference_next_schedule_dates(all_elements):
+    """旧实现：对每个数据行向后线性查找最近的Schedule Lines"""
+    next_dates = [None] * len(all_elements)
+    for i, element in enumerate(all_elements):
+        if element[2] == ELEMENT_DATA:
+            for j in range(i + 1, len(all_elements)):
+                if all_elements[j][2] == ELEMENT_SCHEDULE:
+                    next_dates[i] = all_elements[j][4]['req_date']
+                    break
+    return next_dates
+
+
+def time_call(func, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(line_counts):
+    print(f"{'行数':>8} {'旧实现(秒)':>12} {'反向扫描(秒)':>14} {'完整关联(秒)':>14} {'每千行(毫秒)':>14}")
+    for line_count in line_counts:
+        # 一半的行没有后续Schedule Lines，模拟框架订单中大量只在末尾给出交期的情况
+        pages_info = build_pages_info(line_count, trailing_without_schedule=line_count // 2)
+        elements = _sorted_wefaricate_elements(pages_info)
+
+        expected, old_seconds = time_call(reference_next_schedule_dates, elements)
+        actual, new_seconds = time_call(_find_next_schedule_dates, elements)
+        # 只比较数据行（Schedule Lines元素本身的值不被使用）
+        for element, old_value, new_value in zip(elements, expected, actual):
+            if element[2] == ELEMENT_DATA:
+                assert old_value == new_value, "关联结果不一致"
+
+        rows, total_seconds = time_call(_associate_wefaricate_pages, pages_info)
+        assert len(rows) == line_count
+
+        print(f"{line_count:>8} {old_seconds:>12.4f} {new_seconds:>14.4f} {total_seconds:>14.4f} "
+              f"{total_seconds / line_count * 1000 * 1000:>14.3f}")
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [250, 500, 1000, 2000, 4000]
+    run_benchmark(counts)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF提取结果黄金样本回归测试脚本
+
+对本地采购订单样本目录中的每个PDF调用 PDFImportProcessor.process_pdf_by_company
+（与上传接口相同的公司路由逻辑），把提取出的数据行与保存的黄金JSON逐行比较，
+并记录每个文件的耗时和内存峰值，最后输出最慢的文件和所有行级差异。
+
+样本目录结构（子目录名即公司名称，auto 表示按第一页内容自动识别）:
+    pdf_samples/
+        wefabricate/Purchase Order - 4500008993.pdf
+        wefabricate/Purchase Order - 4500008993.golden.json
+        centurion/...
+        auto/...
+
+用法:
+    python tests/golden_regression.py [样本目录]            # 比较并输出差异
+    python tests/golden_regression.py [样本目录] --update   # 用本次结果生成/更新黄金JSON
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from datetime import date, datetime
+from decimal import Decimal
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.pdf_import_processor import PDFImportProcessor
+
+DEFAULT_CORPUS_DIR = os.path.join(project_root, 'pdf_samples')
+GOLDEN_SUFFIX = '.golden.json'
+
+
+def normalize_value(value):
+    """把数据行中的值转换为可以写入JSON并稳定比较的形式"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def normalize_rows(rows):
+    return [{key: normalize_value(value) for key, value in row.items()} for row in rows or []]
+
+
+def find_corpus_files(corpus_dir):
+    """返回 [(公司名称, PDF路径), ...]"""
+    files = []
+    for company_name in sorted(os.listdir(corpus_dir)):
+        company_dir = os.path.join(corpus_dir, company_name)
+        if not os.path.isdir(company_dir):
+            continue
+        for filename in sorted(os.listdir(company_dir)):
+            if filename.lower().endswith('.pdf'):
+                files.append((company_name, os.path.join(company_dir, filename)))
+    return files
+
+
+def golden_path_for(pdf_path):
+    return os.path.splitext(pdf_path)[0] + GOLDEN_SUFFIX
+
+
+def _row_keys(rows):
+    """优先用 po_line 作为行的标识，不唯一时退回行号"""
+    keys = [row.get('po_line') for row in rows]
+    if all(keys) and len(set(keys)) == len(keys):
+        return keys
+    return [f"#{index + 1}" for index in range(len(rows))]
+
+
+def diff_rows(expected_rows, actual_rows):
+    """
+    逐行比较提取结果
+
+    Returns:
+        list: 差异描述列表，完全一致时为空
+    """
+    expected_by_key = dict(zip(_row_keys(expected_rows), expected_rows))
+    actual_by_key = dict(zip(_row_keys(actual_rows), actual_rows))
+    diffs = []
+    for key, expected in expected_by_key.items():
+        actual = actual_by_key.get(key)
+        if actual is None:
+            diffs.append(f"缺少行 {key}")
+            continue
+        for field in sorted(set(expected) | set(actual)):
+            if expected.get(field) != actual.get(field):
+                diffs.append(f"行 {key} 字段 {field}: {expected.get(field)!r} -> {actual.get(field)!r}")
+    for key in actual_by_key:
+        if key not in expected_by_key:
+            diffs.append(f"多出行 {key}")
+    return diffs
+
+
+def run_file(processor, company_name, pdf_path, measure_memory):
+    """提取单个文件，返回结果、耗时和内存峰值"""
+    start = time.perf_counter()
+    resolved_company = processor.resolve_company(pdf_path, company_name)
+    rows = processor.process_pdf_by_company(pdf_path, resolved_company)
+    seconds = time.perf_counter() - start
+
+    peak_memory_mb = None
+    if measure_memory:
+        # tracemalloc会拖慢解析，内存单独再跑一遍，不影响上面的计时
+        tracemalloc.start()
+        try:
+            processor.process_pdf_by_company(pdf_path, resolved_company)
+            peak_memory_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'file': pdf_path,
+        'company': resolved_company,
+        'rows': normalize_rows(rows),
+        'seconds': seconds,
+        'peak_memory_mb': peak_memory_mb,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF提取结果黄金样本回归测试")
+    parser.add_argument('corpus_dir', nargs='?', default=os.getenv('PDF_CORPUS_DIR', DEFAULT_CORPUS_DIR))
+    parser.add_argument('--update', action='store_true', help="用本次结果生成/更新黄金JSON")
+    parser.add_argument('--top', type=int, default=10, help="列出最慢的文件数")
+    parser.add_argument('--no-memory', action='store_true', help="不统计内存峰值（省去第二遍解析）")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.corpus_dir):
+        print(f"样本目录不存在: {args.corpus_dir}")
+        return 1
+
+    corpus_files = find_corpus_files(args.corpus_dir)
+    if not corpus_files:
+        print(f"样本目录中没有PDF文件: {args.corpus_dir}")
+        return 1
+
+    with tempfile.TemporaryDirectory() as upload_dir:
+        processor = PDFImportProcessor(upload_folder=upload_dir)
+        # 不使用解析缓存，每个文件都真实解析一遍
+        processor.parse_cache = None
+
+        results = []
+        failures = {}
+        for company_name, pdf_path in corpus_files:
+            relative_path = os.path.relpath(pdf_path, args.corpus_dir)
+            try:
+                result = run_file(processor, company_name, pdf_path, not args.no_memory)
+            except Exception as e:
+                failures[relative_path] = [f"提取失败: {e}"]
+                continue
+            result['file'] = relative_path
+            results.append(result)
+
+            golden_path = golden_path_for(pdf_path)
+            if args.update:
+                with open(golden_path, 'w', encoding='utf-8') as f:
+                    json.dump({'company': result['company'], 'rows': result['rows']}, f,
+                              indent=2, ensure_ascii=False, sort_keys=True)
+                continue
+            if not os.path.exists(golden_path):
+                failures[relative_path] = ["没有黄金JSON（使用 --update 生成）"]
+                continue
+            with open(golden_path, 'r', encoding='utf-8') as f:
+                golden = json.load(f)
+            diffs = diff_rows(golden['rows'], result['rows'])
+            if golden.get('company') != result['company']:
+                diffs.insert(0, f"公司识别: {golden.get('company')} -> {result['company']}")
+            if diffs:
+                failures[relative_path] = diffs
+
+    # 最慢的文件
+    print(f"\n最慢的 {min(args.top, len(results))} 个文件（共 {len(results)} 个）")
+    print(f"{'耗时(秒)':>10} {'内存峰值(MB)':>12} {'行数':>6}  文件")
+    for result in sorted(results, key=lambda item: item['seconds'], reverse=True)[:args.top]:
+        memory = f"{result['peak_memory_mb']:.1f}" if result['peak_memory_mb'] is not None else "-"
+        print(f"{result['seconds']:>10.3f} {memory:>12} {len(result['rows']):>6}  {result['file']}")
+    total_seconds = sum(result['seconds'] for result in results)
+    total_rows = sum(len(result['rows']) for result in results)
+    print(f"合计: {total_seconds:.3f} 秒, {total_rows} 行")
+
+    if args.update:
+        print(f"\n已更新 {len(results)} 个黄金JSON")
+        return 1 if failures else 0
+
+    # 行级差异
+    if failures:
+        print(f"\n{len(failures)} 个文件与黄金JSON不一致:")
+        for relative_path, diffs in failures.items():
+            print(f"\n  {relative_path}")
+            for diff in diffs:
+                print(f"    {diff}")
+        return 1
+    print("\n所有文件与黄金JSON一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
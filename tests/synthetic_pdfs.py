@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成供应商PDF生成器
+不依赖任何第三方库，直接写出最小的PDF文件，用于离线基准测试和回归测试
+"""
+
+import os
+import random
+from datetime import date, timedelta
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+FONT_SIZE = 8
+ROW_HEIGHT = 14
+TOP_MARGIN = 60
+BOTTOM_MARGIN = 60
+
+
+def _escape(text):
+    """转义PDF字符串中的特殊字符"""
+    return str(text).replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+class _Page:
+    """单页内容流构建器"""
+
+    def __init__(self):
+        self.ops = []
+
+    def text(self, x, y, value, size=FONT_SIZE):
+        if value is None or value == "":
+            return
+        self.ops.append(f"BT /F1 {size} Tf {x:.2f} {y:.2f} Td ({_escape(value)}) Tj ET")
+
+    def line(self, x1, y1, x2, y2):
+        self.ops.append(f"{x1:.2f} {y1:.2f} m {x2:.2f} {y2:.2f} l S")
+
+    def table(self, x, y_top, widths, rows):
+        """绘制带完整网格线的表格，返回表格底部的y坐标"""
+        total_width = sum(widths)
+        y = y_top
+        self.line(x, y, x + total_width, y)
+        for row in rows:
+            cx = x
+            for width, cell in zip(widths, row):
+                self.text(cx + 2, y - ROW_HEIGHT + 4, cell)
+                cx += width
+            y -= ROW_HEIGHT
+            self.line(x, y, x + total_width, y)
+        cx = x
+        for width in widths:
+            self.line(cx, y_top, cx, y)
+            cx += width
+        self.line(cx, y_top, cx, y)
+        return y
+
+    def stream(self):
+        return ("0.5 w\n" + "\n".join(self.ops) + "\n").encode('latin-1', 'replace')
+
+
+def write_pdf(pages, path):
+    """把页面列表写成PDF文件"""
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog_id = add(None)
+    pages_id = add(None)
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    page_ids = []
+    for page in pages:
+        content = page.stream()
+        content_id = add(b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream")
+        page_id = add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>".encode()
+        )
+        page_ids.append(page_id)
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+    objects[catalog_id - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for index, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{index} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode()
+    output += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root {catalog_id} 0 R >>\n"
+        f"startxref\n{xref_offset}\n%%EOF\n"
+    ).encode()
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, 'wb') as f:
+        f.write(bytes(output))
+    return path
+
+
+def _rows_per_page(header_height):
+    usable = PAGE_HEIGHT - TOP_MARGIN - BOTTOM_MARGIN - header_height
+    return int(usable // ROW_HEIGHT)
+
+
+WEFARICATE_WIDTHS = [40, 80, 170, 70, 120, 90]
+WEFARICATE_HEADER = ["Item", "ID", "Description", "Quantity", "Net Price", "Net Value"]
+
+
+def generate_wefaricate_pdf(path, line_count, po_number="4500012345", seed=0):
+    """生成Wefaricate格式的合成采购订单，Schedule Lines块会跨页断开"""
+    rng = random.Random(seed)
+    base_date = date(2025, 10, 1)
+
+    # 每个订单行由三行表格组成：数据行、Schedule Lines行、日期行
+    logical_rows = []
+    for n in range(1, line_count + 1):
+        qty = rng.randint(1, 5000)
+        price = rng.randint(100, 99999) / 100
+        per = rng.choice([1, 1, 100])
+        total = round(qty * price / per, 2)
+        req = base_date + timedelta(days=rng.randint(0, 120))
+        item = f"{n * 10:05d}"
+        pn = f"{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+        logical_rows.append([item, pn, f"SYNTHETIC PART {n}", f"{qty:,} PC",
+                             f"{price:,.2f} EUR per {per}", f"{total:,.2f} EUR"])
+        logical_rows.append(["", "", "Schedule Lines:", "", "", ""])
+        logical_rows.append(["", "", "", f"{qty:,}", req.strftime('%b %d, %Y').replace(' 0', ' '), ""])
+
+    pages = []
+    first_header_height = 60
+    index = 0
+    page_no = 1
+    while index < len(logical_rows) or not pages:
+        page = _Page()
+        y = PAGE_HEIGHT - TOP_MARGIN
+        header_height = 0
+        if page_no == 1:
+            page.text(30, y, f"Purchase Order {po_number}", size=12)
+            page.text(30, y - 16, f"Created on: {base_date.strftime('%b %d, %Y').replace(' 0', ' ')}")
+            page.text(30, y - 30, "Contact Person: Jane Buyer")
+            header_height = first_header_height
+        capacity = _rows_per_page(header_height) - 1
+        chunk = logical_rows[index:index + capacity]
+        # 把数据行留在页尾，让Schedule Lines块落到下一页
+        if index + capacity < len(logical_rows) and len(chunk) > 2 and chunk[-1][0] == "":
+            while chunk and chunk[-1][0] == "":
+                chunk.pop()
+        index += len(chunk)
+        page.table(30, y - header_height, WEFARICATE_WIDTHS, [WEFARICATE_HEADER] + chunk)
+        page.text(30, 40, f"Page: {page_no}   We Fabricate B.V.   Incoterms: FCA")
+        pages.append(page)
+        page_no += 1
+    return write_pdf(pages, path)
+
+
+def generate_centurion_pdf(path, line_count, po_number="PO-77001", seed=0):
+    """生成Centurion格式的合成采购订单（纯文本行）"""
+    rng = random.Random(seed)
+    lines = [
+        f"Purchase order Number {po_number}",
+        "Date 01/10/2025",
+        "Currency USD",
+        "Line Item number Description Date Quantity Unit Unit price Discount Percent Amount",
+    ]
+    for n in range(1, line_count + 1):
+        qty = rng.randint(1, 5000)
+        price = rng.randint(1, 9999) / 100
+        total = qty * price
+        req = date(2025, 10, 1) + timedelta(days=rng.randint(0, 120))
+        pn = f"610-{rng.randint(100, 999)}-{rng.randint(100, 999)}"
+        lines.append(f"{n} {pn} SYNTHETIC ITEM {n} {req.strftime('%d/%m/%Y')} {qty:,.2f} Each "
+                     f"{price:.2f} 0.00 0.00 {total:,.2f}")
+        if n % 7 == 0:
+            lines.append(f"WRAPPED DESCRIPTION {n}")
+    lines.append("Subtotal")
+    lines.append("Total")
+
+    per_page = _rows_per_page(0)
+    pages = []
+    for start in range(0, len(lines), per_page):
+        page = _Page()
+        y = PAGE_HEIGHT - TOP_MARGIN
+        for text in lines[start:start + per_page]:
+            page.text(30, y, text)
+            y -= ROW_HEIGHT
+        pages.append(page)
+    return write_pdf(pages, path)
+
+
+MAGIC_FX_WIDTHS = [50, 50, 20, 170, 60, 50, 60, 70]
+MAGIC_FX_HEADER = ["Code", "Code", "", "Description", "Delivery", "Qty", "Price", "Amount"]
+
+
+def _eu_number(value):
+    """按MAGIC FX格式输出数字：点是千分位，逗号是小数点"""
+    return f"{value:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def generate_magic_fx_pdf(path, line_count, po_number="30012345", seed=0):
+    """生成MAGIC FX格式的合成采购订单（表格只在第一页），最后一页表格下方有总金额和送货地址"""
+    rng = random.Random(seed)
+    rows = []
+    for n in range(1, line_count + 1):
+        qty = rng.randint(1, 500)
+        price = rng.randint(100, 999999) / 100
+        req = date(2025, 10, 1) + timedelta(days=rng.randint(0, 120))
+        rows.append(["VARIOUS", "VARIOUS", "", f"SYNTHETIC EFFECT {n}", req.strftime('%d-%m-%Y'),
+                     f"{qty} pc", _eu_number(price), _eu_number(qty * price)])
+
+    pages = []
+    per_page = _rows_per_page(60) - 1
+    for start in range(0, max(len(rows), 1), per_page):
+        page = _Page()
+        y = PAGE_HEIGHT - TOP_MARGIN
+        if not pages:
+            page.text(30, y, f"Purchase Order No. {po_number}", size=12)
+            page.text(30, y - 16, "Date 01-10-2025")
+        bottom = page.table(30, y - 60, MAGIC_FX_WIDTHS, [MAGIC_FX_HEADER] + rows[start:start + per_page])
+        if start + per_page >= len(rows):
+            # 表格下方的页脚文字，解析时不应混入数据行
+            total = sum(float(row[7].replace('.', '').replace(',', '.')) for row in rows)
+            page.text(30, bottom - 20, f"Total Amount EUR {_eu_number(total)}")
+            page.text(30, bottom - 34, "Delivery address: Synthetic Street 1, Eindhoven")
+        pages.append(page)
+    return write_pdf(pages, path)
+
+
+TABLE_VENDOR_WIDTHS = [40, 90, 200, 60, 70, 80, 70]
+TABLE_VENDOR_HEADER = ["Pos", "Part No", "Description", "Qty", "Unit Price", "Amount", "Due Date"]
+
+
+def generate_table_vendor_pdf(path, line_count, po_number="88001234", seed=0):
+    """生成只有普通明细表格的采购订单（没有内置提取器的新供应商），表头只出现在第一页"""
+    rng = random.Random(seed)
+    rows = []
+    for n in range(1, line_count + 1):
+        qty = rng.randint(1, 900)
+        price = rng.randint(100, 99999) / 100
+        due = date(2025, 11, 1) + timedelta(days=rng.randint(0, 90))
+        rows.append([str(n), f"AC-{rng.randint(10000, 99999)}", f"TABLE VENDOR PART {n}", str(qty),
+                     f"{price:,.2f}", f"{qty * price:,.2f}", due.strftime('%Y-%m-%d')])
+    rows.append(["", "", "Total", "", "", f"{sum(float(row[5].replace(',', '')) for row in rows):,.2f}", ""])
+
+    pages = []
+    per_page = _rows_per_page(60) - 1
+    for start in range(0, len(rows), per_page):
+        page = _Page()
+        y = PAGE_HEIGHT - TOP_MARGIN
+        chunk = rows[start:start + per_page]
+        if not pages:
+            page.text(30, y, f"ACME Components Order No. {po_number}", size=12)
+            page.text(30, y - 16, "Order Date: 2025-10-15")
+            chunk = [TABLE_VENDOR_HEADER] + chunk
+        page.table(30, y - 60, TABLE_VENDOR_WIDTHS, chunk)
+        pages.append(page)
+    return write_pdf(pages, path)
+
+
+GENERATORS = {
+    'wefabricate': generate_wefaricate_pdf,
+    'centurion': generate_centurion_pdf,
+    'magic_fx': generate_magic_fx_pdf,
+}
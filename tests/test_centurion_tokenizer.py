@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Centurion逐行状态机测试脚本
+"""
+
+import sys
+import os
+from datetime import date
+from decimal import Decimal
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.db_pdf_processor import CenturionLineTokenizer
+
+HEADER_LINES = [
+    "Purchase order Number PO-77001",
+    "Date 01/10/2025",
+    "Currency EUR",
+    "Line Item number Description Date Quantity Unit Unit price Discount Percent Amount",
+]
+
+
+def item_line(line_number, pn, description="WIDGET"):
+    return f"{line_number} {pn} {description} 05/10/2025 1,000.00 Each 1.25 0.00 0.00 1,250.00"
+
+
+def feed_all(tokenizer, lines):
+    rows = []
+    for line in lines:
+        rows.extend(tokenizer.feed(line))
+    return rows
+
+
+def test_rows_emitted_as_they_complete():
+    """测试项目在下一行确定不是延续行时立即产出"""
+    tokenizer = CenturionLineTokenizer()
+    assert feed_all(tokenizer, HEADER_LINES) == []
+    assert tokenizer.feed(item_line(1, "610-111-222")) == []
+    # 下一行是新项目，上一项目完成
+    rows = tokenizer.feed(item_line(2, "610-333-444"))
+    assert [row['line'] for row in rows] == [1]
+    row = rows[0]
+    print(f"row: {row}")
+    assert row['po'] == "77001" and row['po_line'] == "77001/1"
+    assert row['po_placed_date'] == date(2025, 10, 1)
+    assert row['req_date'] == date(2025, 10, 5)
+    assert row['qty'] == Decimal("1000.00")
+    assert row['net_price'] == Decimal("1.25") and row['total_price'] == Decimal("1250.00")
+    assert [row['line'] for row in tokenizer.finish()] == [2]
+
+
+def test_continuation_lines():
+    """测试折行的PN和描述合并到上一项目"""
+    tokenizer = CenturionLineTokenizer()
+    rows = feed_all(tokenizer, HEADER_LINES + [
+        item_line(1, "610-111-"), "222 LEFT BRACKET",
+        item_line(2, "610-333-444"), "WRAPPED DESCRIPTION", "IGNORED LINE",
+        "Subtotal",
+    ])
+    rows.extend(tokenizer.finish())
+    assert [(row['pn'], row['description']) for row in rows] == [
+        ("610-111-222", "WIDGET LEFT BRACKET"),
+        ("610-333-444", "WIDGET WRAPPED DESCRIPTION"),
+    ]
+
+
+def test_header_fields_after_item_header():
+    """测试表头字段出现在明细之后时，数据行等到字段找到后再产出"""
+    tokenizer = CenturionLineTokenizer()
+    lines = ["Purchase order Number PO-77001", "Date 01/10/2025", HEADER_LINES[-1],
+             item_line(1, "610-111-222"), item_line(2, "610-333-444")]
+    assert feed_all(tokenizer, lines) == []
+    rows = tokenizer.feed("Currency GBP")
+    assert [row['line'] for row in rows] == [1, 2]
+    assert all(row['net_price'] == Decimal("1.25") for row in rows)
+
+    # 文档中没有货币时使用默认的美元
+    tokenizer = CenturionLineTokenizer()
+    feed_all(tokenizer, lines)
+    assert [row['line'] for row in tokenizer.finish()] == [1, 2]
+
+
+if __name__ == "__main__":
+    test_rows_emitted_as_they_complete()
+    test_continuation_lines()
+    test_header_fields_after_item_header()
+    print("Centurion逐行状态机测试完成")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史PDF订单批量导入测试脚本
+"""
+
+import sys
+import os
+import io
+import tempfile
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.pdf_backfill import BackfillImporter, load_checkpoint
+
+
+def fake_parse(pdf_path, company_name):
+    """每个文件解析出两行；文件名含 broken 时解析失败"""
+    name = os.path.splitext(os.path.basename(pdf_path))[0]
+    if 'broken' in name:
+        return {"success": False, "error": "未从PDF中提取到有效数据"}
+    data = [{"po_line": f"{name}/{line}"} for line in (1, 2)]
+    return {"success": True, "data": data, "duplicates": [], "table_name": "wf_open", "company": "wefabricate"}
+
+
+class FakeWriter:
+    """记录写入的批次，第 fail_on_call 次调用时模拟数据库故障"""
+
+    def __init__(self, fail_on_call=None):
+        self.calls = []
+        self.fail_on_call = fail_on_call
+
+    def __call__(self, table_name, rows):
+        self.calls.append((table_name, [row['po_line'] for row in rows]))
+        if len(self.calls) == self.fail_on_call:
+            return False, "数据库连接失败"
+        return True, len(rows)
+
+
+def make_archive(directory, names):
+    for name in names:
+        path = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b"%PDF-1.4")
+
+
+def make_importer(archive_dir, writer, **kwargs):
+    return BackfillImporter(archive_dir, parse_func=fake_parse, db_writer=writer, out=io.StringIO(),
+                            progress_seconds=0, **kwargs)
+
+
+def test_batches_and_resume_after_crash():
+    """测试按行数分批写入，以及数据库故障后从检查点继续"""
+    with tempfile.TemporaryDirectory() as archive_dir:
+        make_archive(archive_dir, ["2023/a.pdf", "2023/b.pdf", "2024/c.pdf", "2024/d.pdf", "2024/e.pdf"])
+
+        # 每批4行（2个文件），第二批写入失败
+        writer = FakeWriter(fail_on_call=2)
+        importer = make_importer(archive_dir, writer, batch_rows=4)
+        try:
+            importer.run()
+            raise AssertionError("应在第二批写入失败时中断")
+        except RuntimeError:
+            pass
+        assert writer.calls[0] == ('wf_open', ["a/1", "a/2", "b/1", "b/2"])
+        checkpoint = load_checkpoint(importer.state_path)
+        assert sorted(checkpoint) == [os.path.join("2023", "a.pdf"), os.path.join("2023", "b.pdf")]
+
+        # 重新运行：跳过已提交的文件，中断时未提交的文件重新导入
+        writer = FakeWriter()
+        importer = make_importer(archive_dir, writer, batch_rows=4)
+        stats = importer.run()
+        print(f"stats: {stats}")
+        assert stats['skipped'] == 2 and stats['imported'] == 3 and stats['rows'] == 6
+        assert [po_lines for _, po_lines in writer.calls] == [["c/1", "c/2", "d/1", "d/2"], ["e/1", "e/2"]]
+        assert len(load_checkpoint(importer.state_path)) == 5
+
+        # 全部导入后再次运行不做任何事
+        writer = FakeWriter()
+        stats = make_importer(archive_dir, writer).run()
+        assert stats['total'] == 0 and writer.calls == []
+
+
+def test_failed_files_and_retry():
+    """测试解析失败的文件写入检查点，--retry-failed 时重新处理"""
+    with tempfile.TemporaryDirectory() as archive_dir:
+        make_archive(archive_dir, ["a.pdf", "broken.pdf"])
+        stats = make_importer(archive_dir, FakeWriter()).run()
+        assert stats['imported'] == 1 and stats['failed'] == 1
+
+        assert make_importer(archive_dir, FakeWriter()).run()['total'] == 0
+        stats = make_importer(archive_dir, FakeWriter(), retry_failed=True).run()
+        assert stats['total'] == 1 and stats['failed'] == 1
+
+
+def test_rows_without_key_not_counted():
+    """测试写入时跳过的没有po_line的行不计入导入的行数"""
+    def writer(table_name, rows):
+        return True, {'inserted': len(rows) - 1, 'updated': 0, 'unchanged': 0, 'skipped_no_key': 1}
+
+    with tempfile.TemporaryDirectory() as archive_dir:
+        make_archive(archive_dir, ["a.pdf"])
+        stats = make_importer(archive_dir, writer).run()
+        assert stats['rows'] == 1 and stats['skipped_no_key'] == 1
+
+
+if __name__ == "__main__":
+    test_batches_and_resume_after_crash()
+    test_failed_files_and_retry()
+    test_rows_without_key_not_counted()
+    print("批量导入测试完成")
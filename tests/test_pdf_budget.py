@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF解析预算（文件大小、页数、解析时间）测试脚本
+"""
+
+import sys
+import os
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import backend.pdf_budget as pdf_budget
+from backend.db_pdf_processor import extract_centurion_data, extract_magic_fx_data, extract_wefaricate_data
+from backend.pdf_budget import (
+    LIMIT_FILE_SIZE, LIMIT_PAGES, LIMIT_TIMEOUT, ParseBudget, ParseBudgetExceeded, ProcessPoolLeases,
+    enforce_parse_budget, iter_pool_results
+)
+from synthetic_pdfs import generate_centurion_pdf, generate_magic_fx_pdf, generate_wefaricate_pdf
+
+
+def expect_exceeded(func, limit):
+    try:
+        func()
+    except ParseBudgetExceeded as e:
+        print(f"超出预算: {e}")
+        assert e.limit == limit
+        return e
+    raise AssertionError("应当抛出 ParseBudgetExceeded")
+
+
+def sleep_and_return(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_file_size_and_page_limits():
+    """测试文件大小和页数上限在解析前生效"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, "po.pdf")
+        generate_wefaricate_pdf(pdf_path, 30)
+
+        error = expect_exceeded(lambda: ParseBudget(max_file_bytes=1024).check_file_size(pdf_path), LIMIT_FILE_SIZE)
+        assert error.actual == os.path.getsize(pdf_path)
+        with open(pdf_path, 'rb') as f:
+            f.seek(10)
+            expect_exceeded(lambda: ParseBudget(max_file_bytes=1024).check_file_size(f), LIMIT_FILE_SIZE)
+            assert f.tell() == 10
+
+        def parse_with_page_limit():
+            with enforce_parse_budget(ParseBudget(max_pages=1)):
+                extract_wefaricate_data(pdf_path, workers=1)
+
+        expect_exceeded(parse_with_page_limit, LIMIT_PAGES)
+
+        # MAGIC FX订单只解析第一页，页数同样在解析前按页面树检查
+        mfx_path = generate_magic_fx_pdf(os.path.join(tmp_dir, "mfx.pdf"), 80)
+
+        def parse_magic_fx_with_page_limit():
+            with enforce_parse_budget(ParseBudget(max_pages=1)):
+                extract_magic_fx_data(mfx_path)
+
+        assert expect_exceeded(parse_magic_fx_with_page_limit, LIMIT_PAGES).actual == 2
+
+        # 预算内的解析结果不变
+        with enforce_parse_budget(ParseBudget(max_pages=100, timeout_seconds=600)):
+            assert extract_wefaricate_data(pdf_path, workers=1) == extract_wefaricate_data(pdf_path, workers=1)
+
+
+def test_deadline_stops_between_pages():
+    """测试超过解析时间后在页面之间停止并给出已解析的页数"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, "po.pdf")
+        generate_centurion_pdf(pdf_path, 120)
+        budget = ParseBudget(timeout_seconds=1).start()
+        budget.deadline = time.time() - 1
+
+        def parse_after_deadline():
+            with enforce_parse_budget(budget):
+                extract_centurion_data(pdf_path)
+
+        error = expect_exceeded(parse_after_deadline, LIMIT_TIMEOUT)
+        assert error.pages_parsed is not None
+        assert error.to_dict()['limit'] == LIMIT_TIMEOUT
+
+
+def test_hung_worker_is_killed():
+    """测试卡住的工作进程被强制结束，其余任务在新进程池中完成"""
+    original_grace = pdf_budget.KILL_GRACE_SECONDS
+    pdf_budget.KILL_GRACE_SECONDS = 0
+    pools = []
+
+    def get_pool():
+        if not pools:
+            pools.append(ProcessPoolExecutor(max_workers=1))
+        return pools[-1]
+
+    def reset_pool():
+        pools.clear()
+
+    tasks = [('hung', sleep_and_return, (60,)), ('quick', sleep_and_return, (0,))]
+    try:
+        start = time.time()
+        results = dict(iter_pool_results(get_pool, reset_pool, tasks, timeout_seconds=1, poll_seconds=0.2))
+        elapsed = time.time() - start
+    finally:
+        pdf_budget.KILL_GRACE_SECONDS = original_grace
+        for pool in pools:
+            pool.shutdown(wait=True)
+
+    print(f"结果: {results}，耗时 {elapsed:.1f}s")
+    assert isinstance(results['hung'], ParseBudgetExceeded)
+    assert results['hung'].limit == LIMIT_TIMEOUT
+    assert results['quick'] == 0
+    assert elapsed < 30
+
+
+def test_pool_leases_are_exclusive():
+    """测试同时借出的进程池互不相同，强制结束一个不影响另一个，正常归还的进程池被复用"""
+    leases = ProcessPoolLeases(max_idle=1)
+    first = leases.acquire(1)
+    second = leases.acquire(1)
+    try:
+        assert first is not second
+        hung = first.submit(sleep_and_return, 60)
+        other = second.submit(sleep_and_return, 0.5)
+        time.sleep(0.2)
+        leases.discard(first, kill=True)
+        assert other.result(timeout=30) == 0.5
+        assert hung.done()
+
+        leases.release(second)
+        assert leases.acquire(1) is second
+        # 进程数不同时新建进程池
+        leases.release(second)
+        third = leases.acquire(2)
+        assert third is not second
+        leases.discard(third)
+    finally:
+        leases.shutdown()
+
+
+if __name__ == "__main__":
+    test_file_size_and_page_limits()
+    test_deadline_stops_between_pages()
+    test_hung_worker_is_killed()
+    test_pool_leases_are_exclusive()
+    print("解析预算测试完成")
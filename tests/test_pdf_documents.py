@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上传文件归档与登记测试脚本
+"""
+
+import sys
+import os
+import io
+import gzip
+import datetime
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.pdf_documents import DocumentArchive, DocumentStore
+from backend.pdf_import_sessions import ImportSessionManager
+from backend.pdf_parse_cache import sha256_file
+
+
+class FakeRegistry:
+    """模拟登记表，记录保存在内存中"""
+
+    def __init__(self):
+        self.records = {}
+
+    def get(self, content_hash):
+        record = self.records.get(content_hash)
+        return dict(record) if record else None
+
+    def register_upload(self, content_hash, filename, size_bytes, stored_bytes):
+        previous = self.get(content_hash)
+        record = self.records.setdefault(content_hash, {'filename': filename, 'upload_count': 0, 'imported_at': None})
+        record['size_bytes'] = size_bytes
+        if stored_bytes is not None:
+            record['stored_bytes'] = stored_bytes
+        record['upload_count'] += 1
+        return previous
+
+    def record_stored(self, content_hash, stored_bytes):
+        self.records[content_hash]['stored_bytes'] = stored_bytes
+
+    def record_parse(self, content_hash, company, po, table_name, page_count, row_count, parse_error,
+                     started_at, finished_at):
+        self.records[content_hash].update(company=company, po=po, table_name=table_name, page_count=page_count,
+                                          row_count=row_count, parse_error=parse_error, parsed_at=finished_at)
+
+    def record_import(self, content_hash, user_email):
+        self.records[content_hash].update(imported_at=datetime.datetime(2025, 10, 15, 9, 30), imported_by=user_email)
+
+
+def make_pdf_bytes(seed, size=20000):
+    # 内容重复度接近真实PDF中的文字流，压缩后明显变小
+    return b"%PDF-1.4\n" + (f"BT /F1 10 Tf (PO {seed} LINE) Tj ET\n".encode() * (size // 30))
+
+
+def test_store_dedup_and_compression():
+    """测试同样内容只保存一份、压缩保存且可以原样读出"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = DocumentStore(tmp_dir)
+        content = make_pdf_bytes(1)
+        stream = io.BytesIO(content)
+        content_hash, stored_bytes = store.put(stream)
+        print(f"原始 {len(content)} 字节，压缩后 {stored_bytes} 字节")
+        assert content_hash == sha256_file(io.BytesIO(content))
+        assert stream.tell() == 0
+        assert stored_bytes < len(content) // 4
+        with gzip.open(store.path_for(content_hash), 'rb') as f:
+            assert f.read() == content
+
+        path = os.path.join(tmp_dir, 'upload.pdf')
+        with open(path, 'wb') as f:
+            f.write(content)
+        assert store.put(path) == (content_hash, stored_bytes)
+        assert store.get_stats()['files'] == 1
+        assert store.open(content_hash).read() == content
+        assert store.open('0' * 64) is None
+
+        # 重新扫描目录后索引相同
+        assert DocumentStore(tmp_dir).contains(content_hash)
+
+
+def test_store_bounded():
+    """测试总大小超过上限时淘汰最久未访问的文件"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = DocumentStore(tmp_dir)
+        first, size = store.put(io.BytesIO(make_pdf_bytes(1)))
+        store.max_bytes = size * 2
+        second, _ = store.put(io.BytesIO(make_pdf_bytes(2)))
+        os.utime(store.path_for(first), (1, 1))
+        store._index[first] = (size, 1)
+        third, _ = store.put(io.BytesIO(make_pdf_bytes(3)))
+        assert not store.contains(first) and not os.path.exists(store.path_for(first))
+        assert store.contains(second) and store.contains(third)
+        assert store.get_stats()['evictions'] == 1
+
+
+def test_duplicate_upload_detected_before_parsing():
+    """测试导入过的文件再次上传时在解析前识别出来，并记录解析和导入结果"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        registry = FakeRegistry()
+        archive = DocumentArchive(DocumentStore(tmp_dir), registry)
+        content = make_pdf_bytes(1)
+
+        document = archive.receive(io.BytesIO(content), 'po.pdf')
+        assert not document.already_imported
+        result = {"success": True, "data": [{'po': '4500010045'}, {'po': '4500010045'}],
+                  "company": "centurion", "table_name": "non_wf_open", "timings": {'pages': 3}}
+        archive.record_parse(document, result, datetime.datetime.now())
+        record = registry.get(document.content_hash)
+        assert record['po'] == '4500010045' and record['page_count'] == 3 and record['row_count'] == 2
+        assert record['size_bytes'] == len(content) and record['stored_bytes'] < len(content)
+
+        # 解析后未导入（取消导入）的文件可以再次上传解析
+        assert not archive.receive(io.BytesIO(content), 'po.pdf').already_imported
+
+        sessions = ImportSessionManager(writer=lambda table_name, rows, user_email: (
+            True, {'inserted': len(rows), 'updated': 0, 'unchanged': 0}
+        ), on_commit=lambda session, user_email: archive.record_import(session.content_hash, user_email))
+        staged = sessions.stage(result, 'po.pdf', document.content_hash)
+        assert sessions.commit(staged['session_id'], 'user@example.com')['success']
+
+        again = archive.receive(io.BytesIO(content), 'renamed.pdf')
+        duplicate = again.duplicate_result()
+        print(f"重复上传: {duplicate['error']}")
+        assert again.already_imported and not duplicate['success']
+        assert duplicate['duplicate_upload']['imported_by'] == 'user@example.com'
+        assert registry.get(document.content_hash)['upload_count'] == 3
+
+
+def test_archive_in_background():
+    """测试传入 executor 时压缩在后台进行，上传的原文件可以立即删除，已归档的文件不再复制"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        registry = FakeRegistry()
+        store = DocumentStore(os.path.join(tmp_dir, 'archive'))
+        executor = ThreadPoolExecutor(max_workers=1)
+        archive = DocumentArchive(store, registry, executor=executor)
+        content = make_pdf_bytes(1)
+        path = os.path.join(tmp_dir, 'upload.pdf')
+        with open(path, 'wb') as f:
+            f.write(content)
+
+        document = archive.receive(path, 'po.pdf')
+        os.remove(path)
+        executor.shutdown(wait=True)
+        assert store.open(document.content_hash).read() == content
+        assert registry.get(document.content_hash)['stored_bytes'] == store.get_stats()['bytes']
+        # 复制出的临时文件已删除
+        assert not [name for name in os.listdir(store.root_dir) if name.endswith(DocumentArchive.STAGING_SUFFIX)]
+
+        # 已归档的文件直接更新访问时间，登记时带上压缩后的大小
+        again = archive.receive(io.BytesIO(content), 'po.pdf')
+        assert again.previous['upload_count'] == 1
+        assert registry.get(document.content_hash)['stored_bytes'] == store.get_stats()['bytes']
+
+
+def test_concurrent_put():
+    """测试同样内容同时保存时只保留一份，压缩不在锁内进行"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = DocumentStore(tmp_dir)
+        contents = [make_pdf_bytes(seed % 3) for seed in range(12)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda content: store.put(io.BytesIO(content)), contents))
+        assert len({content_hash for content_hash, _ in results}) == 3
+        assert store.get_stats()['files'] == 3
+        assert sorted(os.listdir(tmp_dir)) == sorted({content_hash[:2] for content_hash, _ in results})
+        # 没有遗留的临时文件
+        for content_hash, _ in results:
+            names = os.listdir(os.path.dirname(store.path_for(content_hash)))
+            assert all(name.endswith(DocumentStore.FILE_SUFFIX) for name in names)
+
+
+def test_registry_unavailable():
+    """测试登记表不可用时不影响导入"""
+    class BrokenRegistry:
+        def register_upload(self, *args):
+            raise RuntimeError("数据库连接失败")
+
+        record_parse = record_import = register_upload
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive = DocumentArchive(DocumentStore(tmp_dir), BrokenRegistry())
+        document = archive.receive(io.BytesIO(make_pdf_bytes(1)), 'po.pdf')
+        assert not document.already_imported
+        archive.record_parse(document, {"success": False, "error": "解析失败"}, datetime.datetime.now())
+        archive.record_import(document.content_hash, 'user@example.com')
+
+
+if __name__ == "__main__":
+    test_store_dedup_and_compression()
+    test_store_bounded()
+    test_duplicate_upload_detected_before_parsing()
+    test_archive_in_background()
+    test_concurrent_put()
+    test_registry_unavailable()
+    print("上传文件归档与登记测试完成")
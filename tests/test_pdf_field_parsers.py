@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字段解析函数测试脚本
+"""
+
+import sys
+import os
+from datetime import date
+from decimal import Decimal
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.pdf_field_parsers import (
+    CENTURION_DATE_FORMAT, CENTURION_DATE_FORMATS, MAGIC_FX_DATE_FORMAT, MAGIC_FX_DATE_FORMATS,
+    WEFARICATE_DATE_FORMAT, WEFARICATE_DATE_FORMATS, clean_currency_value, parse_date, parse_decimal, parse_eur_price
+)
+
+
+def test_parse_date_with_vendor_hint():
+    """测试供应商日期格式提示"""
+    assert parse_date("Oct 7, 2025", WEFARICATE_DATE_FORMAT, WEFARICATE_DATE_FORMATS) == date(2025, 10, 7)
+    assert parse_date(" 07-10-2025 ", MAGIC_FX_DATE_FORMAT, MAGIC_FX_DATE_FORMATS) == date(2025, 10, 7)
+    # 日和月都不超过12时，没有提示按月在前解析，Centurion提示按日在前解析
+    assert parse_date("01/10/2025") == date(2025, 1, 10)
+    assert parse_date("01/10/2025", CENTURION_DATE_FORMAT) == date(2025, 10, 1)
+    # Centurion两位年份的日期同样按日在前解析
+    assert parse_date("06/10/2025", CENTURION_DATE_FORMAT, CENTURION_DATE_FORMATS) == date(2025, 10, 6)
+    assert parse_date("06/10/25", CENTURION_DATE_FORMAT, CENTURION_DATE_FORMATS) == date(2025, 10, 6)
+    # 提示的格式不匹配时继续尝试其他格式
+    assert parse_date("2025-10-07", CENTURION_DATE_FORMAT) == date(2025, 10, 7)
+    # Wefaricate不接受日在前的格式
+    assert parse_date("25/10/2025", WEFARICATE_DATE_FORMAT, WEFARICATE_DATE_FORMATS) is None
+    assert parse_date("") is None
+    assert parse_date("not a date") is None
+
+
+def test_parse_decimal():
+    """测试金额和数量解析"""
+    assert parse_decimal("€1,234.5600") == Decimal("1234.5600")
+    assert parse_decimal("$12") == Decimal("12")
+    assert parse_decimal("1.234,56", decimal_separator=',') == Decimal("1234.56")
+    assert parse_decimal("€512,60", decimal_separator=',') == Decimal("512.60")
+    # 不指定小数点时逗号按千分位去掉（MAGIC FX表格中的数量列）
+    assert parse_decimal("1.000") == Decimal("1") and parse_decimal("1,5") == Decimal("15")
+    assert parse_decimal("N/A") is None
+    assert parse_decimal(None) is None
+
+
+def test_parse_eur_price_and_currency():
+    """测试 per N 单价计算和货币值清理"""
+    assert parse_eur_price("1,500.00 EUR per 100", unit_decimals=4) == ("€15.0000", "€1500.00")
+    assert parse_eur_price("12.50 EUR\nper 10") == ("€1.25", "€12.5")
+    assert parse_eur_price("") == ("", "")
+    assert clean_currency_value("1,234.50 EUR") == "€1234.50"
+    assert clean_currency_value("USD 99") == "$99"
+
+
+if __name__ == "__main__":
+    test_parse_date_with_vendor_hint()
+    test_parse_decimal()
+    test_parse_eur_price_and_currency()
+    print("字段解析测试完成")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投递目录自动导入服务测试脚本
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.pdf_hot_folder import HotFolderIngestor, REPORT_SUFFIX
+
+
+class FakeProcessor:
+    """模拟 PDFImportProcessor：文件内容为 broken 时解析失败，其余文件解析出一行"""
+
+    def __init__(self):
+        self.parsed = []
+
+    def process_pdf_batch(self, pdf_files, company_name, workers=None, check_duplicates=True):
+        for index, (filename, pdf_path) in enumerate(pdf_files):
+            self.parsed.append(filename)
+            with open(pdf_path, 'rb') as f:
+                content = f.read()
+            if content.endswith(b"broken"):
+                yield {"success": False, "error": "未从PDF中提取到有效数据", "index": index, "filename": filename}
+                continue
+            yield {"success": True, "data": [{"po_line": f"{filename}/1"}], "duplicates": [],
+                   "table_name": "non_wf_open", "company": "centurion", "index": index, "filename": filename}
+
+
+
+class FakeWriter:
+    """模拟数据库写入：每次调用是一个事务，fail 为True时整批失败"""
+
+    def __init__(self):
+        self.inserted = []
+        self.fail = False
+
+    def __call__(self, table_name, rows, user_email):
+        if self.fail:
+            return False, "数据库连接失败"
+        self.inserted.extend((table_name, row['po_line']) for row in rows)
+        return True, {'inserted': len(rows), 'updated': 0, 'unchanged': 0, 'skipped_no_key': 0}
+
+
+def write_file(directory, filename, content):
+    with open(os.path.join(directory, filename), 'wb') as f:
+        f.write(b"%PDF-1.4 " + content)
+
+
+def read_report(directory, filename):
+    with open(os.path.join(directory, filename + REPORT_SUFFIX), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_ingest_dedupe_and_move():
+    """测试导入、按内容去重、失败文件和报告"""
+    with tempfile.TemporaryDirectory() as watch_dir:
+        processor = FakeProcessor()
+        writer = FakeWriter()
+        ingestor = HotFolderIngestor(processor, watch_dir, workers=2, settle_seconds=0, db_writer=writer)
+        write_file(watch_dir, "a.pdf", b"order 1")
+        write_file(watch_dir, "a-copy.pdf", b"order 1")
+        write_file(watch_dir, "b.pdf", b"broken")
+        write_file(watch_dir, "notes.txt", b"ignored")
+
+        reports = {report['original_file']: report for report in ingestor.scan_once()}
+        print(f"reports: {reports}")
+        # 同一批中内容相同的文件只解析一次，另一个留到下次扫描
+        assert len(processor.parsed) == 2
+        original = "a.pdf" if "a.pdf" in reports else "a-copy.pdf"
+        duplicate = "a-copy.pdf" if original == "a.pdf" else "a.pdf"
+        assert sorted(reports) == sorted([original, "b.pdf"])
+        assert reports[original]['status'] == 'processed' and reports[original]['inserted'] == 1
+        assert reports["b.pdf"]['status'] == 'failed'
+        assert os.path.exists(os.path.join(watch_dir, duplicate))
+
+        reports = ingestor.scan_once()
+        assert [(report['status'], report['duplicate_of']) for report in reports] == [('duplicate', original)]
+        assert writer.inserted == [("non_wf_open", f"{original}/1")]
+
+        assert sorted(os.listdir(watch_dir)) == ["failed", "notes.txt", "processed"]
+        assert read_report(os.path.join(watch_dir, "processed"), original)['company'] == "centurion"
+        assert read_report(os.path.join(watch_dir, "failed"), "b.pdf")['error']
+
+        # 重启后从报告重建哈希索引，再次投递同一内容时不重复导入
+        restarted = HotFolderIngestor(processor, watch_dir, settle_seconds=0, db_writer=writer)
+        write_file(watch_dir, "a.pdf", b"order 1")
+        reports = restarted.scan_once()
+        assert [report['status'] for report in reports] == ['duplicate']
+        assert os.path.exists(os.path.join(watch_dir, "processed", "a (1).pdf"))
+        assert len(writer.inserted) == 1
+
+
+def test_write_failure_moves_file_to_failed():
+    """测试写入失败时文件放入 failed/，没有写入任何行，修正后重新投递可以导入"""
+    with tempfile.TemporaryDirectory() as watch_dir:
+        writer = FakeWriter()
+        writer.fail = True
+        ingestor = HotFolderIngestor(FakeProcessor(), watch_dir, settle_seconds=0, db_writer=writer)
+        write_file(watch_dir, "a.pdf", b"order 1")
+        reports = ingestor.scan_once()
+        assert [report['status'] for report in reports] == ['failed']
+        assert reports[0]['error'] == "数据库连接失败" and writer.inserted == []
+
+        writer.fail = False
+        os.rename(os.path.join(watch_dir, "failed", "a.pdf"), os.path.join(watch_dir, "a.pdf"))
+        assert [report['status'] for report in ingestor.scan_once()] == ['processed']
+
+
+def test_unsettled_files_are_skipped():
+    """测试仍在写入中的文件不会被处理"""
+    with tempfile.TemporaryDirectory() as watch_dir:
+        ingestor = HotFolderIngestor(FakeProcessor(), watch_dir, settle_seconds=60, db_writer=FakeWriter())
+        write_file(watch_dir, "a.pdf", b"order 1")
+        assert ingestor.find_ready_files() == []
+        assert ingestor.scan_once() == []
+        assert os.path.exists(os.path.join(watch_dir, "a.pdf"))
+
+
+if __name__ == "__main__":
+    test_ingest_dedupe_and_move()
+    test_write_failure_moves_file_to_failed()
+    test_unsettled_files_are_skipped()
+    print("投递目录自动导入测试完成")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重新导入时逐字段比较数据行的测试脚本
+"""
+
+import sys
+import os
+import datetime
+from decimal import Decimal
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.pdf_import_diff import diff_rows, values_equal
+
+
+def test_values_equal():
+    """测试数据库返回的类型与解析结果不同时按值比较"""
+    assert values_equal(None, None)
+    assert not values_equal(None, 'x') and not values_equal(Decimal('1'), None)
+    assert values_equal(Decimal('12.5'), Decimal('12.50'))
+    assert values_equal(3, Decimal('3.00'))
+    # numeric(10,4) 列写入后按4位小数舍入
+    assert values_equal(Decimal('0.123456'), Decimal('0.1235'), scale=4)
+    assert not values_equal(Decimal('0.123456'), Decimal('0.1235'))
+    assert values_equal('2025-10-15', datetime.date(2025, 10, 15))
+    assert values_equal(datetime.date(2025, 10, 15), datetime.date(2025, 10, 15))
+    assert not values_equal('PART A', 'PART B')
+
+
+def test_diff_rows():
+    """测试新增、有变化和未变化的行，以及按变化的列分组"""
+    existing = {
+        'PO1/1': {'qty': Decimal('10.00'), 'net_price': Decimal('1.5000'), 'req_date': datetime.date(2025, 1, 1)},
+        'PO1/2': {'qty': Decimal('5.00'), 'net_price': Decimal('2.0000'), 'req_date': datetime.date(2025, 1, 1)},
+        'PO1/3': {'qty': Decimal('5.00'), 'net_price': Decimal('2.0000'), 'req_date': None},
+    }
+    rows = [
+        {'po_line': 'PO1/1', 'qty': Decimal('10'), 'net_price': Decimal('1.5'), 'req_date': datetime.date(2025, 1, 1)},
+        {'po_line': 'PO1/2', 'qty': Decimal('6'), 'net_price': Decimal('2'), 'req_date': datetime.date(2025, 1, 1)},
+        {'po_line': 'PO1/3', 'qty': Decimal('7'), 'net_price': Decimal('2'), 'req_date': None},
+        {'po_line': 'PO1/4', 'qty': Decimal('1'), 'net_price': Decimal('9'), 'req_date': None},
+    ]
+    diff = diff_rows(rows, existing, scales={'qty': 2, 'net_price': 4})
+    print(f"比较结果: {diff.counts()}")
+    assert diff.counts() == {'inserted': 1, 'updated': 2, 'unchanged': 1}
+    assert [row['po_line'] for row in diff.inserts] == ['PO1/4']
+    groups = diff.update_groups()
+    assert list(groups) == [('qty',)]
+    assert [row['po_line'] for row in groups[('qty',)]] == ['PO1/2', 'PO1/3']
+
+
+if __name__ == "__main__":
+    test_values_equal()
+    test_diff_rows()
+    print("逐字段比较测试完成")
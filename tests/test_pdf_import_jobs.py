@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步PDF导入任务测试脚本
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.pdf_import_jobs import ImportJobManager, JOB_QUEUED, JOB_PARSING, JOB_DONE, JOB_FAILED
+
+
+class FakeProcessor:
+    """模拟 PDFImportProcessor，解析在 release 事件触发后才返回"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def process_pdf_with_duplicate_check(self, pdf_path, company_name):
+        self.release.wait(5)
+        if company_name == 'broken':
+            return {"success": False, "error": "未从PDF中提取到有效数据"}
+        if company_name == 'crash':
+            raise RuntimeError("解析器异常")
+        return {"success": True, "data": [{"po": "4500010045"}], "duplicates": [],
+                "table_name": "wf_open", "company": "wefabricate"}
+
+
+def wait_finished(manager, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("任务未在超时时间内完成")
+
+
+def make_pdf_file():
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+        tmp_file.write(b"%PDF-1.4")
+        return tmp_file.name
+
+
+def test_job_lifecycle():
+    """测试任务状态流转、阶段耗时和临时文件清理"""
+    processor = FakeProcessor()
+    manager = ImportJobManager(processor, workers=1)
+    pdf_path = make_pdf_file()
+
+    first = manager.submit(pdf_path, 'auto', filename='po.pdf')
+    second = manager.submit(make_pdf_file(), 'broken')
+    time.sleep(0.05)
+    assert manager.get(first.id).status == JOB_PARSING
+    # 只有一个工作线程，第二个任务仍在排队
+    assert manager.get(second.id).status == JOB_QUEUED
+
+    processor.release.set()
+    job = wait_finished(manager, first.id)
+    print(f"任务结果: {job.to_dict(include_result=False)}")
+    assert job.status == JOB_DONE
+    assert job.company_name == 'wefabricate'
+    assert job.to_dict()['result']['table_name'] == 'wf_open'
+    assert set(job.timings) == {'queued', 'parsing', 'total'}
+    assert not os.path.exists(pdf_path)
+
+    failed = wait_finished(manager, second.id)
+    assert failed.status == JOB_FAILED
+    assert failed.error == "未从PDF中提取到有效数据"
+    assert 'result' not in failed.to_dict()
+    manager.shutdown()
+
+
+def test_job_exception_and_retention():
+    """测试解析异常记为失败，以及超过保留期的任务被清除"""
+    processor = FakeProcessor()
+    processor.release.set()
+    manager = ImportJobManager(processor, workers=1, retention_seconds=0)
+
+    job = manager.submit(make_pdf_file(), 'crash')
+    deadline = time.time() + 5
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.status == JOB_FAILED
+    assert "解析器异常" in job.error
+
+    time.sleep(0.01)
+    assert manager.get(job.id) is None
+    manager.shutdown()
+
+
+if __name__ == "__main__":
+    test_job_lifecycle()
+    test_job_exception_and_retention()
+    print("异步导入任务测试完成")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务端导入会话测试脚本
+"""
+
+import sys
+import os
+import time
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.pdf_import_jobs import ImportJobManager
+from backend.pdf_import_sessions import COMMIT_SKIP_DUPLICATES, ImportSessionManager
+from backend.pdf_po_line import NON_WF_OPEN_LAYOUT, POLine
+
+
+class FakeWriter:
+    """模拟数据库写入，记录每次调用；fail 为True时返回失败"""
+
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, table_name, rows, user_email):
+        self.calls.append((table_name, rows, user_email))
+        if self.fail:
+            return False, "数据库连接失败"
+        return True, {'inserted': len(rows), 'updated': 0, 'unchanged': 0}
+
+
+def make_result(count=3):
+    rows = [
+        POLine.create(NON_WF_OPEN_LAYOUT, po='4500010045', line=line, po_line=f"4500010045/{line}", qty=line)
+        for line in range(1, count + 1)
+    ]
+    for row in rows:
+        row['company'] = 'centurion'
+    return {
+        "success": True,
+        "data": rows,
+        "duplicates": [{"primary_key": "4500010045/2", "data": rows[1]}],
+        "table_name": "non_wf_open",
+        "company": "centurion"
+    }
+
+
+def test_stage_and_commit():
+    """测试暂存后返回结果不含数据行，提交时整批写入且会话只能提交一次"""
+    writer = FakeWriter()
+    sessions = ImportSessionManager(writer=writer)
+
+    staged = sessions.stage(make_result(), 'po.pdf')
+    print(f"暂存结果: {staged}")
+    assert 'data' not in staged
+    assert staged['row_count'] == 3 and staged['table_name'] == 'non_wf_open'
+    assert sessions.get(staged['session_id']).to_dict()['duplicate_count'] == 1
+
+    result = sessions.commit(staged['session_id'], 'user@example.com')
+    assert result == {'success': True, 'count': 3, 'skipped': 0, 'inserted': 3, 'updated': 0, 'unchanged': 0}
+    table_name, rows, user_email = writer.calls[0]
+    assert table_name == 'non_wf_open' and user_email == 'user@example.com'
+    # 写入数据库前转换为普通字典
+    assert type(rows[0]) is dict and rows[0]['company'] == 'centurion'
+
+    assert not sessions.commit(staged['session_id'])['success']
+    assert sessions.get(staged['session_id']) is None
+
+    # 解析失败的结果原样返回，不创建会话
+    failed = {"success": False, "error": "未从PDF中提取到有效数据"}
+    assert sessions.stage(failed) is failed
+
+
+def test_skip_duplicates_and_retry():
+    """测试跳过重复行的提交方式，以及写入失败后会话保留可以重试"""
+    writer = FakeWriter()
+    sessions = ImportSessionManager(writer=writer)
+    session_id = sessions.stage(make_result())['session_id']
+
+    assert not sessions.commit(session_id, mode='append')['success']
+    writer.fail = True
+    assert sessions.commit(session_id)['error'] == "数据库连接失败"
+    assert sessions.get(session_id) is not None
+
+    writer.fail = False
+    result = sessions.commit(session_id, mode=COMMIT_SKIP_DUPLICATES)
+    assert result['count'] == 2 and result['skipped'] == 1
+    assert [row['po_line'] for row in writer.calls[-1][1]] == ['4500010045/1', '4500010045/3']
+
+
+def test_session_limits():
+    """测试过期会话被清除，会话数超过上限时清除最早的会话"""
+    sessions = ImportSessionManager(writer=FakeWriter(), max_sessions=2)
+    first = sessions.stage(make_result())['session_id']
+    second = sessions.stage(make_result())['session_id']
+    third = sessions.stage(make_result())['session_id']
+    assert sessions.get(first) is None
+    assert sessions.get(second) is not None and sessions.get(third) is not None
+    assert sessions.discard(second) and not sessions.discard(second)
+
+    sessions.retention_seconds = 0
+    time.sleep(0.01)
+    assert sessions.get(third) is None
+
+
+class FakeProcessor:
+    def process_pdf_with_duplicate_check(self, pdf_path, company_name):
+        return make_result()
+
+
+def test_job_result_staged():
+    """测试异步导入任务的结果暂存在导入会话中"""
+    sessions = ImportSessionManager(writer=FakeWriter())
+    manager = ImportJobManager(FakeProcessor(), workers=1, sessions=sessions)
+    job = manager.submit(os.path.join(project_root, 'missing.pdf'), 'auto', filename='po.pdf', delete_file=False)
+    deadline = time.time() + 5
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    result = job.to_dict()['result']
+    assert 'data' not in result
+    assert sessions.get(result['session_id']).filename == 'po.pdf'
+    manager.shutdown()
+
+
+if __name__ == "__main__":
+    test_stage_and_commit()
+    test_skip_duplicates_and_retry()
+    test_session_limits()
+    test_job_result_staged()
+    print("服务端导入会话测试完成")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF导入耗时统计测试脚本
+"""
+
+import sys
+import os
+import logging
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.pdf_logging import ParseSummary, collect_parse_summaries
+from backend.pdf_metrics import DurationHistogram, ImportTimer, ParseMetrics
+
+
+def test_import_timer_collects_parse_stages():
+    """测试导入阶段计时和提取器细分阶段的收集"""
+    timer = ImportTimer()
+    with timer.stage('detect'):
+        pass
+    with collect_parse_summaries() as summaries, timer.stage('parse'):
+        summary = ParseSummary(logging.getLogger('test_pdf_metrics'), 'centurion', 'po.pdf')
+        summary.lap('text')
+        summary.add('pages', 2)
+        summary.finish(5)
+    # 离开 with 块后不再收集
+    ParseSummary(logging.getLogger('test_pdf_metrics'), 'centurion', 'po.pdf').finish(1)
+    assert len(summaries) == 1
+
+    timings = timer.to_dict(summaries, rows=5)
+    print(f"timings: {timings}")
+    assert set(timings['stages']) == {'detect', 'parse'}
+    assert list(timings['parse_stages']) == ['text']
+    assert timings['pages'] == 2 and timings['rows'] == 5 and timings['cache_hit'] is False
+
+
+def test_histograms_and_prometheus_output():
+    """测试直方图累积计数和Prometheus输出"""
+    histogram = DurationHistogram(buckets=(10, 100))
+    for value in (5, 50, 500):
+        histogram.observe(value)
+    assert histogram.cumulative() == [(10, 1), (100, 2), ('+Inf', 3)]
+
+    metrics = ParseMetrics()
+    timings = {'total_ms': 120.0, 'stages': {'parse': 100.0}, 'parse_stages': {'tables': 60.0},
+               'pages': 3, 'rows': 30, 'cache_hit': False}
+    metrics.observe(timings, 'wefabricate')
+    metrics.observe(dict(timings, cache_hit=True, pages=None), 'wefabricate', success=False)
+    snapshot = metrics.snapshot()
+    assert snapshot['imports']['wefabricate'] == {'count': 2, 'failed': 1, 'cache_hits': 1, 'pages': 3, 'rows': 60}
+    assert snapshot['stages']['parse.tables']['wefabricate']['count'] == 2
+    assert snapshot['stages']['total']['wefabricate']['buckets']['250'] == 2
+
+    text = metrics.to_prometheus()
+    assert 'pdf_import_stage_duration_ms_bucket{stage="parse",company="wefabricate",le="100"} 2' in text
+    assert 'pdf_imports_total{company="wefabricate"} 2' in text
+
+
+if __name__ == "__main__":
+    test_import_timer_collects_parse_stages()
+    test_histograms_and_prometheus_output()
+    print("导入耗时统计测试完成")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单页版面分析（PageAnalysis）与 pdfplumber 直接提取结果一致性测试脚本
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.pdf_page_analysis import PageAnalysis, count_pdf_pages, iter_pdf_pages, open_pdf
+from synthetic_pdfs import GENERATORS, generate_table_vendor_pdf, generate_wefaricate_pdf
+
+
+def generate_vendor_pdfs(tmp_dir, line_count=40):
+    """生成各供应商格式的合成PDF，返回 [(名称, 路径), ...]"""
+    generators = dict(GENERATORS, table_vendor=generate_table_vendor_pdf)
+    return [(name, generate(os.path.join(tmp_dir, f"{name}.pdf"), line_count))
+            for name, generate in generators.items()]
+
+
+def test_text_matches_pdfplumber():
+    """测试 PageAnalysis 的文本和文本行与 page.extract_text() 一致"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, pdf_path in generate_vendor_pdfs(tmp_dir):
+            with open_pdf(pdf_path) as pdf:
+                for page in pdf.pages:
+                    expected = page.extract_text()
+                    analysis = PageAnalysis(page)
+                    assert analysis.text == expected, (name, page.page_number)
+                    assert analysis.lines == expected.split('\n')
+            print(f"{name}: {len(pdf.pages)} 页文本一致")
+
+
+def test_tables_match_pdfplumber():
+    """测试 PageAnalysis.extract_tables() 与 page.extract_tables() 一致，包括指定区域和文本策略"""
+    text_strategy = {'vertical_strategy': 'text', 'horizontal_strategy': 'text'}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, pdf_path in generate_vendor_pdfs(tmp_dir):
+            with open_pdf(pdf_path) as pdf:
+                for page in pdf.pages:
+                    analysis = PageAnalysis(page)
+                    assert analysis.extract_tables() == page.extract_tables(), (name, page.page_number)
+                    assert analysis.extract_tables(text_strategy) == page.extract_tables(text_strategy)
+
+                    x0, top, x1, bottom = page.bbox
+                    region = (x0, top + 40, x1, bottom - 50)
+                    assert analysis.extract_tables(bbox=region) == page.crop(region).extract_tables()
+            print(f"{name}: {len(pdf.pages)} 页表格一致")
+
+
+def test_iter_pdf_pages():
+    """测试逐页产出的页面顺序、页数和内容与 pdf.pages 一致，并支持起止页"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = generate_wefaricate_pdf(os.path.join(tmp_dir, "po.pdf"), 60)
+        with open_pdf(pdf_path) as pdf, open_pdf(pdf_path) as reference:
+            page_count = count_pdf_pages(pdf)
+            assert page_count == len(reference.pages) > 1
+
+            page_nums = []
+            for page_num, page in iter_pdf_pages(pdf):
+                expected = reference.pages[page_num]
+                assert page.page_number == page_num + 1
+                assert page.initial_doctop == expected.initial_doctop
+                assert page.extract_text() == expected.extract_text()
+                assert page.extract_tables() == expected.extract_tables()
+                page_nums.append(page_num)
+            print(f"逐页产出 {len(page_nums)} 页")
+            assert page_nums == list(range(page_count))
+            # 处理完的页面不保留在文档级对象缓存中
+            assert not pdf.doc._cached_objs
+
+            middle = list(iter_pdf_pages(pdf, start_page=1, end_page=3))
+            assert [page_num for page_num, _ in middle] == [1, 2]
+            assert list(iter_pdf_pages(pdf, start_page=page_count)) == []
+
+
+if __name__ == "__main__":
+    test_text_matches_pdfplumber()
+    test_tables_match_pdfplumber()
+    test_iter_pdf_pages()
+    print("单页版面分析测试完成")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+修订版订单按页增量解析测试脚本
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.db_pdf_processor import _page_cache_keys, extract_centurion_data, extract_wefaricate_data
+from backend.pdf_logging import collect_parse_summaries
+from backend.pdf_page_analysis import open_pdf
+from backend.pdf_parse_cache import PDFParseCache
+from synthetic_pdfs import generate_centurion_pdf, generate_wefaricate_pdf
+
+
+def write_revision(pdf_path, revised_path, old, new):
+    """复制PDF并替换一页中的一段文字（长度不变，交叉引用表仍然有效）"""
+    with open(pdf_path, 'rb') as f:
+        content = f.read()
+    assert content.count(old) == 1 and len(old) == len(new)
+    with open(revised_path, 'wb') as f:
+        f.write(content.replace(old, new))
+
+
+def check_revision(extract, pdf_path, revised_path, **kwargs):
+    """首次解析写入页面缓存，修订版只重新解析改动过的页面，结果与不使用缓存时完全一致"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        page_cache = PDFParseCache(cache_dir)
+        assert extract(pdf_path, page_cache=page_cache, **kwargs) == extract(pdf_path, **kwargs)
+        with collect_parse_summaries() as summaries:
+            revised = extract(revised_path, page_cache=page_cache, **kwargs)
+        summary = summaries[-1]
+        print(f"{summary['vendor']}: {summary['pages']} 页，复用 {summary['cached_pages']} 页")
+        assert summary['cached_pages'] == summary['pages'] - 1
+        assert revised == extract(revised_path, **kwargs)
+        return revised
+
+
+def test_wefaricate_revision_reparses_changed_page():
+    """测试Wefaricate修订版订单只重新解析改动的页面"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, "po.pdf")
+        revised_path = os.path.join(tmp_dir, "po_rev1.pdf")
+        generate_wefaricate_pdf(pdf_path, 60)
+        write_revision(pdf_path, revised_path, b"(SYNTHETIC PART 40)", b"(REVISED PART 4000)")
+        revised = check_revision(extract_wefaricate_data, pdf_path, revised_path, workers=1)
+        assert [row['description'] for row in revised].count("REVISED PART 4000") == 1
+
+
+def test_centurion_revision_reparses_changed_page():
+    """测试Centurion修订版订单复用未改动页面的文本行"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, "po.pdf")
+        revised_path = os.path.join(tmp_dir, "po_rev1.pdf")
+        generate_centurion_pdf(pdf_path, 120)
+        write_revision(pdf_path, revised_path, b"(Purchase order Number PO-77001)",
+                       b"(Purchase order Number PO-77002)")
+        revised = check_revision(extract_centurion_data, pdf_path, revised_path)
+        assert revised and all(row['po'] == "77002" for row in revised)
+
+
+def test_cache_keys_include_table_crop():
+    """测试页面缓存键包含表格区域裁剪开关，修改配置后不会复用按另一种配置解析的结果"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = generate_wefaricate_pdf(os.path.join(tmp_dir, "po.pdf"), 5)
+        page_cache = PDFParseCache(os.path.join(tmp_dir, "cache"))
+        original = os.environ.get('PDF_TABLE_CROP')
+        try:
+            with open_pdf(pdf_path) as pdf:
+                os.environ['PDF_TABLE_CROP'] = 'True'
+                cropped = _page_cache_keys(pdf, page_cache, 'wefabricate')
+                os.environ['PDF_TABLE_CROP'] = 'False'
+                full_page = _page_cache_keys(pdf, page_cache, 'wefabricate')
+        finally:
+            if original is None:
+                os.environ.pop('PDF_TABLE_CROP', None)
+            else:
+                os.environ['PDF_TABLE_CROP'] = original
+        assert cropped and not set(cropped) & set(full_page)
+
+
+if __name__ == "__main__":
+    test_wefaricate_revision_reparses_changed_page()
+    test_centurion_revision_reparses_changed_page()
+    test_cache_keys_include_table_crop()
+    print("按页增量解析测试完成")
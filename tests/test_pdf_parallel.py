@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wefaricate订单多进程并行解析测试脚本
+"""
+
+import sys
+import os
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import backend.db_pdf_processor as db_pdf_processor
+from backend.db_pdf_processor import extract_wefaricate_data
+from backend.pdf_logging import collect_parse_summaries
+from backend.pdf_page_analysis import open_pdf
+from backend.utils.config import get_pdf_config
+from synthetic_pdfs import generate_wefaricate_pdf
+
+
+def split_line_items(pdf_path):
+    """Schedule Lines块落到下一页的订单行号（上一页最后一行数据的Item列）"""
+    items = []
+    with open_pdf(pdf_path) as pdf:
+        previous_lines = None
+        for page in pdf.pages:
+            lines = page.extract_text().splitlines()
+            if previous_lines is not None and lines[1] == "Schedule Lines:":
+                items.append(int(previous_lines[-2].split()[0]))
+            previous_lines = lines
+    return items
+
+
+def test_parallel_matches_serial():
+    """测试并行解析与串行解析结果完全一致，包括跨页断开的Schedule Lines块"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = generate_wefaricate_pdf(os.path.join(tmp_dir, "po.pdf"), 200)
+        split_items = split_line_items(pdf_path)
+        assert split_items, "合成PDF中应有跨页断开的Schedule Lines块"
+
+        with collect_parse_summaries() as summaries:
+            serial = extract_wefaricate_data(pdf_path, workers=1)
+            parallel = extract_wefaricate_data(pdf_path, workers=2)
+        serial_summary, parallel_summary = summaries
+        print(f"{parallel_summary['pages']} 页，{len(split_items)} 个跨页Schedule Lines块")
+        assert parallel_summary['pages'] >= get_pdf_config()['parallel_min_pages']
+        assert serial_summary['workers'] == 1 and parallel_summary['workers'] == 2
+        assert parallel == serial
+
+        rows_by_line = {row['line']: row for row in parallel}
+        for line in split_items:
+            assert rows_by_line[line]['req_date_wf'] is not None
+
+
+def test_broken_pool_falls_back_to_serial():
+    """测试进程池损坏时回退到串行解析，失败的并行解析同样输出汇总记录"""
+    original = db_pdf_processor._collect_wefaricate_pages_parallel
+
+    def broken_pool(pdf_path, page_numbers, workers):
+        raise BrokenProcessPool("工作进程意外退出")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = generate_wefaricate_pdf(os.path.join(tmp_dir, "po.pdf"), 200)
+        expected = extract_wefaricate_data(pdf_path, workers=1)
+        db_pdf_processor._collect_wefaricate_pages_parallel = broken_pool
+        try:
+            with collect_parse_summaries() as summaries:
+                rows = extract_wefaricate_data(pdf_path, workers=2)
+        finally:
+            db_pdf_processor._collect_wefaricate_pages_parallel = original
+
+    failed, fallback = summaries
+    assert failed['parallel_failed'] == 1 and failed['workers'] == 2 and failed['rows'] == 0
+    assert fallback['workers'] == 1 and fallback['rows'] == len(expected)
+    assert rows == expected
+
+
+if __name__ == "__main__":
+    test_parallel_matches_serial()
+    test_broken_pool_falls_back_to_serial()
+    print("并行解析测试完成")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF解析缓存测试脚本
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.pdf_parse_cache import PDFParseCache, sha256_file
+
+
+def test_cache_hit_and_miss():
+    """测试缓存命中、未命中和数据类型保持"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = PDFParseCache(cache_dir)
+        key = PDFParseCache.make_key("abc", "wefabricate", "1")
+
+        assert cache.get(key) is None
+
+        rows = [{"po": "4500010045", "qty": Decimal("10"), "req_date_wf": date(2025, 10, 7)}]
+        cache.put(key, rows)
+        cached = cache.get(key)
+        assert cached == rows
+        assert isinstance(cached[0]["qty"], Decimal)
+
+        # 不同公司或解析器版本使用不同的缓存键
+        assert cache.get(PDFParseCache.make_key("abc", "centurion", "1")) is None
+        assert cache.get(PDFParseCache.make_key("abc", "wefabricate", "2")) is None
+
+        stats = cache.get_stats()
+        print(f"缓存统计: {stats}")
+        assert stats['hits'] == 1
+        assert stats['misses'] == 3
+
+        # 重新打开缓存目录后条目仍然可用
+        reopened = PDFParseCache(cache_dir)
+        assert reopened.get(key) == rows
+
+
+def test_cache_lru_eviction():
+    """测试超过大小上限时淘汰最久未访问的条目"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = PDFParseCache(cache_dir, max_bytes=2500)
+        payload = [{"description": "x" * 1000}]
+
+        cache.put("a", payload)
+        cache.put("b", payload)
+        # 访问a，使b成为最久未访问的条目
+        os.utime(os.path.join(cache_dir, "b.pkl"), (0, 0))
+        cache._index["b"] = (cache._index["b"][0], 0)
+        assert cache.get("a") is not None
+        cache.put("c", payload)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.get_stats()['evictions'] == 1
+        assert cache.get_stats()['size_bytes'] <= 2500
+
+
+def test_shared_directory_eviction():
+    """测试多个进程共用缓存目录时，按整个目录的大小淘汰"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        first = PDFParseCache(cache_dir, max_bytes=2500, rescan_seconds=0)
+        second = PDFParseCache(cache_dir, max_bytes=2500)
+        payload = [{"description": "x" * 1000}]
+
+        first.put("a", payload)
+        os.utime(os.path.join(cache_dir, "a.pkl"), (0, 0))
+        second.put("b", payload)
+        first.put("c", payload)
+
+        # first 的索引中没有 second 写入的 b，但淘汰前重新扫描了目录
+        assert sorted(os.listdir(cache_dir)) == ["b.pkl", "c.pkl"]
+        assert first.get_stats()['size_bytes'] <= 2500
+        # second 读取已被其他进程淘汰的 a 时按未命中处理
+        assert second.get("a") is None
+
+
+def test_sha256_file():
+    """测试文件内容哈希与文件名无关"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        first = os.path.join(tmp_dir, "first.pdf")
+        second = os.path.join(tmp_dir, "second.pdf")
+        for path in (first, second):
+            with open(path, 'wb') as f:
+                f.write(b"%PDF-1.4 same content")
+        assert sha256_file(first) == sha256_file(second)
+
+
+if __name__ == "__main__":
+    test_cache_hit_and_miss()
+    test_cache_lru_eviction()
+    test_shared_directory_eviction()
+    test_sha256_file()
+    print("解析缓存测试完成")
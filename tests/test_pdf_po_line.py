@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+POLine 数据行测试脚本
+"""
+
+import sys
+import os
+import pickle
+import tempfile
+from collections.abc import ItemsView, ValuesView
+from datetime import date
+from decimal import Decimal
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+from backend.db_pdf_processor import extract_magic_fx_data, extract_wefaricate_data
+from backend.pdf_po_line import NON_WF_OPEN_COLUMNS, WF_OPEN_LAYOUT, POLine, rows_to_dicts
+from backend.utils.json_provider import POLineJSONProvider
+from synthetic_pdfs import generate_magic_fx_pdf, generate_wefaricate_pdf
+
+
+def test_dict_compatible_access():
+    """测试数据行仍然支持字典的读写接口，添加新列不影响共用布局的其他行"""
+    row = POLine.create(WF_OPEN_LAYOUT, po="4500012345", line=10, qty=Decimal("5"))
+    other = POLine.create(WF_OPEN_LAYOUT, po="4500012345", line=20)
+    assert row['po'] == "4500012345" and row.get('eta_wfsz') is None and row.get('missing', 1) == 1
+    assert 'unit' in row and 'company' not in row
+
+    row['company'] = 'wefabricate'
+    assert row['company'] == 'wefabricate' and 'company' not in other
+    assert list(row)[-1] == 'company' and len(row) == len(WF_OPEN_LAYOUT.columns) + 1
+    del row['company']
+    assert row == POLine.create(WF_OPEN_LAYOUT, po="4500012345", line=10, qty=Decimal("5"))
+
+    # values()/items() 和字典一样返回视图
+    values, items = row.values(), row.items()
+    assert isinstance(values, ValuesView) and isinstance(items, ItemsView)
+    assert ('po', "4500012345") in items and "4500012345" in values and len(items) == len(row)
+    row['so_number'] = 'SO1'
+    assert 'SO1' in values and ('so_number', 'SO1') in items
+    row['so_number'] = None
+
+    plain = row.to_dict()
+    assert isinstance(plain, dict) and plain == row and row == plain
+    assert rows_to_dicts([row, plain]) == [plain, plain]
+    print(f"单行内存: POLine {sys.getsizeof(row) + sys.getsizeof(row._values)} 字节，字典 {sys.getsizeof(plain)} 字节")
+    assert sys.getsizeof(row) + sys.getsizeof(row._values) < sys.getsizeof(plain)
+
+
+def test_pickle_and_json_edges():
+    """测试解析缓存（pickle）和JSON响应中的转换"""
+    rows = [POLine.create(WF_OPEN_LAYOUT, po="1", line=n, req_date_wf=date(2025, 10, n)) for n in range(1, 4)]
+    restored = pickle.loads(pickle.dumps(rows))
+    assert restored == rows
+    assert restored[0]._layout is WF_OPEN_LAYOUT
+
+    app = Flask(__name__)
+    app.json = POLineJSONProvider(app)
+    with app.app_context():
+        assert app.json.dumps({'data': rows}) == app.json.dumps({'data': rows_to_dicts(rows)})
+
+
+def test_extractors_return_po_lines():
+    """测试提取器输出 POLine，列与原来的字典相同"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        wf_rows = extract_wefaricate_data(generate_wefaricate_pdf(os.path.join(tmp_dir, "wf.pdf"), 20), workers=1)
+        mfx_rows = extract_magic_fx_data(generate_magic_fx_pdf(os.path.join(tmp_dir, "mfx.pdf"), 20))
+    assert len(wf_rows) == 20 and all(isinstance(row, POLine) for row in wf_rows)
+    assert tuple(wf_rows[0]) == WF_OPEN_LAYOUT.columns
+    assert tuple(mfx_rows[0]) == NON_WF_OPEN_COLUMNS
+    assert wf_rows[0]['po_line'] == "4500012345/10" and wf_rows[0]['req_date_wf'] is not None
+
+
+if __name__ == "__main__":
+    test_dict_compatible_access()
+    test_pickle_and_json_edges()
+    test_extractors_return_po_lines()
+    print("POLine 数据行测试完成")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+表格区域裁剪（PDF_TABLE_CROP）测试脚本
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.db_pdf_processor import (
+    MAGIC_FX_TABLE_FOOTER, MAGIC_FX_TABLE_HEADER, WEFARICATE_TABLE_FOOTER, WEFARICATE_TABLE_HEADER,
+    extract_centurion_data, extract_magic_fx_data, extract_wefaricate_data
+)
+from backend.pdf_page_analysis import PageAnalysis, TableRegionLocator, open_pdf
+from synthetic_pdfs import generate_centurion_pdf, generate_magic_fx_pdf, generate_wefaricate_pdf
+
+FOOTER_TEXTS = ("Total Amount", "Delivery address", "Incoterms:", "Page:")
+
+EXTRACTORS = [
+    ('wefabricate', lambda pdf_path: extract_wefaricate_data(pdf_path, workers=1), generate_wefaricate_pdf, 60),
+    ('centurion', extract_centurion_data, generate_centurion_pdf, 60),
+    ('magic_fx', extract_magic_fx_data, generate_magic_fx_pdf, 20),
+]
+
+
+def extract_with_crop(extract, pdf_path, table_crop):
+    original = os.environ.get('PDF_TABLE_CROP')
+    os.environ['PDF_TABLE_CROP'] = str(table_crop)
+    try:
+        return extract(pdf_path)
+    finally:
+        if original is None:
+            os.environ.pop('PDF_TABLE_CROP', None)
+        else:
+            os.environ['PDF_TABLE_CROP'] = original
+
+
+def test_crop_does_not_change_rows():
+    """测试各内置提取器开启和关闭表格区域裁剪时提取结果一致，且页脚文字不会混入数据行"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for vendor, extract, generate, line_count in EXTRACTORS:
+            pdf_path = generate(os.path.join(tmp_dir, f"{vendor}.pdf"), line_count)
+            cropped = extract_with_crop(extract, pdf_path, True)
+            full_page = extract_with_crop(extract, pdf_path, False)
+            print(f"{vendor}: {len(cropped)} 行")
+            assert len(cropped) == line_count
+            assert cropped == full_page
+            for row in cropped:
+                for value in row.values():
+                    assert not any(footer in str(value) for footer in FOOTER_TEXTS), (vendor, value)
+
+
+def test_region_ends_above_footer():
+    """测试定位到的表格区域从表头开始，在页脚文字之前结束"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cases = [
+            (generate_wefaricate_pdf(os.path.join(tmp_dir, "wf.pdf"), 5), WEFARICATE_TABLE_HEADER,
+             WEFARICATE_TABLE_FOOTER, "Incoterms:"),
+            (generate_magic_fx_pdf(os.path.join(tmp_dir, "mfx.pdf"), 20), MAGIC_FX_TABLE_HEADER,
+             MAGIC_FX_TABLE_FOOTER, "Total Amount"),
+        ]
+        for pdf_path, header, footer, footer_text in cases:
+            with open_pdf(pdf_path) as pdf:
+                analysis = PageAnalysis(pdf.pages[0])
+                x0, top, x1, bottom = TableRegionLocator(header, footer).locate(analysis)
+                footer_top = next(line_top for line_top, _, text in analysis.positioned_lines if footer_text in text)
+                assert bottom < footer_top < pdf.pages[0].bbox[3]
+                cropped_text = pdf.pages[0].crop((x0, top, x1, bottom)).extract_text()
+                assert footer_text not in cropped_text
+
+
+def test_region_without_lines():
+    """测试区域内没有表格线时与裁剪页面一样返回空列表"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = generate_centurion_pdf(os.path.join(tmp_dir, "centurion.pdf"), 10)
+        with open_pdf(pdf_path) as pdf:
+            page = pdf.pages[0]
+            region = (0, 100, page.width, 300)
+            assert PageAnalysis(page).extract_tables(bbox=region) == page.crop(region).extract_tables() == []
+
+
+if __name__ == "__main__":
+    test_crop_does_not_change_rows()
+    test_region_ends_above_footer()
+    test_region_without_lines()
+    print("表格区域裁剪测试完成")
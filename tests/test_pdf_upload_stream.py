@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上传文件流直接解析测试脚本
+"""
+
+import sys
+import os
+import io
+import tempfile
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, jsonify, request
+
+from backend.pdf_import_processor import PDFImportProcessor
+from backend.pdf_parse_cache import sha256_file
+from backend.utils.upload_stream import SpooledUploadRequest
+from synthetic_pdfs import generate_centurion_pdf, generate_wefaricate_pdf
+
+
+def test_extract_from_file_object():
+    """测试文件对象与文件路径的识别和解析结果一致，且不关闭调用方的文件对象"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for company, generate in (('centurion', generate_centurion_pdf), ('wefabricate', generate_wefaricate_pdf)):
+            pdf_path = os.path.join(tmp_dir, f"{company}.pdf")
+            generate(pdf_path, 12)
+            with open(pdf_path, 'rb') as f:
+                stream = io.BytesIO(f.read())
+            # 文件对象不在开头时也能正确读取
+            stream.seek(100)
+
+            processor = PDFImportProcessor()
+            assert processor.resolve_company(stream, 'auto') == company
+            from_stream = processor.extract_by_company(stream, company, workers=2)
+            from_path = processor.extract_by_company(pdf_path, company, workers=1)
+            print(f"{company}: {len(from_stream)} 行")
+            assert from_stream == from_path and len(from_stream) == 12
+            assert sha256_file(stream) == sha256_file(pdf_path)
+            assert not stream.closed
+
+
+def test_upload_request_spools_to_disk_above_threshold():
+    """测试上传文件在阈值以内保存在内存中，超过阈值后转存到磁盘"""
+    app = Flask(__name__)
+    app.request_class = SpooledUploadRequest
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        stream = request.files['file'].stream
+        in_memory = isinstance(stream, tempfile.SpooledTemporaryFile) and isinstance(stream._file, io.BytesIO)
+        return jsonify({'in_memory': in_memory, 'hash': sha256_file(stream)})
+
+    client = app.test_client()
+    previous = os.environ.get('PDF_UPLOAD_SPOOL_MB')
+    try:
+        for spool_mb, in_memory in (('1', True), ('0', False)):
+            os.environ['PDF_UPLOAD_SPOOL_MB'] = spool_mb
+            content = b"%PDF-1.4 " + b"x" * 2048
+            response = client.post('/upload', data={'file': (io.BytesIO(content), 'po.pdf')},
+                                   content_type='multipart/form-data')
+            result = response.get_json()
+            print(f"PDF_UPLOAD_SPOOL_MB={spool_mb}: {result}")
+            assert result['in_memory'] is in_memory
+            assert result['hash'] == sha256_file(io.BytesIO(content))
+    finally:
+        if previous is None:
+            os.environ.pop('PDF_UPLOAD_SPOOL_MB', None)
+        else:
+            os.environ['PDF_UPLOAD_SPOOL_MB'] = previous
+
+
+if __name__ == "__main__":
+    test_extract_from_file_object()
+    test_upload_request_spools_to_disk_above_threshold()
+    print("上传文件流解析测试完成")
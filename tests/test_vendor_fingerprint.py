@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+供应商识别测试脚本
+"""
+
+import sys
+import os
+import json
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from backend.vendor_fingerprint import VendorFingerprinter
+
+
+def load_fingerprinter():
+    with open(os.path.join(project_root, 'config', 'column_mapping.json'), 'r', encoding='utf-8') as f:
+        return VendorFingerprinter(json.load(f))
+
+
+def test_detect_vendor_from_header_text():
+    """测试根据第一页表头文字识别供应商"""
+    fingerprinter = load_fingerprinter()
+    samples = {
+        'wefabricate': "Purchase Order 4500012345\nCreated on: Oct 1, 2025\nContact Person: Jane Buyer\n"
+                       "Item ID Description Quantity Net Price Net Value\nSchedule Lines:",
+        'centurion': "Purchase order Number PO-77001\nDate 01/10/2025\n"
+                     "Line Item number Description Date Quantity Unit Unit price Discount Percent Amount",
+        'magic_fx': "Purchase Order No. 30012345\nDate 01-10-2025\nCode Code Description Delivery Qty Price Amount",
+    }
+    for expected, text in samples.items():
+        scores = fingerprinter.score_text(text)
+        print(f"{expected}: {scores}")
+        assert fingerprinter.best_match(scores) == expected
+
+
+def test_unknown_or_ambiguous_text():
+    """测试无法识别或得分并列时不猜测供应商"""
+    fingerprinter = load_fingerprinter()
+    assert fingerprinter.best_match(fingerprinter.score_text("Invoice 123\nThank you")) is None
+
+    # 手工构造并列的得分
+    fingerprinter.profiles = {
+        'a': ([(VendorFingerprinter._compile_keyword("Alpha"), 3)], 3),
+        'b': ([(VendorFingerprinter._compile_keyword("Beta"), 3)], 3),
+    }
+    assert fingerprinter.best_match(fingerprinter.score_text("Alpha Beta")) is None
+    assert fingerprinter.best_match(fingerprinter.score_text("Alpha")) == 'a'
+
+
+def test_keyword_whitespace_is_flexible():
+    """测试关键字中的空白可以匹配被合并或拆分的空格"""
+    pattern = VendorFingerprinter._compile_keyword("Purchase Order No.")
+    assert pattern.search("PurchaseOrder No.")
+    assert pattern.search("Purchase  Order\nNo.")
+    assert not pattern.search("Purchase Order 4500")
+
+
+if __name__ == "__main__":
+    test_detect_vendor_from_header_text()
+    test_unknown_or_ambiguous_text()
+    test_keyword_whitespace_is_flexible()
+    print("供应商识别测试完成")
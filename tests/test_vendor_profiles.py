@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+供应商解析规则（column_mapping.json 编译结果）测试脚本
+"""
+
+import sys
+import os
+import json
+import pickle
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.db_pdf_processor import extract_centurion_data, extract_magic_fx_data, extract_wefaricate_data
+from backend.pdf_import_processor import PDFImportProcessor
+from backend.vendor_profiles import TABLE_EXTRACTOR, compile_vendor_profiles
+from synthetic_pdfs import GENERATORS, generate_table_vendor_pdf
+
+CONFIG_PATH = os.path.join(project_root, 'config', 'column_mapping.json')
+
+ACME_PATTERNS = {
+    "purchase_order": r"Order\s+No\.\s*(\d+)",
+    "order_date": r"Order\s+Date:\s*([\d-]+)"
+}
+ACME_COLUMNS = {
+    "item_number": "Pos",
+    "item": "Part No",
+    "description": "Description",
+    "quantity": "Qty",
+    "unit_price": "Unit Price",
+    "amount": "Amount",
+    "due_date": "Due Date"
+}
+ACME_MAPPING = {
+    "purchase_order": "po",
+    "item_number": "line",
+    "item": "pn",
+    "description": "description",
+    "quantity": "qty",
+    "unit_price": "net_price",
+    "amount": "total_price",
+    "due_date": "req_date",
+    "order_date": "po_placed_date"
+}
+
+
+def new_processor(tmp_dir, config_path=None):
+    """使用临时配置文件的处理器，不读写共享的解析缓存"""
+    if config_path is None:
+        config_path = os.path.join(tmp_dir, 'column_mapping.json')
+        shutil.copy(CONFIG_PATH, config_path)
+    processor = PDFImportProcessor(config_path=config_path, upload_folder=tmp_dir)
+    processor.parse_cache = None
+    processor.page_cache = None
+    return processor
+
+
+def test_profiles_compiled_once():
+    """测试同一份配置只编译一次，编译结果可以传给工作进程"""
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+        mapping_config = json.load(f)
+    profiles = compile_vendor_profiles(mapping_config)
+    assert compile_vendor_profiles(json.loads(json.dumps(mapping_config))) is profiles
+    assert profiles['wefabricate'].extractor == 'wefabricate'
+    assert profiles['generic_non_wf'].extractor == 'centurion'
+    assert profiles['centurion'].table_name == 'non_wf_open'
+    assert pickle.loads(pickle.dumps(profiles['magic_fx'])).header_patterns.keys() == \
+        profiles['magic_fx'].header_patterns.keys()
+
+
+def test_builtin_vendors_unchanged():
+    """测试内置供应商仍然使用手写提取器，结果不变"""
+    extractors = {
+        'wefabricate': extract_wefaricate_data,
+        'centurion': extract_centurion_data,
+        'magic_fx': extract_magic_fx_data
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        processor = new_processor(tmp_dir)
+        for company_name, generate in GENERATORS.items():
+            pdf_path = generate(os.path.join(tmp_dir, f"{company_name}.pdf"), 20)
+            data = processor.extract_by_company(pdf_path, company_name, workers=1,
+                                                profile=processor.get_profile(company_name))
+            assert data == extractors[company_name](pdf_path), company_name
+
+
+def test_added_vendor_parses_without_code():
+    """测试 add_company_mapping 添加的供应商可以直接识别和解析"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        processor = new_processor(tmp_dir)
+        assert not processor.add_company_mapping('broken', {"purchase_order": "(unclosed"}, ACME_COLUMNS, ACME_MAPPING)
+        assert processor.add_company_mapping(
+            'acme', ACME_PATTERNS, ACME_COLUMNS, ACME_MAPPING,
+            fingerprint={"signatures": {"ACME Components": 3}, "min_score": 3}, table_name='non_wf_open'
+        )
+        assert processor.get_profile('acme').extractor == TABLE_EXTRACTOR
+        # 可选择的公司列表包含新供应商，不包含 generic_wf / generic_non_wf 通用配置
+        assert processor.get_available_companies() == ['wefabricate', 'centurion', 'magic_fx', 'acme']
+
+        # 重新加载配置文件，和服务重启后一样
+        processor = new_processor(tmp_dir, processor.config_path)
+        pdf_path = generate_table_vendor_pdf(os.path.join(tmp_dir, "acme.pdf"), 120)
+        result = list(processor.process_pdf_batch([("acme.pdf", pdf_path)], 'auto', workers=1,
+                                                  check_duplicates=False))[0]
+        print(f"识别为 {result['company']}，{len(result['data'])} 行，写入 {result['table_name']}")
+        assert result['success'] and result['company'] == 'acme' and result['table_name'] == 'non_wf_open'
+
+        data = result['data']
+        # 表头只在第一页，后续页面的续表按同样的列序号解析；合计行没有数量，不作为数据行
+        assert [row['line'] for row in data] == list(range(1, 121))
+        first = data[0]
+        assert first['po'] == '88001234' and first['po_line'] == '88001234/1'
+        assert first['description'] == 'TABLE VENDOR PART 1'
+        assert str(first['po_placed_date']) == '2025-10-15'
+        assert first['req_date'] is not None
+        assert first['qty'] * first['net_price'] - first['total_price'] < 1
+
+
+if __name__ == "__main__":
+    test_profiles_compiled_once()
+    test_builtin_vendors_unchanged()
+    test_added_vendor_parses_without_code()
+    print("供应商解析规则测试完成")